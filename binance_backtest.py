@@ -0,0 +1,609 @@
+"""
+================================================================================
+바이낸스 Futures 롱/숏 파라미터 백테스트 (라이브 결정 규칙 벡터화 → 코인 설정 파일 출력)
+================================================================================
+- 규칙은 futures_trade_strategy 와 동일:
+  숏 = 현재가 < 4h MA(ma_period) AND 1d Slow %K < %D (stoch_k_period, k_smooth, d_period)
+  롱 = 현재가 > 4h MA(long_ma) AND 1d Slow %K > %D (long_sk, long_sks, long_sd) (short_ma 미산출 시 롱 없음)
+  COIN_PRIORITY 순서로 1차/2차 신호 확인 → 해당 방향 진입/유지/전환, 둘 다 OFF 면 청산
+- 시점은 실거래 사이클과 같게 맞춤:
+  사이클 = 4h 마감 직후, 현재가 = 새 4h 캔들 시가, MA 는 진행 중 캔들(시가 1점)까지 포함
+  스토캐스틱 = 전날까지의 마감 일봉으로 계산해 하루 유지 (봇 일봉 캐시)
+- 비용: 수수료 0.04%, 슬리피지 0.05%, 펀딩비 0.01%/8h (코인 설정 헤더 가정, 모의 거래소와 같이 롱 지불 / 숏 수취)
+- 슬롯 = 독립 계좌 (총 자산 / 코인 수 균등 배분): 진입 시 슬롯 자산 × 레버리지 명목가, 보유 중 리밸런싱 없음,
+  봉 중 최악가로 슬롯 자산이 0 이하가 되면 파산 처리
+- 단계: (1) 숏 단독 / 롱 단독 그리드를 NumPy 로 일괄 평가 (MA × 스토캐스틱 × 레버리지) → 방향별 상위 후보
+        (2) 상위 후보 + 현재 설정 × 우선순위(long/short) 조합을 실제 규칙으로 평가 → Winner
+- 심볼별 작업은 프로세스 풀로 병렬 실행, 데이터가 부족한 코인은 기존 설정 유지
+- 출력: 봇 설정 파일 형식 (JSON {"short","long","priority"} 또는 .csv) → TRADING_CONFIG_FILE 로 바로 적용
+
+사용 예:
+  python binance_backtest.py --candles ~/binance_futures_candles.sqlite3 -o ~/binance_trading_configs.json
+  python binance_backtest.py --symbols BTCUSDT ETHUSDT --ma 20:360:10 --lev 1,2,3 --report report.jsonl
+  python binance_backtest.py --evaluate --report current.jsonl   # 현재 설정 성과만 계산
+================================================================================
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import logging
+import argparse
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import binance_paper
+
+log = logging.getLogger('binance_backtest')
+log.setLevel(logging.INFO)
+
+H4_MS = 4 * 60 * 60 * 1000
+DAY_MS = 24 * 60 * 60 * 1000
+FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000
+YEAR_MS = 365 * DAY_MS
+
+# 기본 그리드 (현재 설정 분포를 덮는 범위)
+DEFAULT_MA_GRID = tuple(range(20, 361, 20))
+DEFAULT_K_GRID = (5, 9, 14, 21, 30, 40, 50, 65, 80, 100, 125, 150)
+DEFAULT_KS_GRID = (1, 3, 5, 10, 15, 20, 30, 45, 65)
+DEFAULT_D_GRID = (3, 5, 10, 15, 20, 30, 40, 50)
+DEFAULT_LEVERAGE_GRID = (1, 2, 3, 4, 5)
+DEFAULT_TOP_K = 8
+MIN_BACKTEST_DAYS = 180  # 평가 구간이 이보다 짧은 코인은 기존 설정 유지
+ROW_CHUNK = 1024  # 한 번에 평가할 포지션 행 수 (메모리 상한)
+MDD_FLOOR = 0.05  # calmar 점수 분모 하한
+
+BacktestGrid = namedtuple('BacktestGrid', ['ma', 'k', 'k_smooth', 'd', 'leverage'])
+BacktestCosts = namedtuple('BacktestCosts', ['fee', 'slippage', 'funding'])
+
+# ============================================================
+# 캔들 → 사이클 시계열
+# ============================================================
+
+# 사이클 t = 4h 캔들 t 시작 시각: 캔들 0..t-1 마감 + 캔들 t 진행 중 (현재가 = 시가)
+Series = namedtuple('Series', [
+    'ts', 'open', 'high', 'low', 'close',  # 4h (사이클별)
+    'day_open', 'day_high', 'day_low', 'day_close', 'cycle_day',  # 1d, 사이클 → 일봉 행 (-1 = 없음)
+    'funding_price', 'start',  # 펀딩 시각 사이클의 가격 (그 외 0), 평가 시작 사이클
+])
+
+
+def daily_from_4h(rows_4h):
+    """4h 캔들을 UTC 일봉으로 집계 (1d 녹화가 없을 때) - ndarray(n, 6)"""
+    days = rows_4h[:, 0] // DAY_MS * DAY_MS
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    ends = np.r_[starts[1:], len(rows_4h)] - 1
+    return np.column_stack([
+        days[starts], rows_4h[starts, 1],
+        np.maximum.reduceat(rows_4h[:, 2], starts), np.minimum.reduceat(rows_4h[:, 3], starts),
+        rows_4h[ends, 4], np.add.reduceat(rows_4h[:, 5], starts),
+    ])
+
+
+def build_series(rows_4h, rows_1d=None, start_ms=None, end_ms=None):
+    """녹화 캔들(4h, 1d)로 사이클 시계열 구성 - start/end 이전 구간은 지표 예열에만 사용"""
+    if end_ms is not None:
+        rows_4h = rows_4h[rows_4h[:, 0] <= end_ms]
+    if rows_1d is None or not len(rows_1d):
+        rows_1d = daily_from_4h(rows_4h)
+    ts = rows_4h[:, 0].astype(np.int64)
+    day_ts = rows_1d[:, 0].astype(np.int64)
+    cycle_day = np.searchsorted(day_ts, ts // DAY_MS * DAY_MS)
+    found = cycle_day < len(day_ts)
+    found[found] = day_ts[cycle_day[found]] == (ts // DAY_MS * DAY_MS)[found]
+    start = 1 if start_ms is None else max(1, int(np.searchsorted(ts, start_ms, side='left')))
+    return Series(
+        ts=ts, open=rows_4h[:, 1], high=rows_4h[:, 2], low=rows_4h[:, 3], close=rows_4h[:, 4],
+        day_open=rows_1d[:, 1], day_high=rows_1d[:, 2], day_low=rows_1d[:, 3], day_close=rows_1d[:, 4],
+        cycle_day=np.where(found, cycle_day, -1),
+        funding_price=np.where(ts % FUNDING_INTERVAL_MS == 0, rows_4h[:, 1], 0.0),
+        start=start,
+    )
+
+
+def backtest_days(series):
+    return (series.ts[-1] - series.ts[series.start] + H4_MS) / DAY_MS if series.start < len(series.ts) else 0.0
+
+
+# ============================================================
+# 지표 그리드 (사이클 시점 값)
+# ============================================================
+
+def _prefix_sum(values):
+    """NaN 을 0 으로 본 누적합과 NaN 개수 누적 (앞에 0 한 칸) - _window_sum 용"""
+    zero = np.zeros(values.shape[:-1] + (1,))
+    return (np.concatenate([zero, np.cumsum(np.nan_to_num(values), axis=-1)], axis=-1),
+            np.concatenate([zero, np.cumsum(np.isnan(values), axis=-1)], axis=-1))
+
+
+def _window_sum(prefix, lo, hi):
+    """[lo, hi) 구간 합 (lo < 0 이거나 NaN 포함 시 NaN) - lo/hi 는 브로드캐스트 가능한 정수 배열"""
+    csum, cnan = prefix
+    valid = lo >= 0
+    lo = np.clip(lo, 0, None)
+    sums = np.take_along_axis(csum, hi, axis=-1) - np.take_along_axis(csum, lo, axis=-1)
+    nans = np.take_along_axis(cnan, hi, axis=-1) - np.take_along_axis(cnan, lo, axis=-1)
+    return np.where(valid & (nans == 0), sums, np.nan)
+
+
+def moving_average_grid(series, periods):
+    """사이클별 4h MA (진행 중 캔들 = 시가 포함) - (len(periods), 사이클) 배열, 캔들 부족은 NaN"""
+    periods = np.asarray(periods, dtype=int)[:, None]
+    t = np.arange(len(series.ts))[None, :]
+    csum = np.concatenate([[0.0], np.cumsum(series.close)])
+    lo = t - periods + 1
+    closed = csum[t] - csum[np.clip(lo, 0, None)]
+    with np.errstate(invalid='ignore'):
+        return np.where(lo >= 0, (closed + series.open[None, :]) / periods, np.nan)
+
+
+def _rolling_extreme(values, window, op, empty):
+    """[j-window+1 .. j] 구간 op (j < window-1 은 NaN, window=0 은 empty)"""
+    out = np.full(len(values), np.nan)
+    if window <= 0:
+        out[:] = empty
+    elif window <= len(values):
+        out[window - 1:] = op(np.lib.stride_tricks.sliding_window_view(values, window), axis=1)
+    return out
+
+
+def stochastic_grid(series, k_periods, k_smooths, d_periods):
+    """일별 Slow %K - %D (그날 사이클 값) 를 파라미터 조합 전체에 대해 계산
+
+    일봉 d 의 값 = 마감 일봉 0..d-1 로 calculate_stochastic 과 같은 식 (봇 일봉 캐시, 하루 동안 고정),
+    마감 일봉 수(d) < k + k_smooth + d_period 이거나 분모 0 이면 NaN.
+    Returns: (diff (조합, 일봉), params (조합, 3))
+    """
+    high, low, close = series.day_high, series.day_low, series.day_close
+    n_days = len(close)
+    days = np.arange(n_days)
+    d_periods = np.asarray(d_periods, dtype=int)[:, None]
+    diffs, params = [], []
+    for k in k_periods:
+        # 마감 일봉 j 의 fast %K (구간 j-k+1..j)
+        highest = _rolling_extreme(high, k, np.max, np.nan)
+        lowest = _rolling_extreme(low, k, np.min, np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fast_k = 100 * (close - lowest) / (highest - lowest)
+        fast_k[~np.isfinite(fast_k)] = np.nan
+        fast_prefix = _prefix_sum(fast_k)
+
+        for ks in k_smooths:
+            slow_k = _window_sum(fast_prefix, days - ks + 1, days + 1) / ks
+            slow_prefix = _prefix_sum(slow_k)
+            lo = np.broadcast_to(days[None, :] - d_periods + 1, (len(d_periods), n_days))
+            hi = np.broadcast_to(days[None, :] + 1, lo.shape)
+            slow_prefix = tuple(np.broadcast_to(p, (len(d_periods), n_days + 1)) for p in slow_prefix)
+            closed = slow_k[None, :] - _window_sum(slow_prefix, lo, hi) / d_periods
+            closed[(days[None, :] + 1) < (k + ks + d_periods)] = np.nan
+            # 일봉 d 사이클에는 마감 일봉 d-1 까지의 값
+            diff = np.concatenate([np.full((len(d_periods), 1), np.nan), closed[:, :-1]], axis=1)
+            diffs.append(diff)
+            params.extend((k, ks, int(d)) for d in d_periods[:, 0])
+    return np.vstack(diffs), np.array(params, dtype=int)
+
+
+def cycle_values(series, daily):
+    """일별 값 (행, 일봉) → 사이클별 값 (행, 사이클) - 일봉이 없는 사이클은 NaN"""
+    padded = np.concatenate([daily, np.full((daily.shape[0], 1), np.nan)], axis=1)
+    return padded[:, series.cycle_day]
+
+
+# ============================================================
+# 포지션 → 성과
+# ============================================================
+
+def _range_table(values, op):
+    """1차원 구간 최대/최소용 sparse table - level j 의 [t] = values[t .. t+2^j-1] 의 op"""
+    levels = [values]
+    span = 1
+    while span * 2 <= len(values):
+        prev = levels[-1]
+        levels.append(op(prev[:-span], prev[span:]))
+        span *= 2
+    return levels
+
+
+def _range_query(levels, op, lo, hi):
+    """[lo, hi] (포함) 구간 op - lo/hi 는 같은 길이의 정수 배열"""
+    level = np.floor(np.log2(hi - lo + 1)).astype(int)
+    out = np.empty(len(lo))
+    for j in np.unique(level):
+        mask = level == j
+        table = levels[j]
+        out[mask] = op(table[lo[mask]], table[hi[mask] - (1 << j) + 1])
+    return out
+
+
+def evaluate_positions(series, positions, short_leverage, long_leverage, costs):
+    """포지션 행렬 (행, 사이클; -1 숏 / 0 현금 / 1 롱) 의 슬롯 성과
+
+    사이클 t 에 포지션이 바뀌면 시가 ± 슬리피지로 청산 후 진입, 마지막 종가에 전량 청산.
+    거래 단위로 계산 (진입/청산 쌍) - 낙폭은 확정 자산 고점 대비 보유 구간 최악가 (롱 저가 / 숏 고가).
+    short_leverage / long_leverage: (행, L) - 열마다 한 번씩 평가.
+    Returns: dict(final, cagr, mdd, trades, exposure) - 각 (행, L)
+    """
+    rows, n = positions.shape
+    short_leverage = np.asarray(short_leverage, dtype=float).reshape(rows, -1)
+    long_leverage = np.asarray(long_leverage, dtype=float).reshape(rows, -1)
+    n_lev = max(short_leverage.shape[1], long_leverage.shape[1])
+    short_leverage = np.broadcast_to(short_leverage, (rows, n_lev))
+    long_leverage = np.broadcast_to(long_leverage, (rows, n_lev))
+
+    zero = np.zeros((rows, 1), dtype=positions.dtype)
+    after = np.concatenate([positions, zero], axis=1)  # 사이클 t 이후 포지션 (마지막 칸 = 종료 청산)
+    before = np.concatenate([zero, positions], axis=1)
+    changed = after != before
+    # 행 안에서 진입/청산은 번갈아 나오므로 (행 우선 순서) k 번째 진입 ↔ k 번째 청산
+    _, entry = np.nonzero(changed & (after != 0))
+    row, exit_ = np.nonzero(changed & (before != 0))
+    side = before[row, exit_].astype(float)
+
+    price = np.r_[series.open, series.close[-1]]
+    # 펀딩 구간 (entry, exit]: 진입은 진입 사이클 펀딩 시각 직후, 청산 사이클 펀딩 시각에는 아직 보유 (봇/모의 거래소와 동일)
+    # paid[t] = 사이클 0..t-1 펀딩 가격 합 (앞에 0 한 칸) → 사이클 entry+1..exit 합 = paid[exit + 1] - paid[entry + 1]
+    paid = np.r_[0.0, np.cumsum(np.r_[series.funding_price, 0.0])]
+    funding = paid[exit_ + 1] - paid[entry + 1]
+    entry_price = price[entry] * (1 + side * costs.slippage)
+    ratio = price[exit_] * (1 - side * costs.slippage) / entry_price
+    gain = side * (ratio - 1) - costs.fee * (1 + ratio) - side * costs.funding * funding / entry_price
+    lows = _range_query(_range_table(series.low, np.minimum), np.minimum, entry, exit_ - 1)
+    highs = _range_query(_range_table(series.high, np.maximum), np.maximum, entry, exit_ - 1)
+    worst_gain = side * (np.where(side > 0, lows, highs) / entry_price - 1) - costs.fee
+
+    trades = np.bincount(row, minlength=rows)
+    first = np.r_[0, np.cumsum(trades)[:-1]]  # 행별 첫 거래 위치
+    offset = row * 1e6  # 행 구분용 (로그 자산 범위보다 충분히 큼) - 행 단위 누적 최대
+    days = max(backtest_days(series), 1.0)
+    result = {key: np.zeros((rows, n_lev)) for key in ('final', 'cagr', 'mdd')}
+    for j in range(n_lev):
+        leverage = np.where(side > 0, long_leverage[row, j], short_leverage[row, j])
+        multiplier = 1 + leverage * gain
+        trough = 1 + leverage * worst_gain
+        ruined = np.bincount(row, weights=((multiplier <= 0) | (trough <= 0)).astype(float), minlength=rows) > 0
+        log_gain = np.log(np.clip(multiplier, 1e-12, None))
+        total = np.cumsum(log_gain)
+        exclusive = total - log_gain
+        log_before = exclusive - exclusive[first[row]]  # 거래 직전 확정 자산 (로그)
+        peak = np.maximum.accumulate(np.maximum(log_before, 0.0) + offset) - offset
+        drawdown = 1 - np.exp(log_before + np.log(np.clip(trough, 1e-12, None)) - peak)
+        mdd = np.zeros(rows)
+        np.maximum.at(mdd, row, drawdown)
+        final = np.exp(np.bincount(row, weights=log_gain, minlength=rows))
+        final[ruined] = 0.0
+        mdd = np.clip(mdd, 0.0, 1.0)
+        mdd[ruined] = 1.0
+        result['final'][:, j] = final
+        result['mdd'][:, j] = mdd
+        result['cagr'][:, j] = final ** (365.0 / days) - 1
+    result['trades'] = np.broadcast_to(trades[:, None].astype(float), (rows, n_lev))
+    result['exposure'] = np.broadcast_to((positions != 0).mean(axis=1)[:, None], (rows, n_lev))
+    return result
+
+
+def score_metrics(metrics, score):
+    """선택 기준 점수 - 'calmar' (CAGR / MDD) 또는 'return' (최종 배수)"""
+    if score == 'return':
+        return metrics['final']
+    return metrics['cagr'] / np.maximum(metrics['mdd'], MDD_FLOOR)
+
+
+def _metrics_at(metrics, row, col):
+    return {key: float(value[row, col]) for key, value in metrics.items()}
+
+
+# ============================================================
+# 심볼 백테스트
+# ============================================================
+
+def _side_search(series, ma, ma_periods, stoch, stoch_params, side, grid, costs, score, top_k):
+    """한 방향 단독 전략을 (MA × 스토캐스틱 × 레버리지) 전체에 대해 평가
+
+    Returns: 상위 top_k [(점수, ma, k, ks, d, lev)] - 신호 파라미터가 같으면 최고 레버리지 1개만
+    """
+    active = np.zeros(len(series.ts), dtype=bool)
+    active[series.start:] = True
+    ma_hit = (series.open[None, :] < ma) if side == 'short' else (series.open[None, :] > ma)
+    ma_hit &= active
+    leverage = np.array(grid.leverage, dtype=float)[None, :]
+    sign = -1 if side == 'short' else 1
+    best = {}
+    per_chunk = max(1, ROW_CHUNK // len(ma_periods))
+    for lo in range(0, len(stoch), per_chunk):
+        chunk = stoch[lo:lo + per_chunk]
+        with np.errstate(invalid='ignore'):
+            stoch_hit = (chunk < 0) if side == 'short' else (chunk > 0)
+        hits = stoch_hit[:, None, :] & ma_hit[None, :, :]
+        positions = (hits.reshape(-1, hits.shape[-1]) * sign).astype(np.int8)
+        levs = np.broadcast_to(leverage, (len(positions), leverage.shape[1]))
+        metrics = evaluate_positions(series, positions, levs, levs, costs)
+        scores = np.nan_to_num(score_metrics(metrics, score), nan=-np.inf)
+        rows = np.argsort(scores.max(axis=1))[::-1][:top_k]
+        for row in rows:
+            stoch_row, ma_row = divmod(int(row), len(ma_periods))
+            col = int(np.argmax(scores[row]))
+            key = (int(ma_periods[ma_row]),) + tuple(int(v) for v in stoch_params[lo + stoch_row])
+            if key not in best or scores[row, col] > best[key][0]:
+                best[key] = (float(scores[row, col]),) + key + (int(grid.leverage[col]),)
+        best = dict(sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:top_k])
+    return list(best.values())
+
+
+def _short_config(symbol, ma, k, ks, d, lev):
+    return {'symbol': symbol, 'ma_period': ma, 'stoch_k_period': k, 'stoch_k_smooth': ks,
+            'stoch_d_period': d, 'leverage': lev}
+
+
+def _long_config(symbol, short_cfg, ma, k, ks, d, lev):
+    """롱 설정 - 숏 필터 필드(short_ma/sk/sks/sd)는 같은 코인의 숏 설정 값 (현재 설정 파일 관례)"""
+    return {'symbol': symbol, 'short_ma': short_cfg['ma_period'], 'short_sk': short_cfg['stoch_k_period'],
+            'short_sks': short_cfg['stoch_k_smooth'], 'short_sd': short_cfg['stoch_d_period'],
+            'long_ma': ma, 'long_sk': k, 'long_sks': ks, 'long_sd': d, 'long_lev': lev}
+
+
+def evaluate_configs(series, candidates, costs):
+    """(short_cfg, long_cfg, priority) 후보들을 실제 결정 규칙으로 평가 - evaluate_positions 결과 (행, 1)"""
+    ma_periods = sorted({c[0]['ma_period'] for c in candidates if c[0]}
+                        | {c[1][f] for c in candidates if c[1] for f in ('short_ma', 'long_ma')})
+    ma = dict(zip(ma_periods, moving_average_grid(series, ma_periods))) if ma_periods else {}
+    stoch = {}
+    for short_cfg, long_cfg, _ in candidates:
+        keys = []
+        if short_cfg:
+            keys.append((short_cfg['stoch_k_period'], short_cfg['stoch_k_smooth'], short_cfg['stoch_d_period']))
+        if long_cfg:
+            keys.append((long_cfg['long_sk'], long_cfg['long_sks'], long_cfg['long_sd']))
+        for key in keys:
+            if key not in stoch:
+                diff, _ = stochastic_grid(series, [key[0]], [key[1]], [key[2]])
+                stoch[key] = cycle_values(series, diff)[0]
+
+    n = len(series.ts)
+    positions = np.zeros((len(candidates), n), dtype=np.int8)
+    short_lev = np.ones(len(candidates))
+    long_lev = np.ones(len(candidates))
+    price = series.open
+    with np.errstate(invalid='ignore'):
+        for i, (short_cfg, long_cfg, priority) in enumerate(candidates):
+            short_on = np.zeros(n, dtype=bool)
+            long_on = np.zeros(n, dtype=bool)
+            if short_cfg:
+                diff = stoch[(short_cfg['stoch_k_period'], short_cfg['stoch_k_smooth'], short_cfg['stoch_d_period'])]
+                short_on = (price < ma[short_cfg['ma_period']]) & (diff < 0)
+                short_lev[i] = short_cfg['leverage']
+            if long_cfg:
+                diff = stoch[(long_cfg['long_sk'], long_cfg['long_sks'], long_cfg['long_sd'])]
+                long_on = (price > ma[long_cfg['long_ma']]) & (diff > 0) & ~np.isnan(ma[long_cfg['short_ma']])
+                long_lev[i] = long_cfg['long_lev']
+            if priority == 'long':
+                row = np.where(long_on, 1, np.where(short_on, -1, 0))
+            else:
+                row = np.where(short_on, -1, np.where(long_on, 1, 0))
+            row[:series.start] = 0
+            positions[i] = row
+    return evaluate_positions(series, positions, short_lev[:, None], long_lev[:, None], costs)
+
+
+def backtest_symbol(symbol, rows_4h, rows_1d, current, grid, costs, score='calmar', top_k=DEFAULT_TOP_K,
+                    start_ms=None, end_ms=None, evaluate_only=False):
+    """한 코인 백테스트 (프로세스 풀 작업 단위)
+
+    current: (short_cfg, long_cfg, priority) 현재 설정 (없으면 None) - Winner 후보에 포함
+    Returns: {'symbol', 'days', 'cycles', 'short', 'long', 'priority', 'metrics', 'current'} 또는 {'symbol', 'skipped'}
+    """
+    started = time.perf_counter()
+    if rows_4h is None or len(rows_4h) < 2:
+        return {'symbol': symbol, 'skipped': '4h 캔들 없음'}
+    series = build_series(rows_4h, rows_1d, start_ms, end_ms)
+    days = backtest_days(series)
+    if days < MIN_BACKTEST_DAYS and not evaluate_only:
+        return {'symbol': symbol, 'skipped': f'평가 구간 부족 ({days:.0f}일)'}
+
+    result = {'symbol': symbol, 'days': round(float(days), 1), 'cycles': len(series.ts) - series.start}
+    candidates = []
+    if current is not None:
+        candidates += [current]
+    if not evaluate_only:
+        ma_periods = np.array(grid.ma, dtype=int)
+        ma = moving_average_grid(series, ma_periods)
+        daily, stoch_params = stochastic_grid(series, grid.k, grid.k_smooth, grid.d)
+        stoch = cycle_values(series, daily)
+        shorts = _side_search(series, ma, ma_periods, stoch, stoch_params, 'short', grid, costs, score, top_k)
+        longs = _side_search(series, ma, ma_periods, stoch, stoch_params, 'long', grid, costs, score, top_k)
+        short_cfgs = [_short_config(symbol, *best[1:]) for best in shorts]
+        if current is not None and current[0]:
+            short_cfgs.append(dict(current[0]))
+        for short_cfg in short_cfgs:
+            long_cfgs = [_long_config(symbol, short_cfg, *best[1:]) for best in longs]
+            if current is not None and current[1]:
+                long_cfgs.append(dict(current[1], short_ma=short_cfg['ma_period'], short_sk=short_cfg['stoch_k_period'],
+                                      short_sks=short_cfg['stoch_k_smooth'], short_sd=short_cfg['stoch_d_period']))
+            for long_cfg in long_cfgs:
+                candidates += [(short_cfg, long_cfg, 'long'), (short_cfg, long_cfg, 'short')]
+    if not candidates:
+        return {'symbol': symbol, 'skipped': '평가할 설정 없음'}
+
+    metrics = evaluate_configs(series, candidates, costs)
+    scores = np.nan_to_num(score_metrics(metrics, score)[:, 0], nan=-np.inf)
+    winner = int(np.argmax(scores))
+    short_cfg, long_cfg, priority = candidates[winner]
+    result.update(
+        short=dict(short_cfg) if short_cfg else None, long=dict(long_cfg) if long_cfg else None, priority=priority,
+        metrics=dict(_metrics_at(metrics, winner, 0), score=float(scores[winner])),
+        current=dict(_metrics_at(metrics, 0, 0), score=float(scores[0])) if current is not None else None,
+        seconds=round(time.perf_counter() - started, 2),
+    )
+    return result
+
+
+# ============================================================
+# 설정 파일 입출력
+# ============================================================
+
+def load_current_configs(path=None):
+    """현재 코인 설정 - (short_configs, long_configs, priorities) (파일이 없으면 봇 내장 기본값)"""
+    import binance_bot as bot
+    path = path or bot.TRADING_CONFIG_FILE
+    if os.path.exists(path):
+        return bot.validate_trading_configs(*bot.read_trading_config_file(path))
+    return bot.validate_trading_configs(bot.SHORT_TRADING_CONFIGS, bot.LONG_TRADING_CONFIGS, bot.COIN_PRIORITY)
+
+
+def write_trading_configs(path, short_configs, long_configs, priorities):
+    """봇 설정 파일 형식으로 저장 (.csv 면 심볼당 1행, 그 외 JSON) - read_trading_config_file 과 짝"""
+    import binance_bot as bot
+    short_configs, long_configs, priorities = bot.validate_trading_configs(short_configs, long_configs, priorities)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        if path.lower().endswith('.csv'):
+            fields = ('symbol', 'priority') + bot.SHORT_CONFIG_FIELDS + bot.LONG_CONFIG_FIELDS
+            writer = csv.DictWriter(f, fieldnames=fields, restval='')
+            writer.writeheader()
+            long_map = {cfg['symbol']: cfg for cfg in long_configs}
+            symbols = [cfg['symbol'] for cfg in short_configs]
+            symbols += [symbol for symbol in long_map if symbol not in symbols]
+            short_map = {cfg['symbol']: cfg for cfg in short_configs}
+            for symbol in symbols:
+                row = {'symbol': symbol, 'priority': priorities.get(symbol, '')}
+                row.update(short_map.get(symbol, {}))
+                row.update(long_map.get(symbol, {}))
+                writer.writerow(row)
+        else:
+            json.dump({'short': short_configs, 'long': long_configs, 'priority': priorities},
+                      f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+
+def merge_results(current, results):
+    """백테스트 Winner 로 현재 설정 갱신 (건너뛴 코인은 기존 설정 유지, 순서 유지)"""
+    short_configs, long_configs, priorities = current
+    short_map = {cfg['symbol']: dict(cfg) for cfg in short_configs}
+    long_map = {cfg['symbol']: dict(cfg) for cfg in long_configs}
+    priorities = dict(priorities)
+    order = list(short_map) + [symbol for symbol in long_map if symbol not in short_map]
+    for result in results:
+        if 'skipped' in result:
+            continue
+        symbol = result['symbol']
+        if symbol not in short_map and symbol not in long_map:
+            order.append(symbol)
+        for side_map, cfg in ((short_map, result['short']), (long_map, result['long'])):
+            if cfg:
+                side_map[symbol] = cfg
+            else:
+                side_map.pop(symbol, None)
+        priorities[symbol] = result['priority']
+    return ([short_map[s] for s in order if s in short_map], [long_map[s] for s in order if s in long_map],
+            {s: priorities[s] for s in order if s in priorities})
+
+
+# ============================================================
+# 실행
+# ============================================================
+
+def parse_grid(value, default):
+    """'20:360:20' (시작:끝:간격, 끝 포함) 또는 '5,9,14' → 정수 튜플"""
+    if not value:
+        return tuple(default)
+    if ':' in value:
+        start, stop, step = (int(v) for v in value.split(':'))
+        return tuple(range(start, stop + 1, step))
+    return tuple(int(v) for v in value.split(','))
+
+
+def run_backtests(candles, symbols, current, grid, costs, score='calmar', top_k=DEFAULT_TOP_K,
+                  start_ms=None, end_ms=None, evaluate_only=False, workers=None):
+    """심볼별 backtest_symbol() 을 프로세스 풀로 실행 - 결과 리스트 (symbols 순서)"""
+    short_map = {cfg['symbol']: cfg for cfg in current[0]}
+    long_map = {cfg['symbol']: cfg for cfg in current[1]}
+    results = {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for symbol in symbols:
+            cfgs = (short_map.get(symbol), long_map.get(symbol), current[2].get(symbol, 'short'))
+            futures[pool.submit(
+                backtest_symbol, symbol, candles.get((symbol, '4h')), candles.get((symbol, '1d')),
+                cfgs if cfgs[0] or cfgs[1] else None, grid, costs, score, top_k, start_ms, end_ms, evaluate_only,
+            )] = symbol
+        for done, future in enumerate(as_completed(futures), 1):
+            symbol = futures[future]
+            try:
+                results[symbol] = future.result()
+            except Exception as e:
+                log.error(f"{symbol} 백테스트 오류: {e}")
+                results[symbol] = {'symbol': symbol, 'skipped': f'오류: {e}'}
+            if done % 10 == 0 or done == len(futures):
+                log.info(f"⏩ {done}/{len(futures)} 코인 완료 ({time.perf_counter() - started:.0f}초)")
+    return [results[symbol] for symbol in symbols]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="바이낸스 Futures 롱/숏 파라미터 백테스트 (봇 설정 파일 출력)")
+    parser.add_argument('--candles', default=os.path.join(os.path.expanduser('~'), 'binance_futures_candles.sqlite3'),
+                        help="녹화 캔들 (캔들 저장소 SQLite)")
+    parser.add_argument('--config', help="현재 코인 설정 파일 (기본: 봇 TRADING_CONFIG_FILE, 없으면 내장 설정)")
+    parser.add_argument('--symbols', nargs='+', help="대상 코인 (기본: 현재 설정 전체)")
+    parser.add_argument('--start', help="평가 시작일 (YYYY-MM-DD, UTC - 이전 캔들은 지표 예열에만 사용)")
+    parser.add_argument('--end', help="평가 종료일 (YYYY-MM-DD, UTC)")
+    parser.add_argument('--ma', help="4h MA 그리드 ('시작:끝:간격' 또는 '20,50,100')")
+    parser.add_argument('--k', help="스토캐스틱 %%K 기간 그리드")
+    parser.add_argument('--ks', help="%%K 평활 그리드")
+    parser.add_argument('--d', help="%%D 기간 그리드")
+    parser.add_argument('--lev', help="레버리지 그리드")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_K, help="방향별 조합 평가 후보 수")
+    parser.add_argument('--score', choices=('calmar', 'return'), default='calmar', help="선택 기준")
+    parser.add_argument('--fee', type=float, default=binance_paper.DEFAULT_FEE_RATE)
+    parser.add_argument('--slippage', type=float, default=binance_paper.DEFAULT_SLIPPAGE)
+    parser.add_argument('--funding', type=float, default=binance_paper.DEFAULT_FUNDING_RATE)
+    parser.add_argument('--workers', type=int, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument('--evaluate', action='store_true', help="최적화 없이 현재 설정 성과만 계산")
+    parser.add_argument('-o', '--output', help="Winner 설정 파일 (.json 또는 .csv)")
+    parser.add_argument('--report', help="코인별 결과 (JSONL)")
+    args = parser.parse_args(argv)
+
+    current = load_current_configs(args.config)
+    symbols = args.symbols
+    if not symbols:
+        symbols = [cfg['symbol'] for cfg in current[0]]
+        symbols += [cfg['symbol'] for cfg in current[1] if cfg['symbol'] not in symbols]
+    grid = BacktestGrid(parse_grid(args.ma, DEFAULT_MA_GRID), parse_grid(args.k, DEFAULT_K_GRID),
+                        parse_grid(args.ks, DEFAULT_KS_GRID), parse_grid(args.d, DEFAULT_D_GRID),
+                        parse_grid(args.lev, DEFAULT_LEVERAGE_GRID))
+    costs = BacktestCosts(args.fee, args.slippage, args.funding)
+
+    candles = binance_paper.load_recorded_candles(args.candles, symbols)
+    log.info(f"🧪 백테스트 시작: {len(symbols)}개 코인, 방향별 그리드 "
+             f"{len(grid.ma) * len(grid.k) * len(grid.k_smooth) * len(grid.d) * len(grid.leverage):,}개")
+    results = run_backtests(candles, symbols, current, grid, costs, score=args.score, top_k=args.top,
+                            start_ms=binance_paper.parse_date_ms(args.start),
+                            end_ms=binance_paper.parse_date_ms(args.end),
+                            evaluate_only=args.evaluate, workers=args.workers)
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            for result in results:
+                f.write(json.dumps(result, ensure_ascii=False, separators=(',', ':')) + '\n')
+    tested = [r for r in results if 'skipped' not in r]
+    if args.output and not args.evaluate:
+        write_trading_configs(args.output, *merge_results(current, results))
+    changed = sum(1 for r in tested if r['current'] is None or r['metrics']['score'] > r['current']['score'])
+    summary = {
+        'symbols': len(results),
+        'tested': len(tested),
+        'skipped': {r['symbol']: r['skipped'] for r in results if 'skipped' in r},
+        'improved': 0 if args.evaluate else changed,
+        'median_final': round(float(np.median([r['metrics']['final'] for r in tested])), 4) if tested else None,
+        'median_mdd': round(float(np.median([r['metrics']['mdd'] for r in tested])), 4) if tested else None,
+        'output': args.output,
+    }
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
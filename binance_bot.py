@@ -14,16 +14,28 @@
 import os
 import sys
 import time
+import asyncio
 import signal
 import atexit
-import schedule
+import threading
+import multiprocessing
 import numpy as np
 import pandas as pd
 import ccxt
+import aiohttp
 import requests
 import json
+import csv
+import sqlite3
+import hashlib
+import uuid
 from datetime import datetime, timedelta, timezone
+from decimal import Decimal, ROUND_DOWN
 import logging
+from collections import deque, namedtuple
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import contextmanager, nullcontext
 from dotenv import load_dotenv
 
 # .env 파일 로드
@@ -63,6 +75,12 @@ if not all([TELEGRAM_TOKEN, TELEGRAM_CHAT_ID]):
 
 FUTURES_STOCH_CACHE_FILE = os.path.join(os.path.expanduser('~'), 'binance_futures_stoch_cache.json')
 LONG_STOCH_CACHE_FILE = os.path.join(os.path.expanduser('~'), 'binance_long_stoch_cache.json')
+FUTURES_CANDLE_STORE_FILE = os.path.join(os.path.expanduser('~'), 'binance_futures_candles.sqlite3')
+SPOT_MARKETS_CACHE_FILE = os.path.join(os.path.expanduser('~'), 'binance_markets_cache_spot.json')
+FUTURES_MARKETS_CACHE_FILE = os.path.join(os.path.expanduser('~'), 'binance_markets_cache_future.json')
+TRADING_CONFIG_FILE = os.path.join(os.path.expanduser('~'), 'binance_trading_configs.json')  # .json 또는 .csv
+CYCLE_METRICS_FILE = os.path.join(os.path.expanduser('~'), 'binance_cycle_metrics.jsonl')
+PAPER_STATE_DIR = os.path.join(os.path.expanduser('~'), 'binance_paper')  # 모의 거래 상태 파일 (실계좌 상태와 분리)
 
 # ============================================================
 # 거래 설정
@@ -80,6 +98,88 @@ FUTURES_BNB_RECHARGE_AMOUNT = 20  # 충전 시 매수할 금액 (USDT)
 SPOT_USDT_MIN_BALANCE = 100  # Spot 지갑 USDT 최소 보유량
 SPOT_USDT_REFILL_AMOUNT = 100  # 충전 시 Futures에서 Spot으로 전송할 금액 (USDT)
 
+# 주문 실행 백엔드 ('live': 바이낸스 계좌, 'paper': binance_paper 모의 거래소 - 녹화 캔들로 체결, 텔레그램/스트림 끔)
+EXECUTION_BACKEND = os.getenv('BINANCE_EXECUTION_BACKEND', 'live')
+PAPER_CANDLE_FILE = os.getenv('BINANCE_PAPER_CANDLES', FUTURES_CANDLE_STORE_FILE)  # 녹화 캔들 (캔들 저장소 형식, 읽기 전용)
+PAPER_INITIAL_BALANCE = 10000  # 모의 계좌 초기 USDT
+
+# 코인별 설정 파일 (최적화 결과 파일 - 없으면 아래 내장 설정 사용)
+TRADING_CONFIG_RELOAD = True  # 사이클 사이에 파일 변경(mtime/크기) 감지 시 재적재
+
+# 사이클 스케줄 (UTC 4시간봉 마감 = KST 01/05/09/13/17/21시, 바이낸스 서버 시각 기준)
+CYCLE_TIMEFRAME = '4h'
+CYCLE_START_DELAY = 3  # 마감 후 사이클 시작까지 대기 (초) - 마감 캔들 확정 여유
+CYCLE_LAG_WARN = 60  # 마감 대비 시작 지연 경고 기준 (초)
+CYCLE_OVERRUN_POLICY = 'merge'  # 사이클이 다음 마감을 넘긴 경우 - 'merge': 놓친 마감을 묶어 즉시 1회, 'skip': 다음 마감까지 대기
+
+# 사이클 성능 계측 (단계별 소요 시간 + 엔드포인트별 호출/지연/가중치 → JSON 1줄/사이클 + 텔레그램 요약)
+CYCLE_METRICS_ENABLED = True
+CYCLE_METRICS_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)  # 지연 히스토그램 상한 (초, 초과분은 '+inf')
+
+# 사이클 시세/캔들 병렬 조회 설정
+FUTURES_CONCURRENT_EVAL = True  # False: 순차 조회
+FUTURES_FETCH_WORKERS = 8  # 병렬 조회 스레드 수 (샤드 워커에서는 워커당)
+
+# 심볼 샤딩 (워커 프로세스 N개가 심볼 파티션별 캔들/지표 담당, 원장·슬롯 사이징·주문은 메인 프로세스가 순차 처리)
+FUTURES_SHARD_WORKERS = int(os.getenv('BINANCE_FUTURES_SHARD_WORKERS', '0'))  # 0/1: 단일 프로세스
+FUTURES_SHARD_TIMEOUT = 120  # 샤드 워커 응답 대기 상한 (초) - 초과 시 워커 교체, 해당 심볼은 이번 사이클 오류 처리
+
+# API 요청 가중치 제한 설정 (Spot/Futures 공유 토큰 버킷, X-MBX-USED-WEIGHT 응답 헤더로 보정)
+API_WEIGHT_LIMITS = {'fapi': 2400, 'api': 6000, 'sapi': 12000}  # 풀별 1분당 IP 가중치 한도
+API_WEIGHT_SAFETY = 0.8  # 한도 대비 사용 비율 (수동 조작/타 프로세스 여유분)
+API_RATE_LIMIT_BACKOFF = 60  # 429/418 응답에 Retry-After 가 없을 때 대기 시간 (초)
+
+# API 타임아웃 설정 (스레드 안전 - 워커 스레드에서도 사용, 소수점 초 가능)
+API_REQUEST_TIMEOUT = 10  # ccxt 요청별 소켓 타임아웃 (초)
+API_TIMEOUT_WORKERS = 16  # call_with_timeout 전용 실행 스레드 수
+FUTURES_FETCH_TIMEOUT = 12.5  # 캔들 조회 1회 데드라인 (초)
+
+# 사이클 가격 스냅샷 설정 (fetch_tickers 1회로 전 심볼 최종가 적재)
+FUTURES_PRICE_SNAPSHOT_TTL = 300  # 스냅샷 기본 유효 시간 (초)
+FUTURES_ORDER_PRICE_MAX_AGE = 30  # 진입 주문 사이징에 허용하는 가격 경과 시간 (초)
+
+# 주문 파이프라인 설정 (결정 큐 → 청산 병렬 → 진입 순차 사이징 → 진입 병렬 발주)
+FUTURES_ORDER_PIPELINE = True  # False: 결정 순서대로 순차 주문
+FUTURES_ORDER_WORKERS = 5  # 동시 발주(in-flight) 최대 수
+FUTURES_BATCH_ORDERS = True  # 파이프라인 주문을 batchOrders 로 묶어 전송 (False: 주문별 개별 전송)
+FUTURES_BATCH_SIZE = 5  # batchOrders 1회 최대 주문 수 (바이낸스 제한 5)
+
+# 심볼별 마진 타입/레버리지 캐시 설정 (symbolConfig 1회로 시드, 값이 다를 때만 설정 요청)
+FUTURES_ACCOUNT_CONFIG_TTL = 6 * 60 * 60  # 캐시 재시드 주기 (초) - 수동 변경 반영용
+
+# 사이클 포지션/잔고 원장 설정 (fetch_positions + fetch_balance 1회로 구성)
+FUTURES_LEDGER_MAX_AGE = 1800  # 원장 최대 유효 시간 (초) - 초과 시 REST 직접 조회
+
+# 로컬 캔들 저장소 설정 (SQLite, 마지막 저장 캔들 이후만 since로 증분 조회)
+FUTURES_CANDLE_STORE_ENABLED = True
+FUTURES_OHLCV_MAX_LIMIT = 1500  # fapi klines 1회 최대 개수
+TIMEFRAME_MS = {'4h': 4 * 60 * 60 * 1000, '1d': 24 * 60 * 60 * 1000}
+
+# 실시간 시세 스트림 (WebSocket kline 4h/1d + 전체 마크가격 → 캔들 저장소/가격 스냅샷, REST 는 공백 보충만)
+FUTURES_STREAM_ENABLED = True  # 캔들 저장소 사용 시에만 동작
+FUTURES_STREAM_LIVE_URL = 'wss://fstream.binance.com'
+FUTURES_STREAM_URL = os.getenv('BINANCE_FUTURES_STREAM_URL', FUTURES_STREAM_LIVE_URL)  # 로컬 재생 서버로 교체 가능
+FUTURES_STREAM_TIMEFRAMES = ('4h', '1d')
+FUTURES_STREAM_MAX_STREAMS = 200  # 연결 1개당 최대 스트림 수 (바이낸스 제한)
+FUTURES_STREAM_STALE = 30  # 마지막 수신 후 이 시간(초)이 지나면 스트림 데이터 미사용
+FUTURES_STREAM_HEARTBEAT = 30  # 클라이언트 ping 간격 (초)
+FUTURES_STREAM_FLUSH_INTERVAL = 5  # 마감 캔들 저장소 반영 주기 (초)
+
+# 사용자 데이터 스트림 (listenKey - 포지션/잔고/체결/레버리지를 원장에 실시간 반영, REST 는 주기적 대조만)
+FUTURES_USER_STREAM_ENABLED = True
+FUTURES_LISTEN_KEY_KEEPALIVE = 30 * 60  # listenKey 연장 주기 (초, 60분 미연장 시 만료)
+FUTURES_LEDGER_RECONCILE_INTERVAL = 12 * 60 * 60  # 스트림 원장 REST 대조 주기 (초, 사이클 시작 시 확인)
+FUTURES_FILLS_KEEP = 500  # 보관할 최근 체결 수
+FUTURES_FILL_WAIT = 2.0  # 청산 체결 이벤트 대기 상한 (초) - 실제 체결가/수수료/실현손익으로 청산 결과 교체
+
+# 증분 스토캐스틱 설정 (마감 일봉 상태를 저장해 일봉 1개 추가 시 O(1) 갱신)
+FUTURES_INCREMENTAL_STOCH = True  # False: 지표 엔진 일괄 계산(batch_slow_stochastic) 사용
+
+# 마켓 정보 디스크 캐시 설정 (재시작/재초기화 시 exchangeInfo 재다운로드 생략)
+MARKETS_CACHE_TTL = 6 * 60 * 60  # 캐시 유효 시간 (초)
+MARKETS_REFRESH_MIN_INTERVAL = 300  # 필터 오류로 인한 강제 갱신 최소 간격 (초)
+FUTURES_FILTER_ERROR_CODES = ('-1013', '-1111', '-4003', '-4005', '-4164')  # 수량/가격/최소금액 필터 오류
+
 # 종료 알림 관련 전역 변수
 # ============================================================
 
@@ -90,6 +190,7 @@ SHUTDOWN_SENT = False
 # ============================================================
 # USDS-M Futures 숏 포지션 설정 (롱/숏 우선 최적화 반영 2026-04-30)
 # ============================================================
+# 내장 기본값 - TRADING_CONFIG_FILE 이 있으면 파일 설정이 우선 (reload_trading_configs)
 # CSV 최적화 결과 반영: 코인별 롱우선/숏우선 Winner 파라미터 적용
 # 최적화 미완료 코인은 기존 파라미터 유지 (기본 숏우선)
 # 비용 반영: 수수료 0.04%, 슬리피지 0.05%, 펀딩비 0.01%/8h
@@ -980,46 +1081,331 @@ COIN_PRIORITY = {
 
 
 
-# Futures 전체 거래 코인 수 (숏 코인 수 기준 - 숏/롱 슬롯 공유)
-# 포지션 사이징: 총 자산 / 숏 코인 수(289)로 균등 배분
-TOTAL_FUTURES_COINS = len(SHORT_TRADING_CONFIGS)
+# ============================================================
+# 심볼 설정 레지스트리 (import 시 1회 구성, 읽기 전용)
+# ============================================================
+
+# 심볼별 숏/롱 설정, 우선순위, 스토캐스틱 파라미터, 타임프레임별 최대 조회 캔들 수
+SymbolSpec = namedtuple('SymbolSpec', [
+    'symbol', 'index', 'short_config', 'long_config', 'priority',
+    'short_stoch', 'long_stoch', 'lookback_4h', 'lookback_1d',
+])
+# specs: symbol -> SymbolSpec, symbols: 처리 순서 (숏 설정 순서 → 롱 전용)
+# ma_periods (n×3): 숏 MA, 롱설정 short_ma, long_ma / stoch_params (n×9): 숏 3개 + 롱설정 6개 (없으면 0)
+SymbolRegistry = namedtuple('SymbolRegistry', [
+    'specs', 'symbols', 'short_symbols', 'long_symbols', 'ma_periods', 'stoch_params',
+])
+
+
+def get_required_candle_limits(short_config, long_config):
+    """심볼의 모든 설정이 필요로 하는 최대 캔들 개수 {'4h': n, '1d': n}"""
+    limit_4h = 0
+    limit_1d = 0
+    if short_config:
+        limit_4h = max(limit_4h, short_config['ma_period'] + 10)
+        limit_1d = max(limit_1d, short_config['stoch_k_period'] + short_config['stoch_k_smooth']
+                       + short_config['stoch_d_period'] + 20)
+    if long_config:
+        limit_4h = max(limit_4h, long_config['short_ma'] + 10, long_config['long_ma'] + 10)
+        limit_1d = max(limit_1d,
+                       long_config['short_sk'] + long_config['short_sks'] + long_config['short_sd'] + 20,
+                       long_config['long_sk'] + long_config['long_sks'] + long_config['long_sd'] + 20)
+    return {'4h': limit_4h, '1d': limit_1d}
+
+
+def build_symbol_registry(short_configs, long_configs, priorities):
+    """숏/롱 설정 리스트와 우선순위로 읽기 전용 심볼 레지스트리 구성"""
+    short_map = {cfg['symbol']: MappingProxyType(dict(cfg)) for cfg in short_configs}
+    long_map = {cfg['symbol']: MappingProxyType(dict(cfg)) for cfg in long_configs}
+    symbols = list(short_map)
+    symbols += [symbol for symbol in long_map if symbol not in short_map]
+
+    specs = {}
+    ma_periods = np.zeros((len(symbols), 3), dtype=int)
+    stoch_params = np.zeros((len(symbols), 9), dtype=int)
+    for index, symbol in enumerate(symbols):
+        sc, lc = short_map.get(symbol), long_map.get(symbol)
+        limits = get_required_candle_limits(sc, lc)
+        short_stoch = tuple(_short_stoch_params(sc)) if sc else None
+        long_stoch = tuple(_long_stoch_params(lc)) if lc else None
+        specs[symbol] = SymbolSpec(
+            symbol=symbol,
+            index=index,
+            short_config=sc,
+            long_config=lc,
+            priority=priorities.get(symbol, 'short'),
+            short_stoch=short_stoch,
+            long_stoch=long_stoch,
+            lookback_4h=limits['4h'],
+            lookback_1d=limits['1d'],
+        )
+        ma_periods[index] = [sc['ma_period'] if sc else 0,
+                             lc['short_ma'] if lc else 0, lc['long_ma'] if lc else 0]
+        stoch_params[index, :3] = short_stoch or 0
+        stoch_params[index, 3:] = long_stoch or 0
+    ma_periods.flags.writeable = False
+    stoch_params.flags.writeable = False
+    return SymbolRegistry(
+        specs=MappingProxyType(specs),
+        symbols=tuple(symbols),
+        short_symbols=frozenset(short_map),
+        long_symbols=frozenset(long_map),
+        ma_periods=ma_periods,
+        stoch_params=stoch_params,
+    )
+
+
+def _short_stoch_params(config):
+    return [config['stoch_k_period'], config['stoch_k_smooth'], config['stoch_d_period']]
+
+
+def _long_stoch_params(config):
+    return [config['short_sk'], config['short_sks'], config['short_sd'],
+            config['long_sk'], config['long_sks'], config['long_sd']]
+
+
+SYMBOL_REGISTRY = build_symbol_registry(SHORT_TRADING_CONFIGS, LONG_TRADING_CONFIGS, COIN_PRIORITY)
+
+# Futures 전체 거래 코인 수 (숏 코인 수 기준 - 숏/롱 슬롯 공유, 설정 재적재 시 갱신)
+# 포지션 사이징: 총 자산 / 숏 코인 수로 균등 배분
+TOTAL_FUTURES_COINS = len(SYMBOL_REGISTRY.short_symbols)
+
+_trading_config_stamp = None  # 마지막으로 읽은 설정 파일 (mtime_ns, size)
+
+
+def get_symbol_spec(symbol):
+    """심볼 설정 조회 (O(1)) - 미등록 심볼은 None"""
+    return SYMBOL_REGISTRY.specs.get(symbol)
+
+
+# ============================================================
+# 코인별 설정 파일 (검증 후 레지스트리 교체)
+# ============================================================
+
+SHORT_CONFIG_FIELDS = ('ma_period', 'stoch_k_period', 'stoch_k_smooth', 'stoch_d_period', 'leverage')
+LONG_CONFIG_FIELDS = ('short_ma', 'short_sk', 'short_sks', 'short_sd',
+                      'long_ma', 'long_sk', 'long_sks', 'long_sd', 'long_lev')
+_LEVERAGE_FIELDS = ('leverage', 'long_lev')
+MAX_FUTURES_LEVERAGE = 125
+
+
+def _parse_config_int(value, field, symbol, errors):
+    """설정값을 양의 정수로 변환 (CSV 문자열 '12', 12.0 허용) - 실패 시 errors 에 추가하고 None"""
+    try:
+        number = float(value)
+        if number != int(number):
+            raise ValueError
+        number = int(number)
+    except (TypeError, ValueError, OverflowError):
+        errors.append(f"{symbol}.{field}: 정수가 아님 ({value!r})")
+        return None
+    upper = MAX_FUTURES_LEVERAGE if field in _LEVERAGE_FIELDS else None
+    if number < 1 or (upper and number > upper):
+        errors.append(f"{symbol}.{field}: 범위 밖 ({number})")
+        return None
+    return number
+
+
+def _validate_config_list(configs, fields, side, errors):
+    validated = []
+    seen = set()
+    for cfg in configs:
+        symbol = cfg.get('symbol') if isinstance(cfg, dict) else None
+        if not isinstance(symbol, str) or not symbol.isupper() or not symbol.endswith('USDT'):
+            errors.append(f"[{side}] 잘못된 심볼: {symbol!r}")
+            continue
+        if symbol in seen:
+            errors.append(f"[{side}] 중복 심볼: {symbol}")
+            continue
+        seen.add(symbol)
+        values = {field: _parse_config_int(cfg.get(field), field, symbol, errors) for field in fields}
+        if None not in values.values():
+            validated.append(dict(symbol=symbol, **values))
+    return validated
+
+
+def validate_trading_configs(short_configs, long_configs, priorities):
+    """숏/롱 설정과 우선순위 검증 및 정규화 - 오류가 하나라도 있으면 ValueError"""
+    errors = []
+    short_configs = _validate_config_list(short_configs, SHORT_CONFIG_FIELDS, '숏', errors)
+    long_configs = _validate_config_list(long_configs, LONG_CONFIG_FIELDS, '롱', errors)
+    if not short_configs and not errors:
+        errors.append("숏 설정이 비어 있음 (슬롯 수 기준)")
+    for symbol, priority in priorities.items():
+        if priority not in ('short', 'long'):
+            errors.append(f"{symbol}: 우선순위는 'short'/'long' ({priority!r})")
+    if errors:
+        more = f" 외 {len(errors) - 5}건" if len(errors) > 5 else ""
+        raise ValueError("; ".join(errors[:5]) + more)
+    return short_configs, long_configs, dict(priorities)
+
+
+def read_trading_config_file(path):
+    """설정 파일 읽기 - (short_configs, long_configs, priorities)
+
+    JSON: {"short": [숏 설정...], "long": [롱 설정...], "priority": {"BTCUSDT": "long", ...}}
+    CSV : 심볼당 1행, 열 = symbol, priority, 숏 필드, 롱 필드
+          (ma_period 가 비어 있으면 숏 설정 없음, long_ma 가 비어 있으면 롱 설정 없음)
+    """
+    if path.lower().endswith('.csv'):
+        short_configs, long_configs, priorities = [], [], {}
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                row = {k.strip(): (v or '').strip() for k, v in row.items() if k}
+                symbol = row.get('symbol')
+                if row.get('ma_period'):
+                    short_configs.append({field: row.get(field) for field in ('symbol',) + SHORT_CONFIG_FIELDS})
+                if row.get('long_ma'):
+                    long_configs.append({field: row.get(field) for field in ('symbol',) + LONG_CONFIG_FIELDS})
+                if row.get('priority'):
+                    priorities[symbol] = row['priority']
+        return short_configs, long_configs, priorities
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or not isinstance(data.get('short'), list):
+        raise ValueError("JSON 설정에 'short' 리스트가 없음")
+    return data['short'], data.get('long') or [], data.get('priority') or {}
+
+
+def _stoch_changed_symbols(old_registry, new_registry):
+    """스토캐스틱 파라미터가 바뀌었거나 제거된 심볼 (증분 상태/캐시 무효화 대상)"""
+    changed = set()
+    for symbol, old_spec in old_registry.specs.items():
+        new_spec = new_registry.specs.get(symbol)
+        if (new_spec is None or new_spec.short_stoch != old_spec.short_stoch
+                or new_spec.long_stoch != old_spec.long_stoch):
+            changed.add(symbol)
+    return changed
+
+
+def invalidate_symbol_indicators(symbols):
+    """심볼별 스토캐스틱 캐시/증분 상태 제거 (파라미터가 바뀐 심볼만)"""
+    global _stoch_cache_dirty
+    if not symbols:
+        return
+    with _stoch_cache_lock:
+        for symbol in symbols:
+            if futures_stoch_cache.pop(symbol, None) is not None:
+                _stoch_cache_dirty = True
+            if long_stoch_cache.pop(symbol, None) is not None:
+                _stoch_cache_dirty = True
+    for key in [key for key in futures_stoch_states if key[0] in symbols]:
+        futures_stoch_states.pop(key, None)
+        _stoch_states_dirty.discard(key)
+    if FUTURES_CANDLE_STORE_ENABLED:
+        try:
+            with _candle_store_lock:
+                conn = _get_candle_store()
+                conn.executemany("DELETE FROM stoch_state WHERE symbol = ?", [(s,) for s in symbols])
+                conn.commit()
+        except Exception as e:
+            logging.error(f"스토캐스틱 상태 삭제 중 오류: {e}")
+
+
+def reload_trading_configs(force=False):
+    """설정 파일이 바뀌었으면 검증 후 레지스트리 교체 (사이클 사이에만 호출)
+
+    파일이 없거나 검증에 실패하면 현재 레지스트리를 유지한다.
+    같은 파일(mtime/크기)은 다시 읽지 않으므로 잘못된 파일은 수정될 때까지 한 번만 경고한다.
+    Returns: 레지스트리 교체 여부
+    """
+    global SYMBOL_REGISTRY, TOTAL_FUTURES_COINS, _trading_config_stamp
+    try:
+        stat = os.stat(TRADING_CONFIG_FILE)
+    except FileNotFoundError:
+        return False
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    if stamp == _trading_config_stamp and not force:
+        return False
+    _trading_config_stamp = stamp
+
+    try:
+        configs = validate_trading_configs(*read_trading_config_file(TRADING_CONFIG_FILE))
+        registry = build_symbol_registry(*configs)
+    except Exception as e:
+        logging.error(f"❌ 설정 파일 적용 실패 (기존 설정 유지): {TRADING_CONFIG_FILE} - {e}")
+        send_telegram(f"❌ 설정 파일 적용 실패 (기존 설정 유지)\n{e}")
+        return False
+
+    old_registry = SYMBOL_REGISTRY
+    changed = _stoch_changed_symbols(old_registry, registry)
+    added = set(registry.specs) - set(old_registry.specs)
+    removed = set(old_registry.specs) - set(registry.specs)
+    SYMBOL_REGISTRY = registry
+    TOTAL_FUTURES_COINS = len(registry.short_symbols)
+    invalidate_symbol_indicators(changed)
+    exclude_unrecorded_symbols()
+    if futures_market_stream is not None:
+        start_futures_market_stream()
+    logging.info(
+        f"🔧 설정 파일 적용: 숏 {len(registry.short_symbols)}개 / 롱 {len(registry.long_symbols)}개 "
+        f"(추가 {len(added)}, 제거 {len(removed)}, 스토캐스틱 변경 {len(changed - removed)})"
+    )
+    return True
+
 
 # ============================================================
 # 전역 변수
 # ============================================================
 
-futures_stoch_cache = {}
-futures_stoch_cache_date = None
-long_stoch_cache = {}
+futures_stoch_cache = {}  # symbol -> {'params': [...], 'short_signal', 'slow_k', 'slow_d'}
+futures_stoch_cache_date = None  # 캐시 기준 일봉 마감 시각 (UTC ms)
+long_stoch_cache = {}  # symbol -> {'params': [...], 'short_filter_signal', ..., 'long_slow_d'}
 long_stoch_cache_date = None
+_stoch_cache_lock = threading.Lock()
+_stoch_cache_dirty = False
+futures_stoch_states = {}  # (symbol, (k, k_smooth, d)) -> IncrementalStochastic
+_stoch_states_dirty = set()
 spot_exchange = None  # BNB 충전용 Spot 거래소 연결
 futures_exchange = None
 runtime_excluded_coins = set()
-
-
-
-def _timeout_handler(signum, frame):
-    raise APITimeoutError("API 호출 타임아웃")
+last_futures_order_queue = []  # 직전 사이클 주문 큐 (futures_order_intent 목록 - 재생/점검용)
+futures_price_snapshot = {}  # symbol -> (last_price, fetched_at)
+futures_mark_prices = {}  # symbol -> (mark_price, received_at) - 시세 스트림
+futures_market_stream = None  # FuturesMarketStream (main 에서 시작)
+_price_snapshot_lock = threading.Lock()
+futures_ledger = None  # {'positions': {symbol: pos}, 'balance': {'total', 'free'}, 'built_at': ts, 'live': bool, ...}
+futures_user_stream = None  # FuturesUserDataStream (main 에서 시작)
+futures_shard_pool = None  # FuturesShardPool (main 에서 시작, FUTURES_SHARD_WORKERS > 1)
+_shard_index = None  # 샤드 워커 프로세스 번호 (메인 프로세스는 None)
+_shard_configs = None  # 샤드 워커가 마지막으로 적용한 담당 심볼 설정
+futures_fills = deque(maxlen=FUTURES_FILLS_KEEP)  # 사용자 데이터 스트림 체결 내역 (오래된 순)
+_ledger_lock = threading.Lock()
+futures_candle_cache = {}  # (symbol, timeframe) -> (DataFrame, fetched_limit) - 사이클 단위
+_candle_cache_lock = threading.Lock()
+_candle_store_conn = None
+_candle_store_lock = threading.Lock()
+futures_trading_rules = {}  # 'BTCUSDT' -> {'step', 'min_qty', 'max_qty', 'min_notional', 'tick'} (Decimal)
+_markets_refreshed_at = 0.0
+futures_account_config = {}  # 'BTCUSDT' -> {'margin_type': 'CROSSED', 'leverage': 5}
+_account_config_lock = threading.Lock()
+_account_config_loaded_at = 0.0
+cycle_schedule_stats = {'runs': 0, 'merged': 0, 'skipped': 0, 'last_lag': None, 'max_lag': 0.0, 'last_duration': None}
+_timeout_executor = ThreadPoolExecutor(max_workers=API_TIMEOUT_WORKERS, thread_name_prefix='api-timeout')
+
+
+class APITimeoutError(Exception):
+    """API 호출 타임아웃 에러"""
+    pass
 
 
 def call_with_timeout(func, timeout=30):
-    old_handler = signal.signal(signal.SIGALRM, _timeout_handler)
-    signal.alarm(timeout)
+    """func 를 데드라인(초, 소수 가능) 안에 실행 - 타임아웃/에러 시 None
 
+    전용 스레드 풀 + future.result(timeout) 방식이라 메인 스레드가 아니어도 동작한다.
+    데드라인을 넘긴 호출은 결과만 버리며, 실제 요청은 ccxt 소켓 타임아웃(API_REQUEST_TIMEOUT)으로 끝난다.
+    """
+    future = _timeout_executor.submit(func)
     try:
-        result = func()
-        signal.alarm(0)
-        return result
-    except APITimeoutError:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
         logging.warning(f"API 호출 타임아웃 ({timeout}초)")
         return None
     except Exception as e:
-        signal.alarm(0)
         logging.warning(f"API 호출 중 오류: {e}")
         return None
-    finally:
-        signal.alarm(0)
-        signal.signal(signal.SIGALRM, old_handler)
 
 
 def retry_api_call(func, max_retries=3, delay=2.0, default=None, timeout=30):
@@ -1033,49 +1419,560 @@ def retry_api_call(func, max_retries=3, delay=2.0, default=None, timeout=30):
     return default
 
 
+# ============================================================
+# API 요청 가중치 제한 (Spot/Futures 공유)
+# ============================================================
+
+# 엔드포인트별 요청 가중치 (심볼 미지정 시 가중치, klines 는 limit 구간별)
+_FAPI_WEIGHTS = {
+    'ticker/24hr': (1, 40), 'ticker/price': (1, 2), 'ticker/bookTicker': (2, 5), 'premiumIndex': (1, 10),
+    'positionRisk': 5, 'balance': 5, 'account': 5, 'batchOrders': 5, 'symbolConfig': 5,
+    'userTrades': 5, 'income': 30, 'openOrders': (1, 40), 'allOrders': 5,
+}
+_SPOT_WEIGHTS = {
+    'ticker/24hr': (2, 80), 'ticker/price': (2, 4), 'account': 20, 'exchangeInfo': 20,
+    'klines': 2, 'openOrders': (6, 80), 'myTrades': 20,
+}
+_KLINE_WEIGHT_BY_LIMIT = ((99, 1), (499, 2), (1000, 5))  # 초과 시 10
+
+
+def _api_weight_pool(api):
+    api = api[0] if isinstance(api, (list, tuple)) else str(api)
+    if api.startswith('fapi'):
+        return 'fapi'
+    if api.startswith('sapi'):
+        return 'sapi'
+    return 'api'
+
+
+def endpoint_weight(api, path, params=None):
+    """ccxt 요청(api, path, params)의 바이낸스 요청 가중치"""
+    params = params or {}
+    pool = _api_weight_pool(api)
+    if pool == 'fapi':
+        if path == 'klines' or path.endswith('Klines'):
+            limit = int(params.get('limit', 500))
+            return next((w for bound, w in _KLINE_WEIGHT_BY_LIMIT if limit <= bound), 10)
+        weight = _FAPI_WEIGHTS.get(path, 1)
+    elif pool == 'api':
+        weight = _SPOT_WEIGHTS.get(path, 1)
+    else:
+        weight = 1
+    if isinstance(weight, tuple):
+        weight = weight[0] if params.get('symbol') else weight[1]
+    return weight
+
+
+class WeightRateLimiter:
+    """풀(fapi/api/sapi)별 1분 가중치 토큰 버킷
+
+    - acquire(): 가중치만큼 토큰이 찰 때까지 대기 (여유가 있으면 즉시 통과)
+    - observe(): X-MBX-USED-WEIGHT-1M 헤더의 서버 집계로 남은 토큰을 보정
+    - block(): 429/418 응답 시 Retry-After 동안 해당 풀 전체 대기
+    - share: 같은 IP 를 쓰는 프로세스(샤드 워커)별 한도 비율 - 서버 집계도 같은 비율만큼만 반영
+    """
+
+    def __init__(self, limits, safety=1.0, share=1.0):
+        self.lock = threading.Lock()
+        self.share = share
+        self.capacity = {pool: limit * safety * share for pool, limit in limits.items()}
+        self.rate = {pool: capacity / 60.0 for pool, capacity in self.capacity.items()}
+        self.tokens = dict(self.capacity)
+        self.updated = {pool: time.monotonic() for pool in limits}
+        self.blocked_until = {pool: 0.0 for pool in limits}
+        self.used_weight = {pool: 0 for pool in limits}  # 최근 서버 보고 가중치 (모니터링용)
+
+    def _refill(self, pool, now):
+        elapsed = now - self.updated[pool]
+        self.tokens[pool] = min(self.capacity[pool], self.tokens[pool] + elapsed * self.rate[pool])
+        self.updated[pool] = now
+
+    def acquire(self, pool, weight):
+        weight = min(weight, self.capacity[pool])
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(pool, now)
+                wait = self.blocked_until[pool] - now
+                if wait <= 0:
+                    if self.tokens[pool] >= weight:
+                        self.tokens[pool] -= weight
+                        return
+                    wait = (weight - self.tokens[pool]) / self.rate[pool]
+            time.sleep(wait)
+
+    def observe(self, pool, used_weight):
+        with self.lock:
+            self.used_weight[pool] = used_weight
+            self._refill(pool, time.monotonic())
+            self.tokens[pool] = min(self.tokens[pool], self.capacity[pool] - used_weight * self.share)
+
+    def block(self, pool, seconds):
+        with self.lock:
+            self.blocked_until[pool] = max(self.blocked_until[pool], time.monotonic() + seconds)
+            self.tokens[pool] = min(self.tokens[pool], 0)
+        logging.warning(f"⏳ API 요청 제한 응답 - {pool} {seconds:.0f}초 대기")
+
+
+api_rate_limiter = WeightRateLimiter(API_WEIGHT_LIMITS, API_WEIGHT_SAFETY)
+
+
+def _response_header(headers, name):
+    if not headers:
+        return None
+    for key, value in headers.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def install_rate_limiter(exchange):
+    """ccxt 거래소의 fetch2 를 공유 가중치 제한기로 감싸기 (ccxt 자체 rateLimit 은 끔)"""
+    exchange.enableRateLimit = False
+    fetch2 = exchange.fetch2
+
+    def limited_fetch2(path, api='public', method='GET', params={}, headers=None, body=None, config={}):
+        pool = _api_weight_pool(api)
+        weight = endpoint_weight(api, path, params)
+        queued = time.perf_counter()
+        api_rate_limiter.acquire(pool, weight)
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = fetch2(path, api, method, params, headers, body, config)
+            ok = True
+            return response
+        except (ccxt.RateLimitExceeded, ccxt.DDoSProtection):
+            retry_after = _response_header(exchange.last_response_headers, 'retry-after')
+            api_rate_limiter.block(pool, float(retry_after) if retry_after else API_RATE_LIMIT_BACKOFF)
+            raise
+        finally:
+            metrics = cycle_metrics
+            if metrics is not None:
+                finished = time.perf_counter()
+                metrics.record_request(pool, path, weight, finished - started, started - queued, ok)
+            # 병렬 요청 시 다른 스레드 응답 헤더일 수 있으나 같은 1분 집계값이므로 보정용으로 충분
+            header = 'x-sapi-used-ip-weight-1m' if pool == 'sapi' else 'x-mbx-used-weight-1m'
+            used = _response_header(exchange.last_response_headers, header)
+            if used is not None:
+                api_rate_limiter.observe(pool, int(used))
+
+    exchange.fetch2 = limited_fetch2
+    return exchange
+
+
+# ============================================================
+# 사이클 성능 계측
+# ============================================================
+
+class CycleMetrics:
+    """사이클 1회의 단계별 소요 시간과 API 요청 통계
+
+    - phase(): 단계(snapshot/candles/indicators/decisions/orders/summary 등) 소요 시간 누적 (메인 스레드)
+    - record_request(): fetch2 래퍼에서 호출 - 엔드포인트별 호출/오류 수, 지연 히스토그램, 가중치, 제한기 대기 (워커 스레드 포함)
+    """
+
+    def __init__(self, buckets=CYCLE_METRICS_LATENCY_BUCKETS):
+        self.lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        self.started_at = datetime.fromtimestamp(exchange_time_ms() / 1000, tz=timezone.utc)  # 거래소(모의 포함) 시각
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.endpoints = {}
+        self.weight = {}
+        self.throttle = {}
+        self.latencies = []
+        self.counters = {}
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_request(self, pool, path, weight, seconds, waited, ok):
+        key = f"{pool}:{path}"
+        with self.lock:
+            stat = self.endpoints.get(key)
+            if stat is None:
+                stat = {'count': 0, 'errors': 0, 'seconds': 0.0, 'max': 0.0, 'weight': 0,
+                        'hist': [0] * (len(self.buckets) + 1)}
+                self.endpoints[key] = stat
+            stat['count'] += 1
+            stat['errors'] += 0 if ok else 1
+            stat['seconds'] += seconds
+            stat['max'] = max(stat['max'], seconds)
+            stat['weight'] += weight
+            stat['hist'][next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))] += 1
+            self.weight[pool] = self.weight.get(pool, 0) + weight
+            self.throttle[pool] = self.throttle.get(pool, 0.0) + waited
+            self.latencies.append(seconds)
+
+    def export_requests(self):
+        """단계 소요 시간 + 요청 통계 원본 (샤드 워커 → 코디네이터 합산용, pickle 가능)"""
+        with self.lock:
+            return {
+                'phases': dict(self.phases),
+                'endpoints': {key: dict(stat, hist=list(stat['hist'])) for key, stat in self.endpoints.items()},
+                'weight': dict(self.weight),
+                'throttle': dict(self.throttle),
+                'latencies': list(self.latencies),
+            }
+
+    def merge_requests(self, data):
+        """다른 프로세스(샤드 워커)의 export_requests() 결과를 합산
+
+        샤드 워커는 병렬로 실행되므로 단계 시간은 합이 아닌 최댓값 (가장 느린 샤드 기준)
+        """
+        with self.lock:
+            for name, seconds in data.get('phases', {}).items():
+                self.phases[name] = max(self.phases.get(name, 0.0), seconds)
+            for key, other in data['endpoints'].items():
+                stat = self.endpoints.setdefault(key, {'count': 0, 'errors': 0, 'seconds': 0.0, 'max': 0.0,
+                                                       'weight': 0, 'hist': [0] * (len(self.buckets) + 1)})
+                for field in ('count', 'errors', 'seconds', 'weight'):
+                    stat[field] += other[field]
+                stat['max'] = max(stat['max'], other['max'])
+                stat['hist'] = [a + b for a, b in zip(stat['hist'], other['hist'])]
+            for pool, weight in data['weight'].items():
+                self.weight[pool] = self.weight.get(pool, 0) + weight
+            for pool, waited in data['throttle'].items():
+                self.throttle[pool] = self.throttle.get(pool, 0.0) + waited
+            self.latencies.extend(data['latencies'])
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def to_dict(self):
+        """JSON 직렬화용 사이클 계측 결과"""
+        with self.lock:
+            labels = [str(bound) for bound in self.buckets] + ['+inf']
+            endpoints = {
+                key: {
+                    'count': stat['count'], 'errors': stat['errors'], 'weight': stat['weight'],
+                    'avg': round(stat['seconds'] / stat['count'], 4), 'max': round(stat['max'], 4),
+                    'hist': {label: n for label, n in zip(labels, stat['hist']) if n},
+                }
+                for key, stat in sorted(self.endpoints.items())
+            }
+            latencies = list(self.latencies)
+            return {
+                'cycle_start': self.started_at.isoformat(timespec='seconds'),
+                'duration': round(self.elapsed(), 3),
+                'phases': {name: round(seconds, 3) for name, seconds in self.phases.items()},
+                'requests': len(latencies),
+                'errors': sum(stat['errors'] for stat in self.endpoints.values()),
+                'p50': round(float(np.percentile(latencies, 50)), 4) if latencies else None,
+                'p95': round(float(np.percentile(latencies, 95)), 4) if latencies else None,
+                'weight': dict(self.weight),
+                'server_weight': dict(api_rate_limiter.used_weight),
+                'throttle': {pool: round(seconds, 3) for pool, seconds in self.throttle.items()},
+                'counters': dict(self.counters),
+                'endpoints': endpoints,
+            }
+
+    def summary_lines(self, top=3):
+        """텔레그램 리포트용 요약 (단계별 소요 / 요청 수·가중치·p95 / 가장 오래 걸린 엔드포인트)"""
+        data = self.to_dict()
+        lines = [f"⏱ <b>사이클 {data['duration']:.1f}초</b> ({data['counters'].get('symbols', 0)}심볼)"]
+        if data['phases']:
+            lines.append("  " + " | ".join(f"{name} {seconds:.1f}" for name, seconds in data['phases'].items()))
+        if data['requests']:
+            weight = ", ".join(f"{pool} {w}" for pool, w in sorted(data['weight'].items()))
+            throttle = sum(data['throttle'].values())
+            lines.append(
+                f"  API {data['requests']}회 (오류 {data['errors']}) · 가중치 {weight} · "
+                f"p95 {data['p95']:.2f}초 · 대기 {throttle:.1f}초"
+            )
+            slowest = sorted(data['endpoints'].items(), key=lambda kv: kv[1]['avg'] * kv[1]['count'], reverse=True)
+            for key, stat in slowest[:top]:
+                lines.append(f"  • {key} {stat['count']}회 평균 {stat['avg']:.2f}초")
+        return lines
+
+
+cycle_metrics = None  # 진행 중인 사이클 계측 (CYCLE_METRICS_ENABLED 일 때 trade_strategy 가 생성)
+
+
+def metrics_phase(name):
+    """진행 중인 사이클 계측에 단계 시간 기록 (계측 미사용 시 아무것도 하지 않음)"""
+    return cycle_metrics.phase(name) if cycle_metrics is not None else nullcontext()
+
+
+def write_cycle_metrics(metrics):
+    """사이클 계측 결과를 JSON 1줄로 로그/CYCLE_METRICS_FILE 에 기록"""
+    line = json.dumps(metrics.to_dict(), ensure_ascii=False, separators=(',', ':'))
+    logging.info(f"📈 사이클 계측: {line}")
+    try:
+        with open(CYCLE_METRICS_FILE, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+    except Exception as e:
+        logging.warning(f"사이클 계측 저장 실패: {e}")
+
+
 # ============================================================
 # 거래소 초기화
 # ============================================================
 
+def _markets_hash(markets, currencies):
+    payload = json.dumps([markets, currencies], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_markets_cached(exchange, cache_file, reload=False):
+    """디스크 캐시(TTL 이내)로 마켓 정보 적재, 없거나 만료/손상 시 load_markets() 후 캐시 저장
+
+    Returns: 'cache' 또는 'network'
+    """
+    previous_hash = None
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            previous_hash = data.get('hash')
+            fresh = time.time() - data.get('saved_at', 0) < MARKETS_CACHE_TTL
+            if not reload and fresh and _markets_hash(data['markets'], data.get('currencies')) == previous_hash:
+                exchange.set_markets(data['markets'], data.get('currencies'))
+                if exchange.options.get('adjustForTimeDifference'):
+                    exchange.load_time_difference()
+                return 'cache'
+        except Exception as e:
+            logging.warning(f"마켓 캐시 로드 실패 ({cache_file}): {e}")
+
+    exchange.load_markets(reload=True)
+    try:
+        markets_hash = _markets_hash(exchange.markets, exchange.currencies)
+        data = {
+            'saved_at': time.time(),
+            'hash': markets_hash,
+            'markets': exchange.markets,
+            'currencies': exchange.currencies,
+        }
+        temp_file = cache_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'), default=str)
+        os.replace(temp_file, cache_file)
+        if previous_hash and previous_hash != markets_hash:
+            logging.info(f"📐 마켓 정보 변경 감지 ({os.path.basename(cache_file)})")
+    except Exception as e:
+        logging.warning(f"마켓 캐시 저장 실패 ({cache_file}): {e}")
+    return 'network'
+
+
+def refresh_futures_markets():
+    """필터 오류 시 마켓 정보 강제 갱신 + 주문 규칙 재생성 (최소 간격 내 중복 갱신 생략)"""
+    global _markets_refreshed_at
+    if futures_exchange is None or time.time() - _markets_refreshed_at < MARKETS_REFRESH_MIN_INTERVAL:
+        return False
+    _markets_refreshed_at = time.time()
+    try:
+        load_markets_cached(futures_exchange, FUTURES_MARKETS_CACHE_FILE, reload=True)
+        build_futures_trading_rules()
+        logging.info("🔄 Futures 마켓 정보 갱신 완료 (필터 오류)")
+        return True
+    except Exception as e:
+        logging.error(f"Futures 마켓 정보 갱신 실패: {e}")
+        return False
+
+
+def _handle_order_filter_error(symbol, error):
+    """수량/가격 필터 오류면 마켓 정보 갱신 (다음 주문부터 새 규칙 적용)"""
+    if any(code in str(error) for code in FUTURES_FILTER_ERROR_CODES):
+        logging.warning(f"⚠️ [{symbol}] 주문 필터 오류 - 마켓 정보 갱신 시도")
+        refresh_futures_markets()
+
+
 def init_spot_exchange():
     global spot_exchange
+    if EXECUTION_BACKEND == 'paper':
+        return True  # 모의 Spot 지갑은 init_futures_exchange 에서 함께 생성
     try:
         spot_exchange = ccxt.binance({
             'apiKey': BINANCE_API_KEY,
             'secret': BINANCE_SECRET_KEY,
-            'enableRateLimit': True,
+            'enableRateLimit': False,
+            'timeout': int(API_REQUEST_TIMEOUT * 1000),
             'options': {'defaultType': 'spot'}
         })
-        spot_exchange.load_markets()
-        logging.info("✅ 바이낸스 Spot 거래소 연결 성공")
+        install_rate_limiter(spot_exchange)
+        source = load_markets_cached(spot_exchange, SPOT_MARKETS_CACHE_FILE)
+        logging.info(f"✅ 바이낸스 Spot 거래소 연결 성공 (마켓: {source})")
         return True
     except Exception as e:
         logging.error(f"❌ 바이낸스 Spot 거래소 연결 실패: {e}")
         return False
 
 
+def _new_futures_exchange():
+    """USDS-M Futures ccxt 인스턴스 (공유 가중치 제한기 적용, 마켓 미적재)"""
+    exchange = ccxt.binance({
+        'apiKey': BINANCE_API_KEY,
+        'secret': BINANCE_SECRET_KEY,
+        'enableRateLimit': False,
+        'timeout': int(API_REQUEST_TIMEOUT * 1000),
+        'options': {
+            'defaultType': 'future',
+            'adjustForTimeDifference': True
+        }
+    })
+    return install_rate_limiter(exchange)
+
+
 def init_futures_exchange():
     global futures_exchange
+    if EXECUTION_BACKEND == 'paper':
+        return init_paper_exchange()
     try:
-        futures_exchange = ccxt.binance({
-            'apiKey': BINANCE_API_KEY,
-            'secret': BINANCE_SECRET_KEY,
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'future',
-                'adjustForTimeDifference': True
-            }
-        })
-        futures_exchange.load_markets()
+        futures_exchange = _new_futures_exchange()
+        source = load_markets_cached(futures_exchange, FUTURES_MARKETS_CACHE_FILE)
+        build_futures_trading_rules()
+        load_futures_account_config()
 
         # 마진 타입 설정 (CROSSED)
-        logging.info("✅ 바이낸스 USDS-M Futures 거래소 연결 성공")
+        logging.info(f"✅ 바이낸스 USDS-M Futures 거래소 연결 성공 (마켓: {source})")
         return True
     except Exception as e:
         logging.error(f"❌ 바이낸스 Futures 거래소 연결 실패: {e}")
         return False
 
 
+def init_paper_exchange():
+    """녹화 캔들(PAPER_CANDLE_FILE)로 모의 거래소 생성 후 실행 백엔드 교체 (마켓 정보는 디스크 캐시 재사용)"""
+    try:
+        import binance_paper
+        futures_sim = binance_paper.SimulatedFuturesExchange.from_candle_file(
+            PAPER_CANDLE_FILE, balance=PAPER_INITIAL_BALANCE,
+            markets=binance_paper.load_cached_markets(FUTURES_MARKETS_CACHE_FILE)
+        )
+        use_paper_backend(futures_sim, binance_paper.SimulatedSpotExchange(futures_sim))
+        logging.info(
+            f"🧪 모의 거래소 연결 (녹화 캔들 {len(futures_sim.symbols)}개 심볼, "
+            f"초기 ${PAPER_INITIAL_BALANCE:,.0f}, 상태 {PAPER_STATE_DIR})"
+        )
+        return True
+    except Exception as e:
+        logging.error(f"❌ 모의 거래소 생성 실패 ({PAPER_CANDLE_FILE}): {e}")
+        return False
+
+
+def use_paper_backend(futures_sim, spot_sim=None, state_dir=PAPER_STATE_DIR):
+    """실행 백엔드를 모의 거래소로 교체
+
+    상태 파일(스토캐스틱 캐시/캔들 저장소/계측)은 state_dir 로 분리하고 사이클 간 메모리 상태를 비우며,
+    실시간 시세 스트림과 텔레그램 알림은 끈다. 시뮬레이션 시각은 모의 거래소의 timeDifference 로 전달된다.
+    사용자 데이터 스트림은 FUTURES_STREAM_URL 이 로컬 대체 서버(binance_ws_standin.py serve --user)를
+    가리킬 때만 유지해 재생 이벤트로 원장 경로를 시험한다 (listenKey 는 모의 거래소가 발급).
+    """
+    global EXECUTION_BACKEND, FUTURES_STREAM_ENABLED, FUTURES_USER_STREAM_ENABLED
+    global FUTURES_STOCH_CACHE_FILE, LONG_STOCH_CACHE_FILE, FUTURES_CANDLE_STORE_FILE, CYCLE_METRICS_FILE
+    global futures_exchange, spot_exchange, futures_ledger, _candle_store_conn, _account_config_loaded_at
+    global futures_stoch_cache_date, long_stoch_cache_date, futures_shard_pool, futures_user_stream
+
+    os.makedirs(state_dir, exist_ok=True)
+    EXECUTION_BACKEND = 'paper'
+    if futures_shard_pool is not None:
+        futures_shard_pool.stop()  # 모의 백엔드 전환 시 단일 프로세스로 (워커는 필요 시 다시 시작)
+        futures_shard_pool = None
+    FUTURES_STREAM_ENABLED = False
+    FUTURES_USER_STREAM_ENABLED = FUTURES_USER_STREAM_ENABLED and FUTURES_STREAM_URL != FUTURES_STREAM_LIVE_URL
+    for stream in (futures_market_stream, futures_user_stream):
+        if stream is not None:
+            stream.stop()
+    futures_user_stream = None  # 모의 거래소 listenKey 로 다시 시작
+    FUTURES_STOCH_CACHE_FILE = os.path.join(state_dir, os.path.basename(FUTURES_STOCH_CACHE_FILE))
+    LONG_STOCH_CACHE_FILE = os.path.join(state_dir, os.path.basename(LONG_STOCH_CACHE_FILE))
+    FUTURES_CANDLE_STORE_FILE = os.path.join(state_dir, os.path.basename(FUTURES_CANDLE_STORE_FILE))
+    CYCLE_METRICS_FILE = os.path.join(state_dir, os.path.basename(CYCLE_METRICS_FILE))
+
+    with _candle_store_lock:
+        if _candle_store_conn is not None:
+            _candle_store_conn.close()
+            _candle_store_conn = None
+    with _stoch_cache_lock:
+        futures_stoch_cache.clear()
+        long_stoch_cache.clear()
+        futures_stoch_cache_date = long_stoch_cache_date = None
+        futures_stoch_states.clear()
+        _stoch_states_dirty.clear()
+    futures_ledger = None
+    futures_price_snapshot.clear()
+    clear_futures_candle_cache()
+    runtime_excluded_coins.clear()
+
+    futures_exchange = futures_sim
+    spot_exchange = spot_sim
+    build_futures_trading_rules()
+    _account_config_loaded_at = 0.0
+    load_futures_account_config()
+    exclude_unrecorded_symbols()
+    start_futures_user_stream()
+    return futures_sim
+
+
+def exclude_unrecorded_symbols():
+    """모의 백엔드: 녹화 캔들이 없는 레지스트리 심볼을 런타임 제외 (사이클마다 -1121 Invalid symbol 반복 방지)
+
+    제외된 심볼은 슬롯 수(get_effective_futures_coins)에서도 빠진다.
+    Returns: 새로 제외한 심볼 수
+    """
+    recorded = getattr(futures_exchange, 'symbols', None)
+    if EXECUTION_BACKEND != 'paper' or not recorded:
+        return 0
+    missing = set(SYMBOL_REGISTRY.specs) - set(recorded) - runtime_excluded_coins
+    if missing:
+        runtime_excluded_coins.update(missing)
+        logging.warning(
+            f"⚠️ 녹화 캔들이 없는 심볼 {len(missing)}개 런타임 제외: {', '.join(sorted(missing)[:10])}"
+            f"{' ...' if len(missing) > 10 else ''}"
+        )
+    return len(missing)
+
+
+def _market_filter_decimal(filters, filter_type, key, fallback=None):
+    """exchangeInfo 필터 문자열 값을 Decimal 로 (없으면 fallback)"""
+    value = filters.get(filter_type, {}).get(key)
+    if value is None:
+        value = fallback
+    if value is None:
+        return None
+    return Decimal(str(value))
+
+
+def build_futures_trading_rules():
+    """load_markets() 결과로 심볼별 주문 규칙 테이블 생성 (USDS-M 무기한 선물만)
+
+    시장가 주문 기준이므로 MARKET_LOT_SIZE 를 우선, 없으면 LOT_SIZE / ccxt limits 사용.
+    """
+    global futures_trading_rules
+    rules = {}
+    for market in futures_exchange.markets.values():
+        if not (market.get('swap') and market.get('linear')):
+            continue
+        info = market.get('info') or {}
+        filters = {f.get('filterType'): f for f in info.get('filters', [])}
+        limits = market.get('limits') or {}
+        lot = 'MARKET_LOT_SIZE' if 'MARKET_LOT_SIZE' in filters else 'LOT_SIZE'
+        step = _market_filter_decimal(filters, lot, 'stepSize', (market.get('precision') or {}).get('amount'))
+        if not step or step <= 0:
+            continue
+        rules[market['id']] = {
+            'step': step,
+            'min_qty': _market_filter_decimal(filters, lot, 'minQty', (limits.get('amount') or {}).get('min')) or step,
+            'max_qty': _market_filter_decimal(filters, lot, 'maxQty', (limits.get('amount') or {}).get('max')),
+            'min_notional': _market_filter_decimal(filters, 'MIN_NOTIONAL', 'notional',
+                                                   (limits.get('cost') or {}).get('min')) or Decimal(0),
+            'tick': _market_filter_decimal(filters, 'PRICE_FILTER', 'tickSize', (market.get('precision') or {}).get('price')),
+        }
+    futures_trading_rules = rules
+    logging.info(f"📐 Futures 주문 규칙 {len(rules)}개 심볼 로드")
+    return rules
+
+
 # ============================================================
 # 텔레그램 알림 함수
 # ============================================================
@@ -1084,6 +1981,8 @@ def init_futures_exchange():
 def send_telegram(message):
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         return False
+    if EXECUTION_BACKEND == 'paper':
+        return False  # 모의 거래는 알림 없음 (리포트는 로그/계측 파일로 확인)
 
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
@@ -1095,11 +1994,10 @@ def send_telegram(message):
         return False
 
 
-def send_trade_summary(futures_open_list, futures_close_list,
-                       futures_long_open_list, futures_long_close_list,
-                       futures_total, futures_usdt, errors):
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
+def build_trade_summary(futures_open_list, futures_close_list,
+                        futures_long_open_list, futures_long_close_list,
+                        futures_total, futures_usdt, errors):
+    """거래 종합 리포트 본문 (계측 요약/시각 제외 - send_trade_report() 로 마무리해 전송)"""
     msg = f"📊 <b>Futures 거래 종합 리포트</b>\n"
     msg += f"━━━━━━━━━━━━━━━\n"
 
@@ -1169,7 +2067,18 @@ def send_trade_summary(futures_open_list, futures_close_list,
         for err in errors[:5]:
             msg += f"  • {err}\n"
         msg += f"━━━━━━━━━━━━━━━\n"
+    return msg
+
 
+def send_trade_report(msg, metrics=None):
+    """리포트 본문에 사이클 계측 요약과 시각을 붙여 전송
+
+    계측 요약은 summary 단계가 끝난 뒤 만들어야 JSON 계측 줄과 같은 단계 시간이 표시된다.
+    """
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if metrics is not None:
+        msg += "\n".join(metrics.summary_lines()) + "\n"
+        msg += f"━━━━━━━━━━━━━━━\n"
     msg += f"🕐 {now}"
     send_telegram(msg)
 
@@ -1182,8 +2091,8 @@ def send_start_alert():
     msg += f"📈 Futures 롱: 숏필터 + 롱신호\n"
     msg += f"💰 수수료: 0.06% (Futures)\n"
     msg += f"🔶 BNB 자동충전 (Spot경유 → Futures)\n"
-    msg += f"🔻 Futures 숏: {len(SHORT_TRADING_CONFIGS)}개\n"
-    msg += f"🟢 Futures 롱: {len(LONG_TRADING_CONFIGS)}개\n"
+    msg += f"🔻 Futures 숏: {len(SYMBOL_REGISTRY.short_symbols)}개\n"
+    msg += f"🟢 Futures 롱: {len(SYMBOL_REGISTRY.long_symbols)}개\n"
     msg += f"📊 Futures 총 슬롯: {get_effective_futures_coins()}개 (제외 {TOTAL_FUTURES_COINS - get_effective_futures_coins()}개)\n"
     msg += f"━━━━━━━━━━━━━━━\n"
     msg += f"🕐 {now}"
@@ -1271,13 +2180,30 @@ def get_usdt_balance():
 # ============================================================
 
 
-def get_futures_balance():
-    """Futures 지갑 잔고 조회"""
+def _parse_futures_balance(balance):
+    """ccxt fetch_balance 응답에서 USDT total/free 추출"""
+    usdt_total = float(balance.get('USDT', {}).get('total', 0))
+    usdt_free = float(balance.get('USDT', {}).get('free', 0))
+    return {'total': usdt_total, 'free': usdt_free}
+
+
+def get_futures_balance(fresh=False):
+    """Futures 지갑 잔고 조회
+
+    사이클 원장이 있으면 원장 값을 반환한다. fresh=True 이면 항상 REST로 새로 조회하고
+    사이클 원장 잔고도 함께 맞춘다 (사이클 종료 후 최종 자산 확인용).
+    사용자 데이터 스트림으로 갱신 중인 원장은 이벤트 증분으로 유지되므로 덮어쓰지 않는다.
+    """
+    ledger = _active_futures_ledger()
+    if ledger is not None and not fresh:
+        with _ledger_lock:
+            return dict(ledger['balance'])
     try:
-        balance = futures_exchange.fetch_balance()
-        usdt_total = float(balance.get('USDT', {}).get('total', 0))
-        usdt_free = float(balance.get('USDT', {}).get('free', 0))
-        return {'total': usdt_total, 'free': usdt_free}
+        result = _parse_futures_balance(futures_exchange.fetch_balance())
+        if ledger is not None and not ledger.get('live'):
+            with _ledger_lock:
+                ledger['balance'] = dict(result)
+        return result
     except Exception as e:
         logging.error(f"Futures 잔고 조회 중 오류: {e}")
         return {'total': 0, 'free': 0}
@@ -1398,27 +2324,246 @@ def check_and_recharge_futures_bnb():
         return None
 
 
+def _fetch_futures_ohlcv_rows(symbol, timeframe, limit, since=None):
+    """Futures OHLCV 원본 행 조회 (3회 재시도, 시도당 FUTURES_FETCH_TIMEOUT) - [[ts, o, h, l, c, v], ...] 또는 None"""
+    if since is None:
+        fetch = lambda: futures_exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+    else:
+        fetch = lambda: futures_exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+    rows = retry_api_call(fetch, max_retries=3, delay=1.0, timeout=FUTURES_FETCH_TIMEOUT)
+    if rows is None:
+        logging.error(f"Futures {symbol} {timeframe} OHLCV 조회 실패")
+    return rows
+
+
+def _ohlcv_rows_to_df(rows):
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
+
 def fetch_futures_ohlcv(symbol, timeframe, limit):
     """Futures OHLCV 데이터 조회"""
-    for retry in range(3):
-        try:
-            ohlcv = futures_exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-            df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            return df
-        except Exception as e:
-            if retry < 2:
-                time.sleep(1)
-            else:
-                logging.error(f"Futures {symbol} OHLCV 조회 실패: {e}")
-                return None
-    return None
+    rows = _fetch_futures_ohlcv_rows(symbol, timeframe, limit)
+    if rows is None:
+        return None
+    return _ohlcv_rows_to_df(rows)
+
+
+# ============================================================
+# 로컬 캔들 저장소 (SQLite)
+# ============================================================
+
+def _get_candle_store():
+    """캔들 저장소 연결 (최초 호출 시 생성 + 스키마 준비)"""
+    global _candle_store_conn
+    if _candle_store_conn is None:
+        conn = sqlite3.connect(FUTURES_CANDLE_STORE_FILE, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS candles ("
+            " symbol TEXT, timeframe TEXT, ts INTEGER,"
+            " open REAL, high REAL, low REAL, close REAL, volume REAL,"
+            " PRIMARY KEY (symbol, timeframe, ts)) WITHOUT ROWID"
+        )
+        # full_limit: 전체 조회로 요청한 최대 개수 (상장 기간이 짧아 덜 받은 경우 재조회 방지)
+        # verified_from/verified_to: 마지막 전체 조회 구간 - 그 안의 공백은 거래소 실제 공백 (재조회 생략)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS candle_meta ("
+            " symbol TEXT, timeframe TEXT, full_limit INTEGER,"
+            " verified_from INTEGER DEFAULT 0, verified_to INTEGER DEFAULT 0,"
+            " PRIMARY KEY (symbol, timeframe))"
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(candle_meta)")}
+        for column in ('verified_from', 'verified_to'):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE candle_meta ADD COLUMN {column} INTEGER DEFAULT 0")
+        # 증분 스토캐스틱 상태 (IncrementalStochastic.to_dict() JSON)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS stoch_state ("
+            " symbol TEXT, params TEXT, state TEXT,"
+            " PRIMARY KEY (symbol, params))"
+        )
+        conn.commit()
+        _candle_store_conn = conn
+    return _candle_store_conn
+
+
+def load_stored_candles(symbol, timeframe, limit):
+    """저장소에서 최근 limit개 캔들 행 조회 (오래된 순)"""
+    with _candle_store_lock:
+        conn = _get_candle_store()
+        rows = conn.execute(
+            "SELECT ts, open, high, low, close, volume FROM candles"
+            " WHERE symbol = ? AND timeframe = ? ORDER BY ts DESC LIMIT ?",
+            (symbol, timeframe, limit)
+        ).fetchall()
+        meta = conn.execute(
+            "SELECT full_limit FROM candle_meta WHERE symbol = ? AND timeframe = ?",
+            (symbol, timeframe)
+        ).fetchone()
+    rows.reverse()
+    return [list(r) for r in rows], (meta[0] if meta else 0)
+
+
+def save_stored_candles(symbol, timeframe, rows, full_limit=None):
+    """캔들 행 저장 (같은 ts는 덮어씀 - 미완성 캔들 갱신)
+
+    full_limit 이 있으면 전체 조회 결과로 보고 요청 개수와 조회 구간(verified_from/verified_to)을 기록한다.
+    """
+    with _candle_store_lock:
+        conn = _get_candle_store()
+        conn.executemany(
+            "INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(symbol, timeframe, int(r[0]), r[1], r[2], r[3], r[4], r[5]) for r in rows]
+        )
+        if full_limit is not None:
+            verified = (int(rows[0][0]), int(rows[-1][0])) if rows else (0, 0)
+            conn.execute(
+                "INSERT INTO candle_meta (symbol, timeframe, full_limit, verified_from, verified_to)"
+                " VALUES (?, ?, ?, ?, ?) ON CONFLICT(symbol, timeframe) DO UPDATE SET"
+                " full_limit = MAX(full_limit, excluded.full_limit),"
+                " verified_from = excluded.verified_from, verified_to = excluded.verified_to",
+                (symbol, timeframe, full_limit, *verified)
+            )
+        conn.commit()
+
+
+def candles_contiguous(rows, tf_ms, verified=None):
+    """캔들 행의 시작 시각이 모두 정확히 tf_ms 간격인지 (누락/중복 캔들 없음)
+
+    verified: (from, to) - 이 구간 안의 간격은 검사하지 않음 (전체 조회로 확인된 거래소 실제 공백)
+    """
+    for a, b in zip(rows, rows[1:]):
+        if int(b[0]) - int(a[0]) == tf_ms:
+            continue
+        if verified is not None and verified[0] <= int(a[0]) and int(b[0]) <= verified[1]:
+            continue
+        return False
+    return True
+
+
+def load_candle_verified_range(symbol, timeframe):
+    """마지막 전체 조회 구간 (from, to) - 없으면 None"""
+    with _candle_store_lock:
+        row = _get_candle_store().execute(
+            "SELECT verified_from, verified_to FROM candle_meta WHERE symbol = ? AND timeframe = ?",
+            (symbol, timeframe)
+        ).fetchone()
+    return (row[0] or 0, row[1] or 0) if row else None
+
+
+def fetch_futures_ohlcv_incremental(symbol, timeframe, limit):
+    """저장소 + 증분 조회로 최근 limit개 캔들 행 반환 (fetch_futures_ohlcv와 동일한 구간)
+
+    마지막 저장 캔들(미완성일 수 있음)부터 since로 새 캔들만 받아 덮어쓰고,
+    저장 이력이 부족하거나 공백이 너무 길면 limit 전체를 다시 받는다.
+    병합 결과에 빠진 캔들이 있으면 (장기 중단 후 재시작, 더 큰 limit 요청 등) 전체 조회로 대체한다.
+    전체 조회 결과에도 있는 공백은 거래소 실제 공백이므로 기록해 두고 다시 조회하지 않는다.
+    """
+    stored, full_limit = load_stored_candles(symbol, timeframe, limit)
+    tf_ms = TIMEFRAME_MS.get(timeframe)
+    now_ms = exchange_time_ms()
+
+    need_full = (
+        not stored
+        or tf_ms is None
+        or (len(stored) < limit and full_limit < limit)
+    )
+    if not need_full:
+        last_ts = int(stored[-1][0])
+        missing = (now_ms - last_ts) // tf_ms + 1
+        if missing + 1 > min(limit, FUTURES_OHLCV_MAX_LIMIT):
+            need_full = True
+
+    if need_full:
+        rows = _fetch_futures_ohlcv_rows(symbol, timeframe, limit)
+        if rows is None:
+            return None
+        save_stored_candles(symbol, timeframe, rows, full_limit=limit)
+        return rows[-limit:]
+
+    new_rows = _fetch_futures_ohlcv_rows(symbol, timeframe, int(missing + 1), since=last_ts)
+    if new_rows is None:
+        return None
+    if new_rows:
+        save_stored_candles(symbol, timeframe, new_rows)
+        merged = {int(r[0]): r for r in stored}
+        for r in new_rows:
+            merged[int(r[0])] = list(r)
+        stored = [merged[ts] for ts in sorted(merged)]
+    rows = stored[-limit:]
+    if not candles_contiguous(rows, tf_ms) and not candles_contiguous(
+            rows, tf_ms, verified=load_candle_verified_range(symbol, timeframe)):
+        logging.warning(f"{symbol} {timeframe} 저장 캔들 공백 감지 → 전체 조회")
+        rows = _fetch_futures_ohlcv_rows(symbol, timeframe, limit)
+        if rows is None:
+            return None
+        save_stored_candles(symbol, timeframe, rows, full_limit=limit)
+        return rows[-limit:]
+    return rows
+
+
+def get_futures_candle_array(symbol, timeframe, limit):
+    """사이클 캔들 캐시에서 최근 limit개 캔들 배열 반환 ((symbol, timeframe)당 1회 다운로드)
+
+    배열 열 순서: timestamp(ms), open, high, low, close, volume
+    캐시가 없거나 요청 limit보다 작은 창으로 받아둔 경우에만 새로 조회한다.
+    시세 스트림이 연속 수신 중이면 저장소 + 진행 중 캔들로 구성하고 네트워크 조회는 생략한다.
+    prefetch_futures_candles()로 사이클 시작 시 최대 창을 미리 받아두면
+    MA/스토캐스틱 계산은 모두 같은 배열을 잘라서 사용한다.
+    """
+    key = (symbol, timeframe)
+    cached = futures_candle_cache.get(key)
+    if cached is None or cached[1] < limit:
+        stream = futures_market_stream
+        rows = stream.candle_rows(symbol, timeframe, limit) if stream is not None else None
+        if rows is None and FUTURES_CANDLE_STORE_ENABLED:
+            # REST 증분 조회 = 스트림 공백 보충
+            started = time.time()
+            rows = fetch_futures_ohlcv_incremental(symbol, timeframe, limit)
+            if rows is not None and stream is not None:
+                stream.mark_synced(symbol, timeframe, started)
+        elif rows is None:
+            rows = _fetch_futures_ohlcv_rows(symbol, timeframe, limit)
+        if rows is None:
+            return None
+        arr = np.asarray(rows, dtype=float).reshape(-1, 6)
+        with _candle_cache_lock:
+            futures_candle_cache[key] = (arr, limit)
+        cached = (arr, limit)
+    return cached[0][-limit:]
+
+
+def get_futures_candles(symbol, timeframe, limit):
+    """get_futures_candle_array()의 DataFrame 버전 (단일 심볼 계산용)"""
+    arr = get_futures_candle_array(symbol, timeframe, limit)
+    if arr is None:
+        return None
+    return _ohlcv_rows_to_df(arr)
+
+
+def clear_futures_candle_cache():
+    """사이클 캔들 캐시 초기화 (사이클 시작 시 호출)"""
+    with _candle_cache_lock:
+        futures_candle_cache.clear()
+
+
+def prefetch_futures_candles(spec):
+    """심볼의 4h/1d 캔들을 필요한 최대 창(레지스트리 lookback)으로 1회씩 다운로드해 캐시에 적재
+
+    스토캐스틱이 현재 일봉 기준으로 캐시되어 있으면 1d 다운로드는 생략한다.
+    """
+    if spec.lookback_4h > 0:
+        get_futures_candle_array(spec.symbol, '4h', spec.lookback_4h)
+    if spec.lookback_1d > 0 and not is_stoch_cache_fresh(spec):
+        get_futures_candle_array(spec.symbol, '1d', spec.lookback_1d)
 
 
 def get_futures_ma_price(symbol, period):
     """Futures MA 가격 계산"""
     try:
-        df = fetch_futures_ohlcv(symbol, '4h', period + 10)
+        df = get_futures_candles(symbol, '4h', period + 10)
         if df is None or len(df) < period:
             return None
         return float(df['close'].tail(period).mean())
@@ -1427,11 +2572,52 @@ def get_futures_ma_price(symbol, period):
         return None
 
 
-def get_futures_current_price(symbol):
-    """Futures 현재가 조회"""
+def refresh_futures_price_snapshot():
+    """전체 Futures 최종가 일괄 조회 (fetch_tickers 1회) 후 스냅샷 교체
+
+    Returns: 적재된 심볼 수 (실패 시 0 - 이후 조회는 심볼별 fetch_ticker로 대체)
+    """
+    stream = futures_market_stream
+    if stream is not None and stream.is_live():
+        logging.info(f"💹 가격 스냅샷: 시세 스트림 사용 ({len(futures_price_snapshot)}개 심볼)")
+        return len(futures_price_snapshot)
+    try:
+        tickers = futures_exchange.fetch_tickers()
+        fetched_at = time.time()
+        snapshot = {}
+        for ticker in tickers.values():
+            last = _safe_float(ticker.get('last'), default=None)
+            info = ticker.get('info') if isinstance(ticker.get('info'), dict) else {}
+            symbol = info.get('symbol') or _normalize_symbol(ticker.get('symbol') or '')
+            if symbol and last:
+                snapshot[symbol] = (last, fetched_at)
+        with _price_snapshot_lock:
+            futures_price_snapshot.clear()
+            futures_price_snapshot.update(snapshot)
+        logging.info(f"💹 가격 스냅샷 갱신: {len(snapshot)}개 심볼")
+        return len(snapshot)
+    except Exception as e:
+        logging.error(f"Futures 가격 스냅샷 조회 중 오류: {e}")
+        return 0
+
+
+def get_futures_current_price(symbol, max_age=None):
+    """Futures 현재가 조회 (가격 스냅샷 우선)
+
+    max_age: 허용 경과 시간(초). 스냅샷 가격이 이보다 오래되면 fetch_ticker로 새로 조회.
+             None이면 FUTURES_PRICE_SNAPSHOT_TTL 적용.
+    """
+    if max_age is None:
+        max_age = FUTURES_PRICE_SNAPSHOT_TTL
+    cached = futures_price_snapshot.get(symbol)
+    if cached is not None and time.time() - cached[1] <= max_age:
+        return cached[0]
     try:
         ticker = futures_exchange.fetch_ticker(symbol)
-        return float(ticker['last'])
+        price = float(ticker['last'])
+        with _price_snapshot_lock:
+            futures_price_snapshot[symbol] = (price, time.time())
+        return price
     except Exception as e:
         logging.error(f"Futures {symbol} 현재가 조회 중 오류: {e}")
         return None
@@ -1464,57 +2650,434 @@ def calculate_stochastic(df, k_period, k_smooth, d_period):
 
 
 
-def get_futures_stochastic_signal(symbol):
-    """Futures 스토캐스틱 신호 조회"""
-    # 캐시 사용하지 않고 최신 값 계산
-    config = next((c for c in SHORT_TRADING_CONFIGS if c['symbol'] == symbol), None)
-    if not config:
-        return None
-    try:
-        k_period = config['stoch_k_period']
-        k_smooth = config['stoch_k_smooth']
-        d_period = config['stoch_d_period']
-        required_count = k_period + k_smooth + d_period + 20
-        df = fetch_futures_ohlcv(symbol, '1d', required_count)
-        if df is None:
-            return None
-        slow_k, slow_d = calculate_stochastic(df, k_period, k_smooth, d_period)
-        if slow_k is None or slow_d is None:
-            return None
-        return {
-            'short_signal': bool(slow_k < slow_d),
-            'slow_k': slow_k,
-            'slow_d': slow_d
-        }
-    except Exception as e:
-        logging.error(f"Futures {symbol} 스토캐스틱 계산 중 오류: {e}")
-        return None
-
-
 # ============================================================
-# Long 스토캐스틱 캐시 관리
+# 실시간 시세 스트림 (WebSocket)
 # ============================================================
 
+def _stream_kline_row(k):
+    return [int(k['t']), float(k['o']), float(k['h']), float(k['l']), float(k['c']), float(k['v'])]
 
-def get_long_stochastic_signal(symbol):
-    """Long 스토캐스틱 신호 조회"""
-    # 캐시 사용하지 않고 최신 값 계산
-    config = next((c for c in LONG_TRADING_CONFIGS if c['symbol'] == symbol), None)
-    if not config:
-        return None
-    try:
-        short_k_period = config['short_sk']
-        short_k_smooth = config['short_sks']
-        short_d_period = config['short_sd']
-        long_k_period = config['long_sk']
+
+class _StreamThread:
+    """전용 스레드의 asyncio 루프에서 _main() 을 실행하는 스트림 수신기 공통부"""
+
+    thread_name = 'stream'
+
+    def __init__(self):
+        self.loop = None
+        self.thread = None
+        self._task = None
+        self._stopping = False
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stopping = True
+        if self.loop is not None and self._task is not None:
+            self.loop.call_soon_threadsafe(self._task.cancel)
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._main())
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logging.error(f"{self.thread_name} 스트림 종료: {e}")
+        finally:
+            self.loop.close()
+
+    async def _main(self):
+        raise NotImplementedError
+
+
+class FuturesMarketStream(_StreamThread):
+    """USDS-M 결합 스트림(kline + !markPrice@arr) 수신기 - 전용 스레드의 asyncio 루프에서 실행
+
+    - kline: 진행 중 캔들은 메모리(forming), 마감 캔들(x=true)은 캔들 저장소에 적재, 종가로 가격 스냅샷 갱신
+    - !markPrice@arr@1s: futures_mark_prices 갱신
+    - (symbol, timeframe)은 연결 이후 시작한 REST 증분 조회로 공백을 보충한 뒤에만 메모리 경로(candle_rows)에
+      사용되며, 연결이 끊기면 다시 보충 대상이 된다.
+    """
+
+    thread_name = 'futures-stream'
+
+    def __init__(self, url, symbols, timeframes=FUTURES_STREAM_TIMEFRAMES):
+        super().__init__()
+        self.url = url.rstrip('/')
+        self.symbols = tuple(symbols)
+        self.timeframes = tuple(timeframes)
+        self.lock = threading.Lock()
+        self.forming = {}  # (symbol, timeframe) -> 진행 중 캔들 행
+        self.pending_closed = []  # 저장소 미반영 마감 캔들 [((symbol, timeframe), 행)]
+        self.synced = set()  # REST 보충 이후 연속 수신 중인 (symbol, timeframe)
+        self.connected_at = {}  # 연결 번호 -> 연결 시각 (끊기면 제거)
+        self.last_message_at = 0.0
+        self.stats = {'messages': 0, 'reconnects': 0, 'memory_hits': 0, 'backfills': 0}
+
+        streams = ['!markPrice@arr@1s'] + [
+            f"{symbol.lower()}@kline_{timeframe}" for symbol in self.symbols for timeframe in self.timeframes
+        ]
+        self.shards = [streams[i:i + FUTURES_STREAM_MAX_STREAMS]
+                       for i in range(0, len(streams), FUTURES_STREAM_MAX_STREAMS)]
+        self.shard_of = {}  # (symbol, timeframe) -> 연결 번호
+        for index, shard in enumerate(self.shards):
+            for symbol in self.symbols:
+                for timeframe in self.timeframes:
+                    if f"{symbol.lower()}@kline_{timeframe}" in shard:
+                        self.shard_of[(symbol, timeframe)] = index
+
+    def stop(self, timeout=5):
+        super().stop(timeout)
+        self.flush()
+
+    async def _main(self):
+        async with aiohttp.ClientSession() as session:
+            self._task = asyncio.gather(
+                self._flusher(),
+                *(self._consume(session, index, shard) for index, shard in enumerate(self.shards))
+            )
+            await self._task
+
+    async def _flusher(self):
+        while True:
+            await asyncio.sleep(FUTURES_STREAM_FLUSH_INTERVAL)
+            await self.loop.run_in_executor(None, self.flush)
+
+    async def _consume(self, session, index, streams):
+        url = f"{self.url}/stream?streams={'/'.join(streams)}"
+        keys = {key for key, shard in self.shard_of.items() if shard == index}
+        delay = 1
+        while not self._stopping:
+            try:
+                async with session.ws_connect(url, heartbeat=FUTURES_STREAM_HEARTBEAT) as ws:
+                    with self.lock:
+                        self.connected_at[index] = time.time()
+                    delay = 1
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self._on_message(json.loads(msg.data))
+                        elif msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"📡 시세 스트림 {index} 연결 오류: {e}")
+            with self.lock:
+                self.connected_at.pop(index, None)
+                self.synced -= keys
+                for key in keys:
+                    self.forming.pop(key, None)
+            if self._stopping:
+                break
+            self.stats['reconnects'] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    def _on_message(self, message):
+        data = message.get('data', message) if isinstance(message, dict) else message
+        now = time.time()
+        self.last_message_at = now
+        self.stats['messages'] += 1
+        if isinstance(data, list):
+            marks = {item['s']: (float(item['p']), now) for item in data if item.get('e') == 'markPriceUpdate'}
+            with _price_snapshot_lock:
+                futures_mark_prices.update(marks)
+            return
+        if not isinstance(data, dict) or data.get('e') != 'kline':
+            return
+        k = data['k']
+        key = (data['s'], k['i'])
+        row = _stream_kline_row(k)
+        with self.lock:
+            if k['x']:
+                self.pending_closed.append((key, row))
+                forming = self.forming.get(key)
+                if forming is not None and forming[0] <= row[0]:
+                    del self.forming[key]
+            else:
+                self.forming[key] = row
+        if k['i'] == self.timeframes[0]:
+            with _price_snapshot_lock:
+                futures_price_snapshot[data['s']] = (row[4], now)
+
+    def flush(self):
+        """수신한 마감 캔들을 캔들 저장소에 반영"""
+        with self.lock:
+            pending, self.pending_closed = self.pending_closed, []
+        by_key = {}
+        for key, row in pending:
+            by_key.setdefault(key, []).append(row)
+        for (symbol, timeframe), rows in by_key.items():
+            try:
+                save_stored_candles(symbol, timeframe, rows)
+            except Exception as e:
+                logging.error(f"{symbol} {timeframe} 스트림 캔들 저장 중 오류: {e}")
+
+    def is_live(self):
+        """모든 연결이 살아 있고 최근 FUTURES_STREAM_STALE 초 안에 수신했는지"""
+        return (len(self.connected_at) == len(self.shards)
+                and time.time() - self.last_message_at <= FUTURES_STREAM_STALE)
+
+    def candle_rows(self, symbol, timeframe, limit):
+        """저장소 + 진행 중 캔들로 최근 limit개 행 구성 (네트워크 없음) - 연속성을 보장할 수 없으면 None"""
+        key = (symbol, timeframe)
+        with self.lock:
+            forming = self.forming.get(key)
+            synced = key in self.synced
+        if not synced or forming is None or not self.is_live():
+            return None
+        self.flush()
+        rows = _stream_candle_rows(symbol, timeframe, limit, forming)
+        if rows is not None:
+            self.stats['memory_hits'] += 1
+        return rows
+
+    def export_forming(self, symbols):
+        """샤드 워커에 넘길 진행 중 캔들 {(symbol, timeframe): 행} - 보충 완료된 키만, 마감 캔들은 저장소에 먼저 반영"""
+        if not self.is_live():
+            return {}
+        self.flush()
+        wanted = set(symbols)
+        with self.lock:
+            return {key: list(row) for key, row in self.forming.items() if key in self.synced and key[0] in wanted}
+
+    def mark_synced(self, symbol, timeframe, fetch_started):
+        """REST 증분 조회가 해당 연결 이후 시작됐으면 공백 보충 완료로 등록"""
+        key = (symbol, timeframe)
+        self.stats['backfills'] += 1
+        with self.lock:
+            connected = self.connected_at.get(self.shard_of.get(key))
+            if connected is not None and connected <= fetch_started:
+                self.synced.add(key)
+
+
+def _stream_candle_rows(symbol, timeframe, limit, forming):
+    """마감 캔들(저장소) + 스트림 진행 중 캔들로 최근 limit개 행 - 현재 구간이 아니거나 이어지지 않으면 None"""
+    tf_ms = TIMEFRAME_MS.get(timeframe)
+    if tf_ms is None or forming[0] != exchange_time_ms() // tf_ms * tf_ms:
+        return None
+    stored, full_limit = load_stored_candles(symbol, timeframe, limit)
+    closed = [r for r in stored if r[0] < forming[0]]
+    if not closed or closed[-1][0] != forming[0] - tf_ms:
+        return None
+    rows = closed + [list(forming)]
+    if len(rows) < limit and full_limit < limit:
+        return None
+    return rows[-limit:]
+
+
+class ShardStreamView:
+    """샤드 워커의 시세 스트림 대용 - 코디네이터 FuturesMarketStream 의 요청 시점 상태
+
+    진행 중 캔들은 요청으로, 마감 캔들은 공유 캔들 저장소로 받아 FuturesMarketStream 과 같은 규칙으로
+    행을 구성하고, 워커의 REST 보충(mark_synced)은 응답으로 돌려보내 코디네이터 스트림에 등록한다.
+    """
+
+    def __init__(self, forming):
+        self.forming = forming  # (symbol, timeframe) -> 진행 중 캔들 행 (보충 완료된 키만)
+        self.backfills = []  # [(symbol, timeframe, 조회 시작 시각)]
+        self.memory_hits = 0
+
+    def candle_rows(self, symbol, timeframe, limit):
+        forming = self.forming.get((symbol, timeframe))
+        rows = _stream_candle_rows(symbol, timeframe, limit, forming) if forming is not None else None
+        if rows is not None:
+            self.memory_hits += 1
+        return rows
+
+    def mark_synced(self, symbol, timeframe, fetch_started):
+        self.backfills.append((symbol, timeframe, fetch_started))
+
+
+def start_futures_market_stream():
+    """레지스트리 심볼로 시세 스트림 시작 (심볼 구성이 같으면 기존 스트림 유지)"""
+    global futures_market_stream
+    if not (FUTURES_STREAM_ENABLED and FUTURES_CANDLE_STORE_ENABLED):
+        return None
+    symbols = tuple(s for s in SYMBOL_REGISTRY.symbols if s not in FUTURES_EXCLUDED_COINS)
+    if futures_market_stream is not None:
+        if futures_market_stream.symbols == symbols:
+            return futures_market_stream
+        futures_market_stream.stop()
+    futures_market_stream = FuturesMarketStream(FUTURES_STREAM_URL, symbols).start()
+    logging.info(
+        f"📡 시세 스트림 시작: {len(symbols)}개 심볼 × {len(FUTURES_STREAM_TIMEFRAMES)}개 타임프레임, "
+        f"연결 {len(futures_market_stream.shards)}개 ({FUTURES_STREAM_URL})"
+    )
+    return futures_market_stream
+
+
+# ============================================================
+# 스토캐스틱 캐시 관리 (UTC 일봉 마감 기준)
+# ============================================================
+
+def current_daily_close_ts():
+    """가장 최근 UTC 일봉 마감 시각 (= 진행 중 일봉 시작 시각, ms)"""
+    return exchange_time_ms() // TIMEFRAME_MS['1d'] * TIMEFRAME_MS['1d']
+
+
+def closed_daily_candles(rows):
+    """일봉 배열에서 마감된 일봉만 (시작 시각이 current_daily_close_ts() 이후인 진행 중 일봉 제외)
+
+    스토캐스틱 캐시는 하루 동안 유지되므로 그날 값은 마감 일봉만으로 계산한다.
+    """
+    if rows is None:
+        return None
+    return rows[rows[:, 0] < current_daily_close_ts()]
+
+
+def _get_cached_stoch(cache, cache_date, symbol, params):
+    """캐시가 현재 일봉 기준이고 파라미터가 같으면 신호 dict 반환, 아니면 None"""
+    entry = cache.get(symbol)
+    if cache_date != current_daily_close_ts() or not entry or entry.get('params') != list(params):
+        return None
+    return {k: v for k, v in entry.items() if k != 'params'}
+
+
+def _store_cached_stoch(kind, symbol, params, result):
+    """스토캐스틱 결과를 캐시에 저장 (일봉이 바뀌었으면 해당 캐시 전체 초기화)"""
+    global futures_stoch_cache_date, long_stoch_cache_date, _stoch_cache_dirty
+    key = current_daily_close_ts()
+    with _stoch_cache_lock:
+        if kind == 'short':
+            if futures_stoch_cache_date != key:
+                futures_stoch_cache.clear()
+                futures_stoch_cache_date = key
+            futures_stoch_cache[symbol] = dict(result, params=list(params))
+        else:
+            if long_stoch_cache_date != key:
+                long_stoch_cache.clear()
+                long_stoch_cache_date = key
+            long_stoch_cache[symbol] = dict(result, params=list(params))
+        _stoch_cache_dirty = True
+
+
+def is_stoch_cache_fresh(spec):
+    """해당 심볼의 숏/롱 스토캐스틱이 모두 현재 일봉 기준으로 캐시되어 있는지 (1d 조회 생략 판단)"""
+    if spec.short_stoch and _get_cached_stoch(futures_stoch_cache, futures_stoch_cache_date,
+                                              spec.symbol, spec.short_stoch) is None:
+        return False
+    if spec.long_stoch and _get_cached_stoch(long_stoch_cache, long_stoch_cache_date,
+                                             spec.symbol, spec.long_stoch) is None:
+        return False
+    return True
+
+
+def save_stoch_cache():
+    """숏/롱 스토캐스틱 캐시를 파일에 저장 (변경이 있을 때만) + 증분 상태 저장"""
+    global _stoch_cache_dirty
+    save_stoch_states()
+    if not _stoch_cache_dirty:
+        return True
+    try:
+        with _stoch_cache_lock:
+            payloads = [
+                (FUTURES_STOCH_CACHE_FILE, {'cache_date': futures_stoch_cache_date, 'data': dict(futures_stoch_cache)}),
+                (LONG_STOCH_CACHE_FILE, {'cache_date': long_stoch_cache_date, 'data': dict(long_stoch_cache)}),
+            ]
+            _stoch_cache_dirty = False
+        for path, payload in payloads:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False)
+        logging.debug("스토캐스틱 캐시 저장 완료")
+        return True
+    except Exception as e:
+        logging.error(f"스토캐스틱 캐시 저장 중 오류: {e}")
+        return False
+
+
+def load_stoch_cache():
+    """저장된 숏/롱 스토캐스틱 캐시 불러오기 (현재 일봉 기준이 아니면 무시)"""
+    global futures_stoch_cache_date, long_stoch_cache_date
+    key = current_daily_close_ts()
+    loaded = 0
+    for path, cache, kind in ((FUTURES_STOCH_CACHE_FILE, futures_stoch_cache, 'short'),
+                              (LONG_STOCH_CACHE_FILE, long_stoch_cache, 'long')):
+        try:
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('cache_date') != key:
+                continue
+            cache.clear()
+            cache.update(data.get('data', {}))
+            if kind == 'short':
+                futures_stoch_cache_date = key
+            else:
+                long_stoch_cache_date = key
+            loaded += len(cache)
+        except Exception as e:
+            logging.error(f"스토캐스틱 캐시 로드 중 오류 ({path}): {e}")
+    logging.info(f"스토캐스틱 캐시 로드 완료: 일봉 기준 {datetime.fromtimestamp(key / 1000, timezone.utc):%Y-%m-%d}, {loaded}건")
+    return loaded > 0
+
+
+def get_futures_stochastic_signal(symbol):
+    """Futures 스토캐스틱 신호 조회 (일봉 마감 기준 캐시 - 일봉이 바뀌거나 파라미터 변경 시에만 재계산)"""
+    spec = get_symbol_spec(symbol)
+    if spec is None or spec.short_config is None:
+        return None
+    config = spec.short_config
+    params = spec.short_stoch
+    cached = _get_cached_stoch(futures_stoch_cache, futures_stoch_cache_date, symbol, params)
+    if cached is not None:
+        return cached
+    try:
+        k_period = config['stoch_k_period']
+        k_smooth = config['stoch_k_smooth']
+        d_period = config['stoch_d_period']
+        required_count = k_period + k_smooth + d_period + 20
+        daily = closed_daily_candles(get_futures_candle_array(symbol, '1d', required_count))
+        if daily is None:
+            return None
+        df = _ohlcv_rows_to_df(daily)
+        slow_k, slow_d = calculate_stochastic(df, k_period, k_smooth, d_period)
+        if slow_k is None or slow_d is None:
+            return None
+        result = {
+            'short_signal': bool(slow_k < slow_d),
+            'slow_k': slow_k,
+            'slow_d': slow_d
+        }
+        _store_cached_stoch('short', symbol, params, result)
+        return result
+    except Exception as e:
+        logging.error(f"Futures {symbol} 스토캐스틱 계산 중 오류: {e}")
+        return None
+
+
+def get_long_stochastic_signal(symbol):
+    """Long 스토캐스틱 신호 조회 (일봉 마감 기준 캐시)"""
+    spec = get_symbol_spec(symbol)
+    if spec is None or spec.long_config is None:
+        return None
+    config = spec.long_config
+    params = spec.long_stoch
+    cached = _get_cached_stoch(long_stoch_cache, long_stoch_cache_date, symbol, params)
+    if cached is not None:
+        return cached
+    try:
+        short_k_period = config['short_sk']
+        short_k_smooth = config['short_sks']
+        short_d_period = config['short_sd']
+        long_k_period = config['long_sk']
         long_k_smooth = config['long_sks']
         long_d_period = config['long_sd']
         short_required = short_k_period + short_k_smooth + short_d_period + 20
         long_required = long_k_period + long_k_smooth + long_d_period + 20
         required_count = max(short_required, long_required)
-        df = fetch_futures_ohlcv(symbol, '1d', required_count)
-        if df is None:
+        daily = closed_daily_candles(get_futures_candle_array(symbol, '1d', required_count))
+        if daily is None:
             return None
+        df = _ohlcv_rows_to_df(daily)
         short_slow_k, short_slow_d = calculate_stochastic(df, short_k_period, short_k_smooth, short_d_period)
         long_slow_k, long_slow_d = calculate_stochastic(df, long_k_period, long_k_smooth, long_d_period)
         cache_entry = {}
@@ -1526,12 +3089,471 @@ def get_long_stochastic_signal(symbol):
             cache_entry['long_signal'] = bool(long_slow_k > long_slow_d)
             cache_entry['long_slow_k'] = long_slow_k
             cache_entry['long_slow_d'] = long_slow_d
-        return cache_entry if cache_entry else None
+        if not cache_entry:
+            return None
+        _store_cached_stoch('long', symbol, params, cache_entry)
+        return cache_entry
     except Exception as e:
         logging.error(f"Long {symbol} 스토캐스틱 계산 중 오류: {e}")
         return None
 
 
+# ============================================================
+# 증분 스토캐스틱 상태 (마감 일봉 기준)
+# ============================================================
+
+class IncrementalStochastic:
+    """Slow Stochastic 증분 상태 (마감된 일봉만 누적)
+
+    - k 구간 최고가/최저가: 단조 deque (append 1회당 amortized O(1))
+    - %K 평활 / %D: 최근 k_smooth 개 fast %K, 최근 d 개 slow %K 와 누적합
+    calculate_stochastic()과 같은 값을 내며, peek()는 진행 중 캔들을 더한
+    가정값(what-if)을 상태 변경 없이 O(1)로 계산한다.
+    """
+
+    def __init__(self, k_period, k_smooth, d_period):
+        self.k_period = int(k_period)
+        self.k_smooth = int(k_smooth)
+        self.d_period = int(d_period)
+        self.count = 0
+        self.last_ts = None
+        self.max_dq = deque()  # (index, high) - high 내림차순
+        self.min_dq = deque()  # (index, low) - low 오름차순
+        self.fast_k = deque()  # 최근 k_smooth 개 fast %K (NaN 포함)
+        self.slow_k = deque()  # 최근 d_period 개 slow %K (NaN 포함)
+        self._resum()
+
+    def _resum(self):
+        """누적합 재계산 (부동소수 오차 누적 방지용 - 창 길이마다 1회)"""
+        self.fast_sum = sum(v for v in self.fast_k if not np.isnan(v))
+        self.fast_nan = sum(1 for v in self.fast_k if np.isnan(v))
+        self.slow_sum = sum(v for v in self.slow_k if not np.isnan(v))
+        self.slow_nan = sum(1 for v in self.slow_k if np.isnan(v))
+
+    @staticmethod
+    def _front_from(dq, start):
+        """deque 에서 index >= start 인 첫 값 (만료 원소는 최대 1개)"""
+        for idx, value in dq:
+            if idx >= start:
+                return value
+        return None
+
+    def _fast_k_value(self, index, high_max, low_min, close):
+        if index < self.k_period - 1:
+            return np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = 100 * (close - low_min) / (high_max - low_min)
+        return float(value) if np.isfinite(value) else np.nan
+
+    @staticmethod
+    def _window_mean(window_sum, window_nan, size, full_size):
+        if size < full_size or window_nan > 0:
+            return np.nan
+        return window_sum / full_size
+
+    def _roll(self, dq, sum_attr, nan_attr, limit, value):
+        if len(dq) == limit:
+            old = dq.popleft()
+            if np.isnan(old):
+                setattr(self, nan_attr, getattr(self, nan_attr) - 1)
+            else:
+                setattr(self, sum_attr, getattr(self, sum_attr) - old)
+        dq.append(value)
+        if np.isnan(value):
+            setattr(self, nan_attr, getattr(self, nan_attr) + 1)
+        else:
+            setattr(self, sum_attr, getattr(self, sum_attr) + value)
+
+    def append(self, ts, high, low, close):
+        """마감된 일봉 1개 추가"""
+        index = self.count
+        while self.max_dq and self.max_dq[-1][1] <= high:
+            self.max_dq.pop()
+        self.max_dq.append((index, high))
+        while self.min_dq and self.min_dq[-1][1] >= low:
+            self.min_dq.pop()
+        self.min_dq.append((index, low))
+        start = index - self.k_period + 1
+        while self.max_dq[0][0] < start:
+            self.max_dq.popleft()
+        while self.min_dq[0][0] < start:
+            self.min_dq.popleft()
+
+        fast = self._fast_k_value(index, self.max_dq[0][1], self.min_dq[0][1], close)
+        self._roll(self.fast_k, 'fast_sum', 'fast_nan', self.k_smooth, fast)
+        slow = self._window_mean(self.fast_sum, self.fast_nan, len(self.fast_k), self.k_smooth)
+        self._roll(self.slow_k, 'slow_sum', 'slow_nan', self.d_period, slow)
+
+        self.count += 1
+        self.last_ts = ts
+        if self.count % max(self.k_smooth, self.d_period) == 0:
+            self._resum()
+
+    def is_ready(self, extra=0):
+        """calculate_stochastic()의 최소 캔들 수 조건 (k + k_smooth + d) 충족 여부"""
+        return self.count + extra >= self.k_period + self.k_smooth + self.d_period
+
+    def value(self):
+        """마지막 마감 일봉 기준 (slow_k, slow_d) - 부족 시 (None, None)"""
+        if not self.is_ready() or not self.slow_k:
+            return None, None
+        slow_k = self.slow_k[-1]
+        slow_d = self._window_mean(self.slow_sum, self.slow_nan, len(self.slow_k), self.d_period)
+        if np.isnan(slow_k) or np.isnan(slow_d):
+            return None, None
+        return float(slow_k), float(slow_d)
+
+    def peek(self, high, low, close):
+        """진행 중 캔들(high, low, close)을 추가했다고 가정한 (slow_k, slow_d) - 상태 변경 없음"""
+        if not self.is_ready(extra=1):
+            return None, None
+        index = self.count
+        start = index - self.k_period + 1
+        prev_high = self._front_from(self.max_dq, start)
+        prev_low = self._front_from(self.min_dq, start)
+        high_max = high if prev_high is None else max(high, prev_high)
+        low_min = low if prev_low is None else min(low, prev_low)
+        fast = self._fast_k_value(index, high_max, low_min, close)
+
+        def _rolled(dq, window_sum, window_nan, limit, value):
+            size = len(dq)
+            if size == limit:
+                old = dq[0]
+                if np.isnan(old):
+                    window_nan -= 1
+                else:
+                    window_sum -= old
+                size -= 1
+            if np.isnan(value):
+                window_nan += 1
+            else:
+                window_sum += value
+            return self._window_mean(window_sum, window_nan, size + 1, limit)
+
+        slow_k = _rolled(self.fast_k, self.fast_sum, self.fast_nan, self.k_smooth, fast)
+        slow_d = _rolled(self.slow_k, self.slow_sum, self.slow_nan, self.d_period, slow_k)
+        if np.isnan(slow_k) or np.isnan(slow_d):
+            return None, None
+        return float(slow_k), float(slow_d)
+
+    def to_dict(self):
+        def _plain(values):
+            return [None if np.isnan(v) else v for v in values]
+        return {
+            'params': [self.k_period, self.k_smooth, self.d_period],
+            'count': self.count,
+            'last_ts': self.last_ts,
+            'max_dq': [list(x) for x in self.max_dq],
+            'min_dq': [list(x) for x in self.min_dq],
+            'fast_k': _plain(self.fast_k),
+            'slow_k': _plain(self.slow_k),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls(*data['params'])
+        state.count = data['count']
+        state.last_ts = data['last_ts']
+        state.max_dq = deque(tuple(x) for x in data['max_dq'])
+        state.min_dq = deque(tuple(x) for x in data['min_dq'])
+        state.fast_k = deque(np.nan if v is None else v for v in data['fast_k'])
+        state.slow_k = deque(np.nan if v is None else v for v in data['slow_k'])
+        state._resum()
+        return state
+
+
+def _get_stoch_state(symbol, params):
+    """메모리 → 캔들 저장소 순으로 증분 상태 조회 (없으면 None)"""
+    key = (symbol, tuple(int(p) for p in params))
+    state = futures_stoch_states.get(key)
+    if state is not None or not FUTURES_CANDLE_STORE_ENABLED:
+        return state
+    try:
+        with _candle_store_lock:
+            row = _get_candle_store().execute(
+                "SELECT state FROM stoch_state WHERE symbol = ? AND params = ?",
+                (symbol, json.dumps(list(key[1])))
+            ).fetchone()
+        if row:
+            state = IncrementalStochastic.from_dict(json.loads(row[0]))
+            futures_stoch_states[key] = state
+    except Exception as e:
+        logging.error(f"{symbol} 스토캐스틱 상태 로드 중 오류: {e}")
+    return state
+
+
+def save_stoch_states():
+    """변경된 증분 스토캐스틱 상태를 캔들 저장소에 저장"""
+    if not _stoch_states_dirty or not FUTURES_CANDLE_STORE_ENABLED:
+        return True
+    try:
+        rows = [
+            (symbol, json.dumps(list(params)), json.dumps(futures_stoch_states[(symbol, params)].to_dict()))
+            for symbol, params in list(_stoch_states_dirty)
+        ]
+        with _candle_store_lock:
+            conn = _get_candle_store()
+            conn.executemany("INSERT OR REPLACE INTO stoch_state VALUES (?, ?, ?)", rows)
+            conn.commit()
+        _stoch_states_dirty.clear()
+        return True
+    except Exception as e:
+        logging.error(f"스토캐스틱 상태 저장 중 오류: {e}")
+        return False
+
+
+def advance_stochastic_state(symbol, params, closed):
+    """마감 일봉 배열로 증분 상태를 갱신하고 마지막 마감 일봉 기준 (slow_k, slow_d) 반환
+
+    저장된 상태의 마지막 마감 일봉이 배열 안에 있으면 그 뒤 마감 일봉만 append (보통 1개),
+    없으면 배열의 마감 일봉 전체로 상태를 새로 만든다.
+    """
+    if closed is None or len(closed) == 0:
+        return None, None
+    key = (symbol, tuple(int(p) for p in params))
+    state = _get_stoch_state(symbol, key[1])
+    if state is None or state.last_ts not in set(closed[:, 0].tolist()):
+        state = IncrementalStochastic(*key[1])
+    new_bars = closed if state.last_ts is None else closed[closed[:, 0] > state.last_ts]
+    for ts, _, high, low, close, _ in new_bars:
+        state.append(float(ts), high, low, close)
+    if len(new_bars) or key not in futures_stoch_states:
+        futures_stoch_states[key] = state
+        _stoch_states_dirty.add(key)
+    return state.value()
+
+
+def stochastic_what_if(symbol, params, high, low, close):
+    """저장된 증분 상태에 가정 캔들을 더한 (slow_k, slow_d) - 이력/상태 변경 없음"""
+    state = _get_stoch_state(symbol, params)
+    if state is None:
+        return None, None
+    return state.peek(high, low, close)
+
+
+def incremental_slow_stochastic(symbols, daily_arrays, params):
+    """batch_slow_stochastic()과 같은 형식의 결과를 증분 상태로 계산 (daily_arrays: 마감 일봉, params: (행, 3), k=0 행은 NaN)"""
+    slow_k = np.full(len(symbols), np.nan)
+    slow_d = np.full(len(symbols), np.nan)
+    for i, symbol in enumerate(symbols):
+        if params[i][0] <= 0:
+            continue
+        k_value, d_value = advance_stochastic_state(symbol, params[i], daily_arrays[i])
+        if k_value is not None and d_value is not None:
+            slow_k[i], slow_d[i] = k_value, d_value
+    return slow_k, slow_d
+
+
+# ============================================================
+# 지표 엔진 (심볼 × 캔들 행렬 일괄 계산)
+# ============================================================
+# 심볼별 DataFrame 대신 오른쪽 정렬된 (심볼 × 캔들) 행렬 하나로
+# 행마다 다른 기간의 MA / Slow Stochastic 마지막 값을 한 번에 계산한다.
+# 결과는 calculate_stochastic / get_futures_ma_price 와 동일 (부족 시 NaN).
+
+def build_candle_matrix(arrays, column):
+    """심볼별 캔들 배열에서 한 열을 뽑아 (심볼 × 최대 길이) 행렬로 오른쪽 정렬
+
+    앞쪽 빈 구간은 NaN. Returns: (matrix, lengths)
+    """
+    lengths = np.array([0 if a is None else len(a) for a in arrays], dtype=int)
+    width = max(int(lengths.max()) if len(lengths) else 0, 1)
+    matrix = np.full((len(arrays), width), np.nan)
+    for i, a in enumerate(arrays):
+        if lengths[i]:
+            matrix[i, width - lengths[i]:] = a[:, column]
+    return matrix, lengths
+
+
+def batch_moving_average(close, lengths, periods):
+    """행별 기간의 마지막 단순이동평균 (periods=0 또는 캔들 부족 행은 NaN)"""
+    n_rows, width = close.shape
+    periods = np.asarray(periods, dtype=int)
+    cols = np.arange(width)
+    mask = cols[None, :] >= (width - periods)[:, None]
+    sums = np.where(mask, np.nan_to_num(close), 0.0).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ma = sums / periods
+    ma[(periods <= 0) | (lengths < periods)] = np.nan
+    return ma
+
+
+def _range_tables(x, max_window, op):
+    """구간 최대/최소용 sparse table: level j 의 [t] = x[t-2^j+1 .. t] 의 op (부족 시 NaN)"""
+    levels = [x]
+    span = 1
+    while span * 2 <= max_window:
+        prev = levels[-1]
+        nxt = np.full_like(prev, np.nan)
+        nxt[:, span:] = op(prev[:, span:], prev[:, :-span])
+        levels.append(nxt)
+        span *= 2
+    return np.stack(levels)
+
+
+def build_stochastic_tables(high, low, max_k):
+    """batch_slow_stochastic() 에 넘길 고가 최대 / 저가 최소 테이블 (1회 생성 후 재사용)"""
+    max_k = max(int(max_k), 1)
+    return _range_tables(high, max_k, np.maximum), _range_tables(low, max_k, np.minimum)
+
+
+def _rolling_window_sum(values, ends, windows):
+    """values (행 × L) 에서 행별 windows 길이, ends 위치(포함)에서 끝나는 구간 합 (NaN 포함 시 NaN)"""
+    n_rows = values.shape[0]
+    zeros = np.zeros((n_rows, 1))
+    csum = np.concatenate([zeros, np.cumsum(np.nan_to_num(values), axis=1)], axis=1)
+    cnan = np.concatenate([zeros, np.cumsum(np.isnan(values), axis=1)], axis=1)
+    hi = ends + 1
+    lo = hi - windows[:, None]
+    valid = lo >= 0
+    lo = np.clip(lo, 0, None)
+    sums = np.take_along_axis(csum, hi, axis=1) - np.take_along_axis(csum, lo, axis=1)
+    nans = np.take_along_axis(cnan, hi, axis=1) - np.take_along_axis(cnan, lo, axis=1)
+    sums[(nans > 0) | ~valid] = np.nan
+    return sums
+
+
+def batch_slow_stochastic(tables, close, lengths, k_periods, k_smooths, d_periods):
+    """행별 (k, k_smooth, d) Slow Stochastic 마지막 %K, %D 일괄 계산
+
+    tables: build_stochastic_tables() 결과, close/lengths: build_candle_matrix() 결과
+    k_period=0 행이나 캔들 수 < k + k_smooth + d 인 행은 NaN.
+    Returns: (slow_k, slow_d) - 각 (행,) 배열
+    """
+    max_tables, min_tables = tables
+    n_rows, width = close.shape
+    k = np.asarray(k_periods, dtype=int)
+    ks = np.asarray(k_smooths, dtype=int)
+    d = np.asarray(d_periods, dtype=int)
+    active = (k > 0) & (ks > 0) & (d > 0) & (lengths >= k + ks + d)
+    slow_k_last = np.full(n_rows, np.nan)
+    slow_d_last = np.full(n_rows, np.nan)
+    if not active.any():
+        return slow_k_last, slow_d_last
+
+    rows = np.arange(n_rows)
+    span = min(int((ks + d - 1)[active].max()), width)
+    t = width - span + np.arange(span)  # 계산할 마지막 span 개 위치
+
+    # %K 원값: 행별 k 구간 최고가/최저가 (sparse table 두 칸 조합)
+    safe_k = np.where(active, k, 1)
+    level = np.floor(np.log2(safe_k)).astype(int)
+    offset = safe_k - (1 << level)
+    t_far = t[None, :] - offset[:, None]
+    far_valid = t_far >= 0
+    t_far = np.clip(t_far, 0, None)
+    r = rows[:, None]
+    lv = level[:, None]
+    highest = np.maximum(max_tables[lv, r, t[None, :]], max_tables[lv, r, t_far])
+    lowest = np.minimum(min_tables[lv, r, t[None, :]], min_tables[lv, r, t_far])
+    highest[~far_valid] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fast_k = 100 * (close[:, t] - lowest) / (highest - lowest)
+    fast_k[~np.isfinite(fast_k)] = np.nan
+
+    positions = np.broadcast_to(np.arange(span), (n_rows, span))
+    slow_k = _rolling_window_sum(fast_k, positions, np.where(active, ks, 1)) / np.where(active, ks, 1)[:, None]
+    last = np.full((n_rows, 1), span - 1)
+    slow_d = _rolling_window_sum(slow_k, last, np.where(active, d, 1))[:, 0] / np.where(active, d, 1)
+
+    slow_k_last[active] = slow_k[active, -1]
+    slow_d_last[active] = slow_d[active]
+    return slow_k_last, slow_d_last
+
+
+def _nan_to_none(value):
+    return None if np.isnan(value) else float(value)
+
+
+def compute_futures_indicators(symbols):
+    """사이클 캔들 캐시의 전 심볼 캔들로 설정된 MA / 스토캐스틱을 일괄 계산
+
+    4h 종가 행렬 1개로 MA 3종(숏 MA, 롱설정 short_ma/long_ma),
+    마감된 1d 고가/저가/종가 행렬 1개로 스토캐스틱 3종(숏, 롱설정 숏필터/롱)을 계산한다.
+    현재 일봉 기준 캐시가 있는 스토캐스틱은 다시 계산하지 않는다 (하루 동안 같은 값).
+    Returns: {symbol: {'ma_price', 'stoch_data', 'short_ma_price', 'long_ma_price', 'long_stoch_data'}}
+    """
+    n = len(symbols)
+    specs = [SYMBOL_REGISTRY.specs[s] for s in symbols]
+    rows = np.array([spec.index for spec in specs], dtype=int)
+    ma_periods = SYMBOL_REGISTRY.ma_periods[rows].reshape(-1, 3)
+    stoch_params = SYMBOL_REGISTRY.stoch_params[rows].reshape(-1, 9)
+
+    def _candles(timeframe, i):
+        limit = specs[i].lookback_4h if timeframe == '4h' else specs[i].lookback_1d
+        if limit <= 0:
+            return None
+        cached = futures_candle_cache.get((symbols[i], timeframe))
+        return cached[0][-limit:] if cached is not None else None
+
+    # ── 4h MA ──
+    close_4h, len_4h = build_candle_matrix([_candles('4h', i) for i in range(n)], 4)
+    ma_short = batch_moving_average(close_4h, len_4h, ma_periods[:, 0])
+    ma_long_short = batch_moving_average(close_4h, len_4h, ma_periods[:, 1])
+    ma_long_long = batch_moving_average(close_4h, len_4h, ma_periods[:, 2])
+
+    # ── 1d 스토캐스틱 (캐시 미스 심볼만) ──
+    short_cached = [
+        _get_cached_stoch(futures_stoch_cache, futures_stoch_cache_date, spec.symbol, spec.short_stoch)
+        if spec.short_stoch else None
+        for spec in specs
+    ]
+    long_cached = [
+        _get_cached_stoch(long_stoch_cache, long_stoch_cache_date, spec.symbol, spec.long_stoch)
+        if spec.long_stoch else None
+        for spec in specs
+    ]
+    short_params = stoch_params[:, :3].copy()
+    short_params[[cached is not None for cached in short_cached]] = 0
+    long_params = stoch_params[:, 3:].copy()
+    long_params[[cached is not None for cached in long_cached]] = 0
+    stoch_results = {}
+    all_k = np.concatenate([short_params[:, 0], long_params[:, 0], long_params[:, 3]])
+    if all_k.size and all_k.max() > 0:
+        daily = [closed_daily_candles(_candles('1d', i)) for i in range(n)]
+        if FUTURES_INCREMENTAL_STOCH:
+            stoch_results['short'] = incremental_slow_stochastic(symbols, daily, short_params)
+            stoch_results['filter'] = incremental_slow_stochastic(symbols, daily, long_params[:, :3])
+            stoch_results['long'] = incremental_slow_stochastic(symbols, daily, long_params[:, 3:])
+        else:
+            high_1d, len_1d = build_candle_matrix(daily, 2)
+            low_1d, _ = build_candle_matrix(daily, 3)
+            close_1d, _ = build_candle_matrix(daily, 4)
+            tables = build_stochastic_tables(high_1d, low_1d, all_k.max())
+            stoch_results['short'] = batch_slow_stochastic(tables, close_1d, len_1d, *short_params.T)
+            stoch_results['filter'] = batch_slow_stochastic(tables, close_1d, len_1d, *long_params[:, :3].T)
+            stoch_results['long'] = batch_slow_stochastic(tables, close_1d, len_1d, *long_params[:, 3:].T)
+
+    results = {}
+    for i, symbol in enumerate(symbols):
+        spec = specs[i]
+        entry = {
+            'ma_price': _nan_to_none(ma_short[i]),
+            'stoch_data': short_cached[i],
+            'short_ma_price': _nan_to_none(ma_long_short[i]),
+            'long_ma_price': _nan_to_none(ma_long_long[i]),
+            'long_stoch_data': long_cached[i],
+        }
+        if spec.short_stoch and short_cached[i] is None and 'short' in stoch_results:
+            slow_k, slow_d = (_nan_to_none(v[i]) for v in stoch_results['short'])
+            if slow_k is not None and slow_d is not None:
+                entry['stoch_data'] = {'short_signal': bool(slow_k < slow_d), 'slow_k': slow_k, 'slow_d': slow_d}
+                _store_cached_stoch('short', symbol, spec.short_stoch, entry['stoch_data'])
+        if spec.long_stoch and long_cached[i] is None and 'long' in stoch_results:
+            cache_entry = {}
+            f_k, f_d = (_nan_to_none(v[i]) for v in stoch_results['filter'])
+            l_k, l_d = (_nan_to_none(v[i]) for v in stoch_results['long'])
+            if f_k is not None and f_d is not None:
+                cache_entry.update(short_filter_signal=bool(f_k < f_d), short_slow_k=f_k, short_slow_d=f_d)
+            if l_k is not None and l_d is not None:
+                cache_entry.update(long_signal=bool(l_k > l_d), long_slow_k=l_k, long_slow_d=l_d)
+            if cache_entry:
+                entry['long_stoch_data'] = cache_entry
+                _store_cached_stoch('long', symbol, spec.long_stoch, cache_entry)
+        results[symbol] = entry
+    return results
+
+
 def _normalize_symbol(symbol):
     """ccxt 통합 심볼을 거래소 네이티브 포맷으로 변환
     예: 'AERO/USDT:USDT' → 'AEROUSDT', 'AEROUSDT' → 'AEROUSDT'
@@ -1606,23 +3628,36 @@ def _extract_position_leverage(pos):
     return None
 
 
+def _parse_futures_position(pos):
+    """ccxt 포지션 응답을 봇 내부 포지션 dict로 변환 (수량 0이면 None)"""
+    contracts = abs(_safe_float(pos.get('contracts')))
+    if contracts <= 0:
+        return None
+    return {
+        'symbol': _normalize_symbol(pos['symbol']),
+        'side': pos['side'],  # 'short' or 'long'
+        'contracts': contracts,
+        'notional': abs(_safe_float(pos.get('notional'))),
+        'unrealized_pnl': _safe_float(pos.get('unrealizedPnl')),
+        'entry_price': _safe_float(pos.get('entryPrice')),
+        'leverage': _extract_position_leverage(pos),
+        'liquidation_price': _safe_float(pos.get('liquidationPrice'))
+    }
+
+
 def get_futures_position(symbol):
-    """Futures 포지션 조회"""
+    """Futures 포지션 조회 (사이클 원장이 있으면 원장에서 조회)"""
+    ledger = _active_futures_ledger()
+    if ledger is not None:
+        with _ledger_lock:
+            pos = ledger['positions'].get(symbol)
+            return dict(pos) if pos else None
     try:
         positions = futures_exchange.fetch_positions([symbol])
         for pos in positions:
-            normalized = _normalize_symbol(pos['symbol'])
-            if normalized == symbol and abs(_safe_float(pos.get('contracts'))) > 0:
-                return {
-                    'symbol': symbol,
-                    'side': pos['side'],  # 'short' or 'long'
-                    'contracts': abs(_safe_float(pos.get('contracts'))),
-                    'notional': abs(_safe_float(pos.get('notional'))),
-                    'unrealized_pnl': _safe_float(pos.get('unrealizedPnl')),
-                    'entry_price': _safe_float(pos.get('entryPrice')),
-                    'leverage': _extract_position_leverage(pos),
-                    'liquidation_price': _safe_float(pos.get('liquidationPrice'))
-                }
+            parsed = _parse_futures_position(pos)
+            if parsed and parsed['symbol'] == symbol:
+                return parsed
         return None
     except Exception as e:
         logging.error(f"Futures {symbol} 포지션 조회 중 오류: {e}")
@@ -1630,48 +3665,524 @@ def get_futures_position(symbol):
 
 
 def get_all_futures_positions():
-    """모든 Futures 포지션 조회"""
+    """모든 Futures 포지션 조회 (사이클 원장이 있으면 원장에서 조회)"""
+    ledger = _active_futures_ledger()
+    if ledger is not None:
+        with _ledger_lock:
+            return [dict(pos) for pos in ledger['positions'].values()]
     try:
         positions = futures_exchange.fetch_positions()
         active_positions = []
         for pos in positions:
-            if abs(_safe_float(pos.get('contracts'))) > 0:
-                active_positions.append({
-                    'symbol': _normalize_symbol(pos['symbol']),
-                    'side': pos['side'],
-                    'contracts': abs(_safe_float(pos.get('contracts'))),
-                    'notional': abs(_safe_float(pos.get('notional'))),
-                    'unrealized_pnl': _safe_float(pos.get('unrealizedPnl')),
-                    'entry_price': _safe_float(pos.get('entryPrice')),
-                    'leverage': _extract_position_leverage(pos)
-                })
+            parsed = _parse_futures_position(pos)
+            if parsed:
+                active_positions.append(parsed)
         return active_positions
     except Exception as e:
         logging.error(f"Futures 전체 포지션 조회 중 오류: {e}")
         return []
 
 
+# ============================================================
+# 사이클 포지션/잔고 원장
+# ============================================================
+
+def _parse_futures_wallet(raw_balance):
+    """fetch_balance 원본 응답의 USDT 지갑 잔고 (walletBalance, 없으면 None)"""
+    info = raw_balance.get('info') if isinstance(raw_balance.get('info'), dict) else {}
+    for asset in info.get('assets') or []:
+        if asset.get('asset') == 'USDT':
+            return _safe_float(asset.get('walletBalance'), default=None)
+    return None
+
+
+def _user_stream_live():
+    stream = futures_user_stream
+    return stream is not None and stream.connected
+
+
+def build_futures_ledger():
+    """fetch_positions() + fetch_balance() 1회씩으로 사이클 원장 구성
+
+    이후 사이클 내 포지션/잔고 조회와 슬롯/사이징 계산은 모두 원장에서 처리하고,
+    봇 자신의 체결은 _ledger_apply_open/_ledger_apply_close로 반영한다.
+    사용자 데이터 스트림이 연결되어 있으면 원장을 사이클이 끝나도 유지하며 이벤트로 갱신하고,
+    REST 구성은 재연결 직후 또는 FUTURES_LEDGER_RECONCILE_INTERVAL 마다의 대조로만 수행한다.
+    Returns: 성공 여부 (실패 시 원장 없이 REST 직접 조회로 동작)
+    """
+    global futures_ledger
+    stream = futures_user_stream
+    previous = futures_ledger
+    if (previous is not None and previous.get('live') and _user_stream_live() and not stream.needs_reconcile
+            and time.time() - previous['built_at'] < FUTURES_LEDGER_RECONCILE_INTERVAL):
+        revalue_futures_ledger()
+        logging.info(
+            f"📒 포지션 원장: 사용자 데이터 스트림 사용 (포지션 {len(previous['positions'])}개, "
+            f"가용 ${previous['balance']['free']:,.2f})"
+        )
+        return True
+
+    futures_ledger = None
+    reconnects = stream.stats['reconnects'] if stream is not None else 0
+    live = _user_stream_live()
+    try:
+        raw_positions = futures_exchange.fetch_positions()
+        raw_balance = futures_exchange.fetch_balance()
+        balance = _parse_futures_balance(raw_balance)
+        positions = {}
+        for pos in raw_positions:
+            parsed = _parse_futures_position(pos)
+            if parsed:
+                positions[parsed['symbol']] = parsed
+        ledger = {
+            'positions': positions,
+            'balance': balance,
+            'built_at': time.time(),
+            'live': live,
+            'wallet': _parse_futures_wallet(raw_balance),
+            'closing': {},  # 청산 체결 이벤트 대기 중인 심볼 -> 선반영 내역
+        }
+        if previous is not None and previous.get('live'):
+            _log_ledger_drift(previous, ledger)
+        futures_ledger = ledger
+        if live and stream.stats['reconnects'] == reconnects:
+            stream.needs_reconcile = False
+        logging.info(
+            f"📒 포지션 원장 구성{' (스트림 대조)' if live else ''}: "
+            f"포지션 {len(positions)}개, 가용 ${balance['free']:,.2f}"
+        )
+        return True
+    except Exception as e:
+        logging.error(f"Futures 포지션 원장 구성 실패: {e}")
+        return False
+
+
+def _log_ledger_drift(stream_ledger, rest_ledger):
+    """스트림 원장과 REST 조회 결과 차이 기록 (대조 결과)"""
+    drifted = []
+    for symbol in set(stream_ledger['positions']) | set(rest_ledger['positions']):
+        a = stream_ledger['positions'].get(symbol)
+        b = rest_ledger['positions'].get(symbol)
+        if (a is None) != (b is None) or (a and (a['side'] != b['side'] or abs(a['contracts'] - b['contracts']) > 1e-9)):
+            drifted.append(symbol)
+    balance_drift = rest_ledger['balance']['free'] - stream_ledger['balance']['free']
+    if drifted or abs(balance_drift) > 1:
+        logging.warning(
+            f"📒 원장 대조 차이: 포지션 {len(drifted)}개 {', '.join(sorted(drifted)[:10])} / "
+            f"가용 잔고 {balance_drift:+,.2f} USDT"
+        )
+
+
+def clear_futures_ledger():
+    """사이클 원장 해제 (이후 조회는 REST 직접 조회) - 스트림으로 갱신 중인 원장은 유지"""
+    global futures_ledger
+    ledger = futures_ledger
+    if ledger is not None and ledger.get('live') and _user_stream_live():
+        return
+    futures_ledger = None
+
+
+def _active_futures_ledger():
+    """유효한 원장 반환 (없거나 FUTURES_LEDGER_MAX_AGE 초과 시 None, 스트림 갱신 중이면 경과 시간 무관)"""
+    ledger = futures_ledger
+    if ledger is None:
+        return None
+    if ledger.get('live') and _user_stream_live():
+        return ledger
+    if time.time() - ledger['built_at'] > FUTURES_LEDGER_MAX_AGE:
+        return None
+    return ledger
+
+
+def _ledger_mark_price(symbol):
+    """원장 재평가용 가격 - 마크 가격(시세 스트림) 우선, 없으면 가격 스냅샷 (FUTURES_PRICE_SNAPSHOT_TTL 이내만)"""
+    now = time.time()
+    for source in (futures_mark_prices, futures_price_snapshot):
+        cached = source.get(symbol)
+        if cached is not None and cached[0] and now - cached[1] <= FUTURES_PRICE_SNAPSHOT_TTL:
+            return cached[0]
+    return None
+
+
+def revalue_futures_ledger():
+    """스트림 원장의 포지션을 현재 가격으로 재평가 (미실현 손익/명목가 → 총/가용 잔고)
+
+    ACCOUNT_UPDATE 는 체결/펀딩/이체 때만 오고 가격 변동으로는 오지 않으므로,
+    사이클마다 미실현 손익과 증거금 변화분을 원장 잔고에 반영한다.
+    Returns: 재평가한 포지션 수
+    """
+    ledger = futures_ledger
+    if ledger is None or not ledger.get('live'):
+        return 0
+    revalued = 0
+    with _ledger_lock:
+        balance = ledger['balance']
+        for symbol, pos in ledger['positions'].items():
+            mark = _ledger_mark_price(symbol)
+            if mark is None or not pos['entry_price']:
+                continue
+            direction = 1.0 if pos['side'] == 'long' else -1.0
+            pnl = pos['contracts'] * (mark - pos['entry_price']) * direction
+            before = _position_margin(pos)
+            pnl_change = pnl - pos['unrealized_pnl']
+            pos['unrealized_pnl'] = pnl
+            pos['notional'] = pos['contracts'] * mark
+            balance['free'] += pnl_change - (_position_margin(pos) - before)
+            balance['total'] += pnl_change
+            revalued += 1
+    return revalued
+
+
+def _ledger_apply_open(symbol, side, quantity, price, leverage):
+    """진입 체결을 원장에 반영 (증거금 + 수수료만큼 가용 잔고 차감)"""
+    ledger = _active_futures_ledger()
+    if ledger is None:
+        return
+    notional = quantity * price
+    fee = notional * FUTURES_FEE_RATE
+    with _ledger_lock:
+        ledger['positions'][symbol] = {
+            'symbol': symbol,
+            'side': side,
+            'contracts': quantity,
+            'notional': notional,
+            'unrealized_pnl': 0.0,
+            'entry_price': price,
+            'leverage': leverage,
+            'liquidation_price': 0.0,
+            'reserved_ms': exchange_time_ms(),  # 체결 이벤트로 교체될 때까지의 예약 표시
+            'reserved_fee': fee
+        }
+        ledger['balance']['free'] -= notional / max(leverage, 1) + fee
+        ledger['balance']['total'] -= fee
+
+
+def _ledger_apply_close(symbol, exit_price):
+    """청산 체결을 원장에 반영 (증거금 - 수수료만큼 가용 잔고 복원)
+
+    가용/총 잔고는 이미 미실현 손익을 포함하므로 (REST 구성, 재평가, ACCOUNT_UPDATE 증분)
+    청산 시 손익은 다시 더하지 않는다 - 미실현 → 실현으로 바뀔 뿐이다.
+    """
+    ledger = _active_futures_ledger()
+    if ledger is None:
+        return
+    with _ledger_lock:
+        pos = ledger['positions'].pop(symbol, None)
+        if pos is None:
+            return
+        fee = pos['contracts'] * (exit_price or pos['entry_price']) * FUTURES_FEE_RATE
+        margin = pos['notional'] / max(pos['leverage'] or 1, 1)
+        ledger['balance']['free'] += margin - fee
+        ledger['balance']['total'] -= fee
+        if ledger.get('live'):
+            # 체결 이벤트(ACCOUNT_UPDATE)가 오면 선반영을 되돌리고 실제 지갑 변화로 교체
+            ledger['closing'][symbol] = {'pos': pos, 'free': margin - fee, 'total': -fee}
+
+
+def _ledger_release_open(symbol):
+    """주문 실패한 진입 예약을 원장에서 되돌림 (_ledger_apply_open 의 역연산)"""
+    ledger = _active_futures_ledger()
+    if ledger is None:
+        return
+    with _ledger_lock:
+        pos = ledger['positions'].pop(symbol, None)
+        if pos is None:
+            return
+        fee = pos['notional'] * FUTURES_FEE_RATE
+        ledger['balance']['free'] += pos['notional'] / max(pos['leverage'], 1) + fee
+        ledger['balance']['total'] += fee
+
+
+# ============================================================
+# 사용자 데이터 스트림 (실시간 원장)
+# ============================================================
+
+def _position_margin(pos):
+    return pos['notional'] / max(pos['leverage'] or 1, 1) if pos else 0.0
+
+
+def _stream_position(update, previous):
+    """ACCOUNT_UPDATE 포지션 항목 → 원장 포지션 dict (수량 0이면 None)"""
+    amount = _safe_float(update.get('pa'))
+    if amount == 0:
+        return None
+    symbol = update['s']
+    entry = _safe_float(update.get('ep'))
+    mark = (futures_mark_prices.get(symbol) or (entry, 0))[0] or entry
+    previous = previous or {}
+    return {
+        'symbol': symbol,
+        'side': 'long' if amount > 0 else 'short',
+        'contracts': abs(amount),
+        'notional': abs(amount) * mark,
+        'unrealized_pnl': _safe_float(update.get('up')),
+        'entry_price': entry,
+        'leverage': _cached_account_config(symbol, 'leverage') or previous.get('leverage'),
+        'liquidation_price': previous.get('liquidation_price', 0.0)
+    }
+
+
+def _ledger_apply_account_update(event):
+    """ACCOUNT_UPDATE 를 원장에 증분 반영
+
+    지갑 잔고 변화 + 포지션 증거금/미실현 손익 변화만큼 가용/총 잔고를 조정하므로,
+    아직 체결되지 않은 진입 예약분(_ledger_apply_open)은 그대로 유지된다.
+    """
+    ledger = futures_ledger
+    if ledger is None or not ledger.get('live'):
+        return
+    data = event.get('a') or {}
+    event_ms = _safe_int(event.get('E'), default=0)
+    with _ledger_lock:
+        balance = ledger['balance']
+        for asset in data.get('B') or []:
+            if asset.get('a') != 'USDT':
+                continue
+            wallet = _safe_float(asset.get('wb'))
+            if ledger.get('wallet') is not None:
+                balance['total'] += wallet - ledger['wallet']
+                balance['free'] += wallet - ledger['wallet']
+            ledger['wallet'] = wallet
+
+        for update in data.get('P') or []:
+            if update.get('ps', 'BOTH') != 'BOTH':
+                continue
+            symbol = update['s']
+            held = ledger['positions'].get(symbol)
+            # 이벤트보다 나중에 만든 진입 예약은 이 이벤트의 대상이 아님 (청산 → 재진입 순서)
+            newer_reservation = held is not None and held.get('reserved_ms', 0) > event_ms
+            base = None if newer_reservation else held
+            closing = ledger['closing'].pop(symbol, None)
+            if closing is not None:
+                balance['free'] -= closing['free']
+                balance['total'] -= closing['total']
+                base = closing['pos']
+            current = _stream_position(update, held)
+            refund = base.get('reserved_fee', 0.0) if base is not None else 0.0
+            pnl_change = (current['unrealized_pnl'] if current else 0.0) - (base['unrealized_pnl'] if base else 0.0)
+            balance['free'] += _position_margin(base) - _position_margin(current) + pnl_change + refund
+            balance['total'] += pnl_change + refund
+            if current is not None:
+                ledger['positions'][symbol] = current
+            elif not newer_reservation:
+                ledger['positions'].pop(symbol, None)
+
+
+def _ledger_apply_leverage(symbol, leverage):
+    """레버리지 변경 이벤트 반영 (보유 포지션 증거금 차이만큼 가용 잔고 조정)"""
+    _update_account_config(symbol, 'leverage', leverage)
+    ledger = futures_ledger
+    if ledger is None or not ledger.get('live'):
+        return
+    with _ledger_lock:
+        pos = ledger['positions'].get(symbol)
+        if pos is not None and pos.get('leverage') != leverage:
+            before = _position_margin(pos)
+            pos['leverage'] = leverage
+            ledger['balance']['free'] += before - _position_margin(pos)
+
+
+def _record_futures_fill(order):
+    """ORDER_TRADE_UPDATE 체결(x=TRADE)을 체결 내역에 기록"""
+    fill = {
+        'symbol': order.get('s'),
+        'side': str(order.get('S', '')).lower(),
+        'quantity': _safe_float(order.get('l')),
+        'price': _safe_float(order.get('L')),
+        'commission': _safe_float(order.get('n')),
+        'commission_asset': order.get('N'),
+        'realized_pnl': _safe_float(order.get('rp')),
+        'reduce_only': bool(order.get('R')),
+        'status': order.get('X'),
+        'order_id': order.get('i'),
+        'client_order_id': order.get('c'),
+        'time': order.get('T'),
+    }
+    with _ledger_lock:
+        futures_fills.append(fill)
+    return fill
+
+
+def get_futures_fills(symbol=None, since_ms=None):
+    """사용자 데이터 스트림으로 받은 최근 체결 내역 (오래된 순)"""
+    with _ledger_lock:
+        fills = list(futures_fills)
+    return [f for f in fills
+            if (symbol is None or f['symbol'] == symbol) and (since_ms is None or (f['time'] or 0) >= since_ms)]
+
+
+class FuturesUserDataStream(_StreamThread):
+    """USDS-M 사용자 데이터 스트림 (listenKey) 수신기
+
+    - ACCOUNT_UPDATE: 원장 포지션/지갑 잔고 갱신
+    - ORDER_TRADE_UPDATE: 체결 내역 기록
+    - ACCOUNT_CONFIG_UPDATE: 레버리지 설정 캐시/원장 갱신
+    - listenKey 는 FUTURES_LISTEN_KEY_KEEPALIVE 마다 연장, 만료/끊김 시 새 키로 재연결하고
+      놓친 이벤트가 있을 수 있으므로 다음 사이클 원장 구성 시 REST 대조를 요청한다(needs_reconcile).
+    """
+
+    thread_name = 'futures-user-stream'
+
+    def __init__(self, url, exchange):
+        super().__init__()
+        self.url = url.rstrip('/')
+        self.exchange = exchange
+        self.listen_key = None
+        self.connected = False
+        self.needs_reconcile = True
+        self.stats = {'events': 0, 'reconnects': 0, 'fills': 0}
+
+    async def _main(self):
+        async with aiohttp.ClientSession() as session:
+            self._task = asyncio.gather(self._keepalive(), self._consume(session))
+            await self._task
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(FUTURES_LISTEN_KEY_KEEPALIVE)
+            if self.listen_key:
+                try:
+                    await self.loop.run_in_executor(None, self.exchange.fapiPrivatePutListenKey)
+                except Exception as e:
+                    logging.warning(f"👤 listenKey 연장 실패: {e}")
+
+    async def _consume(self, session):
+        delay = 1
+        while not self._stopping:
+            try:
+                response = await self.loop.run_in_executor(None, self.exchange.fapiPrivatePostListenKey)
+                self.listen_key = response['listenKey']
+                async with session.ws_connect(f"{self.url}/ws/{self.listen_key}",
+                                              heartbeat=FUTURES_STREAM_HEARTBEAT) as ws:
+                    self.connected = True
+                    delay = 1
+                    logging.info("👤 사용자 데이터 스트림 연결")
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            if not self._on_event(json.loads(msg.data)):
+                                break
+                        elif msg.type in (aiohttp.WSMsgType.ERROR, aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"👤 사용자 데이터 스트림 연결 오류: {e}")
+            self.connected = False
+            self.needs_reconcile = True
+            if self._stopping:
+                break
+            self.stats['reconnects'] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60)
+
+    def _on_event(self, event):
+        """이벤트 반영 - listenKey 만료 시 False (재연결)"""
+        self.stats['events'] += 1
+        kind = event.get('e')
+        try:
+            if kind == 'ACCOUNT_UPDATE':
+                _ledger_apply_account_update(event)
+            elif kind == 'ORDER_TRADE_UPDATE':
+                order = event.get('o') or {}
+                if order.get('x') == 'TRADE':
+                    self.stats['fills'] += 1
+                    _record_futures_fill(order)
+            elif kind == 'ACCOUNT_CONFIG_UPDATE':
+                config = event.get('ac')
+                if config:
+                    _ledger_apply_leverage(config['s'], _safe_int(config.get('l')))
+            elif kind == 'listenKeyExpired':
+                logging.warning("👤 listenKey 만료 - 재연결")
+                return False
+        except Exception as e:
+            logging.error(f"사용자 데이터 이벤트 처리 중 오류 ({kind}): {e}")
+            self.needs_reconcile = True
+        return True
+
+
+def start_futures_user_stream():
+    """사용자 데이터 스트림 시작 (이미 실행 중이면 유지)"""
+    global futures_user_stream
+    if not FUTURES_USER_STREAM_ENABLED or futures_exchange is None:
+        return None
+    if futures_user_stream is None:
+        futures_user_stream = FuturesUserDataStream(FUTURES_STREAM_URL, futures_exchange).start()
+        logging.info(f"👤 사용자 데이터 스트림 시작 ({FUTURES_STREAM_URL})")
+    return futures_user_stream
+
+
+def load_futures_account_config():
+    """전 심볼 마진 타입/레버리지 현재 설정 일괄 조회 (symbolConfig 1회) → 설정 캐시 시드"""
+    global _account_config_loaded_at
+    try:
+        rows = futures_exchange.fapiPrivateGetSymbolConfig()
+        config = {}
+        for row in rows:
+            margin_type = str(row.get('marginType', '')).upper()
+            config[row['symbol']] = {
+                'margin_type': 'CROSSED' if margin_type in ('CROSSED', 'CROSS') else 'ISOLATED',
+                'leverage': int(row['leverage'])
+            }
+        with _account_config_lock:
+            futures_account_config.clear()
+            futures_account_config.update(config)
+        _account_config_loaded_at = time.time()
+        logging.info(f"⚙️ 심볼 설정 캐시 로드: {len(config)}개 심볼")
+        return True
+    except Exception as e:
+        logging.warning(f"심볼 설정 캐시 로드 실패 (설정 요청 생략 없이 진행): {e}")
+        return False
+
+
+def ensure_futures_account_config():
+    """설정 캐시가 FUTURES_ACCOUNT_CONFIG_TTL 보다 오래됐으면 재시드"""
+    if time.time() - _account_config_loaded_at > FUTURES_ACCOUNT_CONFIG_TTL:
+        load_futures_account_config()
+
+
+def _cached_account_config(symbol, key):
+    with _account_config_lock:
+        return futures_account_config.get(symbol, {}).get(key)
+
+
+def _update_account_config(symbol, key, value):
+    with _account_config_lock:
+        if value is None:
+            futures_account_config.get(symbol, {}).pop(key, None)
+        else:
+            futures_account_config.setdefault(symbol, {})[key] = value
+
+
 def set_futures_leverage(symbol, leverage):
-    """Futures 레버리지 설정"""
+    """Futures 레버리지 설정 (캐시 값과 같으면 요청 생략)"""
+    if _cached_account_config(symbol, 'leverage') == leverage:
+        return True
     try:
         futures_exchange.set_leverage(leverage, symbol)
+        _update_account_config(symbol, 'leverage', leverage)
         logging.info(f"✅ {symbol} 레버리지 설정: {leverage}x")
         return True
     except Exception as e:
+        _update_account_config(symbol, 'leverage', None)
         logging.error(f"❌ {symbol} 레버리지 설정 실패: {e}")
         return False
 
 
 def set_futures_margin_type(symbol, margin_type='CROSSED'):
-    """Futures 마진 타입 설정 (CROSSED or ISOLATED)"""
+    """Futures 마진 타입 설정 (CROSSED or ISOLATED, 캐시 값과 같으면 요청 생략)"""
+    if _cached_account_config(symbol, 'margin_type') == margin_type:
+        return True
     try:
         futures_exchange.set_margin_mode(margin_type.lower(), symbol)
+        _update_account_config(symbol, 'margin_type', margin_type)
         logging.info(f"✅ {symbol} 마진 타입 설정: {margin_type}")
         return True
     except Exception as e:
         # 이미 설정된 경우 에러 무시
         if 'No need to change margin type' in str(e):
+            _update_account_config(symbol, 'margin_type', margin_type)
             return True
+        _update_account_config(symbol, 'margin_type', None)
         logging.error(f"❌ {symbol} 마진 타입 설정 실패: {e}")
         return False
 
@@ -1683,50 +4194,32 @@ def calculate_futures_position_size(config, usdt_amount, current_price):
     # 레버리지 적용한 명목 가치
     notional_value = usdt_amount * leverage
 
-    # 수량 계산 (소수점 처리)
-    quantity = notional_value / current_price
-
-    # 심볼별 최소 수량 및 소수점 처리
     symbol = config['symbol']
-
-    # 바이낸스 Futures 최소 수량
-    min_quantities = {
-        'BTCUSDT': 0.001,
-        'ETHUSDT': 0.001,
-        'BNBUSDT': 0.01,
-        'SOLUSDT': 0.1,
-        'XRPUSDT': 1,
-        'DOGEUSDT': 1,
-        'ADAUSDT': 1,
-    }
-
-    min_qty = min_quantities.get(symbol, 0.001)
-
-    # 소수점 자릿수
-    decimals = {
-        'BTCUSDT': 3,
-        'ETHUSDT': 3,
-        'BNBUSDT': 2,
-        'SOLUSDT': 1,
-        'XRPUSDT': 0,
-        'DOGEUSDT': 0,
-        'ADAUSDT': 0,
-    }
-
-    decimal_places = decimals.get(symbol, 3)
-    quantity = round(quantity, decimal_places)
-
-    if quantity < min_qty:
+    rule = futures_trading_rules.get(symbol)
+    if rule is None:
+        # 주문 규칙 없음 (마켓 미로드) - 기본 0.001 단위
+        logging.warning(f"[{symbol}] 주문 규칙 없음 - 기본 수량 단위(0.001) 사용")
+        quantity = round(notional_value / current_price, 3)
+        return quantity if quantity >= 0.001 else 0
+
+    # 수량 계산 (stepSize 단위 내림 - 명목 가치를 넘지 않도록)
+    price = Decimal(str(current_price))
+    quantity = Decimal(str(notional_value)) / price
+    quantity = (quantity / rule['step']).to_integral_value(rounding=ROUND_DOWN) * rule['step']
+    if rule['max_qty'] and quantity > rule['max_qty']:
+        quantity = (rule['max_qty'] / rule['step']).to_integral_value(rounding=ROUND_DOWN) * rule['step']
+
+    # 최소 수량 / 최소 주문 금액 필터
+    if quantity < rule['min_qty'] or quantity * price < rule['min_notional']:
         return 0
 
-    return quantity
+    return float(quantity)
 
 
 def get_effective_futures_coins():
     """실제 거래 가능한 Futures 코인 수 (정적 제외 + 런타임 제외 반영)"""
     excluded_count = 0
-    all_symbols = set(c['symbol'] for c in SHORT_TRADING_CONFIGS)
-    for symbol in all_symbols:
+    for symbol in SYMBOL_REGISTRY.short_symbols:
         if symbol in FUTURES_EXCLUDED_COINS or symbol in runtime_excluded_coins:
             excluded_count += 1
     effective = TOTAL_FUTURES_COINS - excluded_count
@@ -1754,8 +4247,9 @@ def get_futures_position_status():
     positions = get_all_futures_positions()
     active_symbols = set(pos['symbol'] for pos in positions)
 
-    for config in SHORT_TRADING_CONFIGS:
-        status[config['symbol']] = config['symbol'] in active_symbols
+    for symbol in SYMBOL_REGISTRY.symbols:
+        if symbol in SYMBOL_REGISTRY.short_symbols:
+            status[symbol] = symbol in active_symbols
 
     return status
 
@@ -1836,10 +4330,15 @@ def calculate_futures_invest_amount():
     return invest_amount
 
 
-def open_short_position(config):
-    """숏 포지션 진입"""
+def prepare_futures_open(config, side):
+    """진입 사이징 (투자금 → 수량 계산 후 원장에 예약) - 주문 전송은 submit_futures_open()
+
+    원장 예약으로 다음 심볼의 빈 슬롯/가용 잔고 계산에 바로 반영되므로 순차 호출해야 한다.
+    Returns: {'symbol', 'side', 'quantity', 'price', 'leverage'} 또는 None
+    """
     symbol = config['symbol']
-    leverage = config['leverage']
+    leverage = config['leverage'] if side == 'short' else config['long_lev']
+    label = '' if side == 'short' else '롱 '
 
     try:
         # 투자 금액 계산 (포지션 중복 체크 포함)
@@ -1850,192 +4349,321 @@ def open_short_position(config):
             return None
 
         if invest_amount < FUTURES_MIN_ORDER_USDT:
-            logging.warning(f"[{symbol}] 투자 금액 부족: ${invest_amount:.2f}")
+            logging.warning(f"[{symbol}] {label}투자 금액 부족: ${invest_amount:.2f}")
             return None
 
-        # 현재가 조회
-        current_price = get_futures_current_price(symbol)
+        # 현재가 조회 (사이징용 - 오래된 스냅샷이면 새로 조회)
+        current_price = get_futures_current_price(symbol, max_age=FUTURES_ORDER_PRICE_MAX_AGE)
         if not current_price:
             logging.error(f"[{symbol}] 현재가 조회 실패")
             return None
 
-        # 마진 타입 설정 (CROSSED)
-        set_futures_margin_type(symbol, 'CROSSED')
-
-        # 레버리지 설정
-        set_futures_leverage(symbol, leverage)
-
-        # 수량 계산
-        quantity = calculate_futures_position_size(config, invest_amount, current_price)
+        # 수량 계산 - 롱은 config에 leverage 키가 아닌 long_lev를 사용하므로 임시 config 생성
+        sized_config = dict(config)
+        sized_config['leverage'] = leverage
+        quantity = calculate_futures_position_size(sized_config, invest_amount, current_price)
         if quantity <= 0:
-            logging.warning(f"[{symbol}] 수량 계산 실패")
+            logging.warning(f"[{symbol}] {label}수량 계산 실패")
             return None
 
-        # 시장가 숏 주문
-        order = futures_exchange.create_market_sell_order(symbol, quantity)
-
-        logging.info(f"🔻 [{symbol}] 숏 진입 완료: {quantity} @ ~${current_price:.2f} ({leverage}x)")
-
+        _ledger_apply_open(symbol, side, quantity, current_price, leverage)
         return {
             'symbol': symbol,
-            'side': 'short',
+            'side': side,
             'quantity': quantity,
             'price': current_price,
-            'notional': quantity * current_price,
             'leverage': leverage
         }
 
     except Exception as e:
-        logging.error(f"❌ [{symbol}] 숏 진입 실패: {e}")
-        # 상폐 예정 코인 자동 제외 (-4140: Invalid symbol status)
-        if '-4140' in str(e):
-            runtime_excluded_coins.add(symbol)
-            logging.warning(f"⚠️ [{symbol}] 런타임 제외 목록에 추가 (상폐 예정)")
+        logging.error(f"❌ [{symbol}] {'숏' if side == 'short' else '롱'} 진입 준비 실패: {e}")
         return None
 
 
-def close_short_position(symbol, reason=None):
-    """숏 포지션 청산"""
-    try:
-        pos = get_futures_position(symbol)
-        if not pos or pos['side'] != 'short':
-            logging.info(f"[{symbol}] 청산할 숏 포지션 없음")
-            return None
+def setup_futures_open(order):
+    """진입 전 심볼 설정 (마진 타입 CROSSED + 레버리지) - 설정 캐시와 같으면 요청 없음"""
+    set_futures_margin_type(order['symbol'], 'CROSSED')
+    set_futures_leverage(order['symbol'], order['leverage'])
 
-        quantity = pos['contracts']
-        entry_price = pos['entry_price']
-        unrealized_pnl = pos['unrealized_pnl']
 
-        # 시장가 매수로 숏 청산 (reduceOnly: $5 미만 포지션도 청산 가능)
-        order = futures_exchange.create_market_buy_order(symbol, quantity, params={'reduceOnly': True})
+def complete_futures_open(order):
+    """진입 체결 후 처리 (로그 + 결과 dict)"""
+    symbol = order['symbol']
+    quantity = order['quantity']
+    current_price = order['price']
+    leverage = order['leverage']
+    if order['side'] == 'short':
+        logging.info(f"🔻 [{symbol}] 숏 진입 완료: {quantity} @ ~${current_price:.2f} ({leverage}x)")
+    else:
+        logging.info(f"🟢 [{symbol}] 롱 진입 완료: {quantity} @ ~${current_price:.2f} ({leverage}x)")
+    return {
+        'symbol': symbol,
+        'side': order['side'],
+        'quantity': quantity,
+        'price': current_price,
+        'notional': quantity * current_price,
+        'leverage': leverage
+    }
 
-        current_price = get_futures_current_price(symbol)
 
-        reason_str = f" ({reason})" if reason else ""
-        pnl_str = f"+{unrealized_pnl:.2f}" if unrealized_pnl >= 0 else f"{unrealized_pnl:.2f}"
+def fail_futures_open(order, error):
+    """진입 주문 실패 처리 (원장 예약 해제 + 상폐/필터 오류 대응)"""
+    symbol = order['symbol']
+    _ledger_release_open(symbol)
+    logging.error(f"❌ [{symbol}] {'숏' if order['side'] == 'short' else '롱'} 진입 실패: {error}")
+    # 상폐 예정 코인 자동 제외 (-4140: Invalid symbol status)
+    if '-4140' in str(error):
+        runtime_excluded_coins.add(symbol)
+        logging.warning(f"⚠️ [{symbol}] 런타임 제외 목록에 추가 (상폐 예정)")
+    _handle_order_filter_error(symbol, error)
 
-        logging.info(f"🔺 [{symbol}] 숏 청산 완료{reason_str}: {quantity} @ ~${current_price:.2f} (PnL: {pnl_str})")
 
+def submit_futures_open(order):
+    """진입 주문 전송 (마진 타입/레버리지 설정 + 시장가 주문) - 실패 시 원장 예약 해제
+
+    심볼별로 독립적이므로 워커 스레드에서 병렬 호출해도 안전하다.
+    """
+    try:
+        setup_futures_open(order)
+        if order['side'] == 'short':
+            # 시장가 숏 주문
+            futures_exchange.create_market_sell_order(order['symbol'], order['quantity'])
+        else:
+            # 시장가 롱 주문
+            futures_exchange.create_market_buy_order(order['symbol'], order['quantity'])
+        return complete_futures_open(order)
+
+    except Exception as e:
+        fail_futures_open(order, e)
+        return None
+
+
+def open_short_position(config):
+    """숏 포지션 진입"""
+    order = prepare_futures_open(config, 'short')
+    return submit_futures_open(order) if order else None
+
+
+def prepare_futures_close(symbol, side, reason=None):
+    """청산 주문 준비 (원장 포지션 확인) - Returns: 주문 dict 또는 None"""
+    try:
+        pos = get_futures_position(symbol)
+        if not pos or pos['side'] != side:
+            logging.info(f"[{symbol}] 청산할 {'숏' if side == 'short' else '롱'} 포지션 없음")
+            return None
         return {
             'symbol': symbol,
-            'quantity': quantity,
-            'entry_price': entry_price,
-            'exit_price': current_price,
-            'pnl': unrealized_pnl,
+            'side': side,
+            'quantity': pos['contracts'],
+            'entry_price': pos['entry_price'],
+            'pnl': pos['unrealized_pnl'],
             'reason': reason
         }
-
     except Exception as e:
-        logging.error(f"❌ [{symbol}] 숏 청산 실패: {e}")
+        logging.error(f"❌ [{symbol}] {'숏' if side == 'short' else '롱'} 청산 실패: {e}")
         return None
 
 
-def open_long_position(config):
-    """롱 포지션 진입"""
-    symbol = config['symbol']
-    leverage = config['long_lev']
+def complete_futures_close(order, placed=None):
+    """청산 체결 후 처리 (원장 반영 + 로그 + 결과 dict)
 
-    try:
-        # 투자 금액 계산 (포지션 중복 체크 포함)
-        invest_amount = calculate_futures_invest_amount_for_symbol(symbol)
-        if invest_amount <= 0:
-            return None
+    placed: 거래소 주문 응답 - 주문 ID 로 사용자 데이터 스트림 체결을 찾아 결과를 확정한다
+    (settle_futures_close_fills). 그 전까지 청산가/손익은 현재가/미실현 손익 추정치.
+    """
+    symbol = order['symbol']
+    quantity = order['quantity']
+    unrealized_pnl = order['pnl']
+    reason = order['reason']
 
-        if invest_amount < FUTURES_MIN_ORDER_USDT:
-            logging.warning(f"[{symbol}] 롱 투자 금액 부족: ${invest_amount:.2f}")
-            return None
+    current_price = get_futures_current_price(symbol)
+    _ledger_apply_close(symbol, current_price)
 
-        # 현재가 조회
-        current_price = get_futures_current_price(symbol)
-        if not current_price:
-            logging.error(f"[{symbol}] 현재가 조회 실패")
-            return None
+    reason_str = f" ({reason})" if reason else ""
+    pnl_str = f"+{unrealized_pnl:.2f}" if unrealized_pnl >= 0 else f"{unrealized_pnl:.2f}"
+    if order['side'] == 'short':
+        logging.info(f"🔺 [{symbol}] 숏 청산 완료{reason_str}: {quantity} @ ~${current_price:.2f} (PnL: {pnl_str})")
+    else:
+        logging.info(f"🔴 [{symbol}] 롱 청산 완료{reason_str}: {quantity} @ ~${current_price:.2f} (PnL: {pnl_str})")
 
-        # 마진 타입 설정 (CROSSED)
-        set_futures_margin_type(symbol, 'CROSSED')
+    return {
+        'symbol': symbol,
+        'quantity': quantity,
+        'entry_price': order['entry_price'],
+        'exit_price': current_price,
+        'pnl': unrealized_pnl,
+        'reason': reason,
+        'order_id': str(placed['id']) if placed and placed.get('id') is not None else None,
+    }
 
-        # 레버리지 설정
-        set_futures_leverage(symbol, leverage)
 
-        # 수량 계산 - config에 leverage 키가 아닌 long_lev를 사용하므로 임시 config 생성
-        temp_config = dict(config)
-        temp_config['leverage'] = leverage
-        quantity = calculate_futures_position_size(temp_config, invest_amount, current_price)
-        if quantity <= 0:
-            logging.warning(f"[{symbol}] 롱 수량 계산 실패")
-            return None
+def _apply_close_fills(result, fills):
+    """청산 결과에 실제 체결 반영 (체결가 = 수량 가중 평균, 손익 = 실현손익 - USDT 수수료)"""
+    quantity = sum(f['quantity'] for f in fills)
+    commission = sum(f['commission'] for f in fills if f['commission_asset'] == 'USDT')
+    realized = sum(f['realized_pnl'] for f in fills)
+    result['exit_price'] = sum(f['quantity'] * f['price'] for f in fills) / quantity
+    result['realized_pnl'] = realized
+    result['commission'] = sum(f['commission'] for f in fills)
+    result['commission_asset'] = fills[-1]['commission_asset']
+    result['pnl'] = realized - commission
+    result['filled'] = True
 
-        # 시장가 롱 주문
-        order = futures_exchange.create_market_buy_order(symbol, quantity)
 
-        logging.info(f"🟢 [{symbol}] 롱 진입 완료: {quantity} @ ~${current_price:.2f} ({leverage}x)")
+def settle_futures_close_fills(close_results, wait=None):
+    """청산 결과를 사용자 데이터 스트림 체결(ORDER_TRADE_UPDATE)로 확정
 
-        return {
-            'symbol': symbol,
-            'side': 'long',
-            'quantity': quantity,
-            'price': current_price,
-            'notional': quantity * current_price,
-            'leverage': leverage
-        }
+    주문 수량만큼 체결이 모이면 체결가/수수료/실현손익으로 교체하고, wait 초 안에 다 오지 않거나
+    스트림이 연결되어 있지 않으면 추정치를 유지한다.
+    Returns: 확정한 청산 수
+    """
+    pending = [r for r in close_results if r.get('order_id') and not r.get('filled')]
+    if not pending or not _user_stream_live():
+        return 0
+    deadline = time.time() + (FUTURES_FILL_WAIT if wait is None else wait)
+    settled = 0
+    while True:
+        for result in list(pending):
+            fills = [f for f in get_futures_fills(result['symbol']) if str(f['order_id']) == result['order_id']]
+            if fills and sum(f['quantity'] for f in fills) >= result['quantity'] * (1 - 1e-9):
+                _apply_close_fills(result, fills)
+                pending.remove(result)
+                settled += 1
+        if not pending or time.time() >= deadline:
+            break
+        time.sleep(0.1)
+    if settled or pending:
+        logging.info(
+            f"🧾 청산 체결 확정 {settled}건 (실현 손익 합 {sum(r.get('pnl', 0) for r in close_results if r.get('filled')):+,.2f})"
+            f"{f', 미확정 {len(pending)}건 (추정치 유지)' if pending else ''}"
+        )
+    return settled
+
+
+def close_short_position(symbol, reason=None):
+    """숏 포지션 청산"""
+    order = prepare_futures_close(symbol, 'short', reason)
+    if not order:
+        return None
+    try:
+        # 시장가 매수로 숏 청산 (reduceOnly: $5 미만 포지션도 청산 가능)
+        placed = futures_exchange.create_market_buy_order(symbol, order['quantity'], params={'reduceOnly': True})
+        return complete_futures_close(order, placed)
 
     except Exception as e:
-        logging.error(f"❌ [{symbol}] 롱 진입 실패: {e}")
-        # 상폐 예정 코인 자동 제외 (-4140: Invalid symbol status)
-        if '-4140' in str(e):
-            runtime_excluded_coins.add(symbol)
-            logging.warning(f"⚠️ [{symbol}] 런타임 제외 목록에 추가 (상폐 예정)")
+        logging.error(f"❌ [{symbol}] 숏 청산 실패: {e}")
         return None
 
 
+def open_long_position(config):
+    """롱 포지션 진입"""
+    order = prepare_futures_open(config, 'long')
+    return submit_futures_open(order) if order else None
+
+
 def close_long_position(symbol, reason=None):
     """롱 포지션 청산"""
+    order = prepare_futures_close(symbol, 'long', reason)
+    if not order:
+        return None
     try:
-        pos = get_futures_position(symbol)
-        if not pos or pos['side'] != 'long':
-            logging.info(f"[{symbol}] 청산할 롱 포지션 없음")
-            return None
+        # 시장가 매도로 롱 청산 (reduceOnly: $5 미만 포지션도 청산 가능)
+        placed = futures_exchange.create_market_sell_order(symbol, order['quantity'], params={'reduceOnly': True})
+        return complete_futures_close(order, placed)
 
-        quantity = pos['contracts']
-        entry_price = pos['entry_price']
-        unrealized_pnl = pos['unrealized_pnl']
+    except Exception as e:
+        logging.error(f"❌ [{symbol}] 롱 청산 실패: {e}")
+        return None
 
-        # 시장가 매도로 롱 청산 (reduceOnly: $5 미만 포지션도 청산 가능)
-        order = futures_exchange.create_market_sell_order(symbol, quantity, params={'reduceOnly': True})
 
-        current_price = get_futures_current_price(symbol)
+# ============================================================
+# 일괄 주문 (batchOrders)
+# ============================================================
 
-        reason_str = f" ({reason})" if reason else ""
-        pnl_str = f"+{unrealized_pnl:.2f}" if unrealized_pnl >= 0 else f"{unrealized_pnl:.2f}"
+def futures_order_request(order, reduce_only=False):
+    """파이프라인 주문 dict → ccxt create_orders 요청 항목 (시장가)"""
+    if reduce_only:
+        side = 'buy' if order['side'] == 'short' else 'sell'
+    else:
+        side = 'sell' if order['side'] == 'short' else 'buy'
+    return {
+        'symbol': order['symbol'],
+        'type': 'market',
+        'side': side,
+        'amount': order['quantity'],
+        'params': {'reduceOnly': True} if reduce_only else {}
+    }
 
-        logging.info(f"🔴 [{symbol}] 롱 청산 완료{reason_str}: {quantity} @ ~${current_price:.2f} (PnL: {pnl_str})")
 
-        return {
-            'symbol': symbol,
-            'quantity': quantity,
-            'entry_price': entry_price,
-            'exit_price': current_price,
-            'pnl': unrealized_pnl,
-            'reason': reason
-        }
+def _send_single_order(request):
+    try:
+        order = futures_exchange.create_order(
+            request['symbol'], request['type'], request['side'], request['amount'], None, request['params']
+        )
+        return True, order
+    except Exception as e:
+        return False, str(e)
+
 
+def send_futures_batch_orders(order_requests):
+    """batchOrders 1회 전송 (최대 FUTURES_BATCH_SIZE 건)
+
+    응답은 ccxt 파싱 과정에서 시간순으로 재정렬되므로 주문별 clientOrderId 로 결과를 매핑한다.
+    실패 항목({code, msg})은 상대 순서가 유지되므로 매칭되지 않은 요청에 순서대로 배정한다.
+    Returns: [(성공 여부, 주문 or 오류 메시지)] - 요청 순서
+    """
+    if len(order_requests) == 1:
+        return [_send_single_order(order_requests[0])]
+    client_ids = [f"bt{uuid.uuid4().hex[:30]}" for _ in order_requests]
+    payload = [
+        dict(request, params=dict(request['params'], newClientOrderId=client_id))
+        for request, client_id in zip(order_requests, client_ids)
+    ]
+    try:
+        parsed = futures_exchange.create_orders(payload)
     except Exception as e:
-        logging.error(f"❌ [{symbol}] 롱 청산 실패: {e}")
-        return None
+        # 일괄 요청 자체 실패 - 체결 여부가 불확실하므로 개별 재전송하지 않음 (다음 사이클 원장으로 보정)
+        return [(False, str(e))] * len(order_requests)
+
+    filled = {o.get('clientOrderId'): o for o in parsed if o.get('clientOrderId') in client_ids}
+    failures = [o.get('info') or {} for o in parsed if o.get('clientOrderId') not in client_ids]
+    results = []
+    for client_id in client_ids:
+        if client_id in filled:
+            results.append((True, filled[client_id]))
+        else:
+            info = failures.pop(0) if failures else {}
+            results.append((False, f"binance {json.dumps(info, separators=(',', ':'), ensure_ascii=False, default=str)}"))
+    return results
+
+
+def dispatch_futures_orders(orders, reduce_only, errors):
+    """주문 목록을 FUTURES_BATCH_SIZE 단위 batchOrders 로 묶어 병렬 전송 (FUTURES_ORDER_WORKERS 개 동시)
+
+    Returns: [(성공 여부, 주문 or 오류 메시지)] - orders 순서
+    """
+    if not orders:
+        return []
+    order_requests = [futures_order_request(order, reduce_only) for order in orders]
+    batch_size = FUTURES_BATCH_SIZE if FUTURES_BATCH_ORDERS else 1
+    chunks = [order_requests[i:i + batch_size] for i in range(0, len(order_requests), batch_size)]
+    results = []
+    for chunk, chunk_results in zip(chunks, _run_order_tasks(send_futures_batch_orders, chunks, errors)):
+        results.extend(chunk_results or [(False, '일괄 주문 처리 오류')] * len(chunk))
+    return results
 
 
 # ============================================================
 # 메인 거래 전략
 # ============================================================
 
-def reenter_if_leverage_changed(symbol, pos, side, short_config, long_config):
-    """현재 포지션의 레버리지가 config 목표 레버리지와 다르면 청산 후 재진입.
+def check_leverage_reentry(symbol, pos, side, short_config, long_config):
+    """현재 포지션의 레버리지가 config 목표 레버리지와 다르면 청산 후 재진입 사유 반환.
 
-    Returns: (close_result, open_result) — 변경이 없었거나 실패했으면 (None, None)
+    Returns: 청산 사유 문자열 — 변경이 없으면 None
     Bitget 봇의 '레버리지 변경 → 청산 후 재진입' 동작과 동일.
     """
     if pos is None:
-        return None, None
+        return None
 
     if side == 'short':
         cfg = short_config
@@ -2045,39 +4673,446 @@ def reenter_if_leverage_changed(symbol, pos, side, short_config, long_config):
         target_lev = cfg['long_lev'] if cfg else None
 
     if cfg is None or target_lev is None:
-        return None, None
+        return None
 
     curr_lev = pos.get('leverage', 0) or 0
     if curr_lev <= 0 or curr_lev == target_lev:
-        return None, None
+        return None
 
     logging.info(
         f"[{symbol}] 🔄 {side} 레버리지 변경 감지: {curr_lev}x → {target_lev}x "
         f"(청산 후 재진입)"
     )
-    reason = f"레버리지 변경 {curr_lev}x→{target_lev}x"
-    if side == 'short':
-        close_result = close_short_position(symbol, reason)
+    return f"레버리지 변경 {curr_lev}x→{target_lev}x"
+
+
+def futures_order_intent(action, symbol, side, config=None, reason=None, after_close=False):
+    """주문 큐 항목 (action: 'open' / 'close', after_close: 같은 심볼 청산 성공 시에만 진입)"""
+    return {
+        'action': action,
+        'symbol': symbol,
+        'side': side,
+        'config': config,
+        'reason': reason,
+        'after_close': after_close
+    }
+
+
+def _execute_close_intent(intent):
+    if intent['side'] == 'short':
+        return close_short_position(intent['symbol'], intent['reason'])
+    return close_long_position(intent['symbol'], intent['reason'])
+
+
+def _run_order_tasks(func, items, errors):
+    """items 에 func 를 최대 FUTURES_ORDER_WORKERS 개 동시 실행 (결과는 items 순서)"""
+    def _task(item):
+        try:
+            return func(item)
+        except Exception as e:
+            symbol = item['symbol'] if isinstance(item, dict) else ','.join(i['symbol'] for i in item)
+            errors.append(f"Futures {symbol} 주문 처리 중 오류: {e}")
+            logging.error(f"Futures {symbol} 주문 처리 중 오류: {e}")
+            return None
+
+    if len(items) <= 1 or FUTURES_ORDER_WORKERS <= 1:
+        return [_task(item) for item in items]
+    with ThreadPoolExecutor(max_workers=FUTURES_ORDER_WORKERS) as executor:
+        return list(executor.map(_task, items))
+
+
+def execute_futures_order_queue(order_queue):
+    """사이클 주문 큐 실행
+
+    FUTURES_ORDER_PIPELINE=True:
+      1) 청산 일괄 발주 (reduceOnly batchOrders) → 2) 진입 가격 병렬 갱신
+      → 3) 진입 순차 사이징(원장 예약) → 4) 마진/레버리지 병렬 설정 → 5) 진입 일괄 발주
+    False: 큐 순서대로 순차 실행 (주문별 개별 전송)
+    Returns: (short_open_list, short_close_list, long_open_list, long_close_list, errors)
+    """
+    lists = {('open', 'short'): [], ('close', 'short'): [], ('open', 'long'): [], ('close', 'long'): []}
+    errors = []
+    closed_symbols = set()
+
+    def _record(intent, result):
+        if result:
+            lists[(intent['action'], intent['side'])].append(result)
+            if intent['action'] == 'close':
+                closed_symbols.add(intent['symbol'])
+
+    def _ready(intent):
+        if intent['after_close'] and intent['symbol'] not in closed_symbols:
+            logging.warning(f"[{intent['symbol']}] 청산 실패 — {intent['side']} 진입 건너뜀")
+            return False
+        return True
+
+    started = time.time()
+    if not FUTURES_ORDER_PIPELINE:
+        for intent in order_queue:
+            if intent['action'] == 'close':
+                _record(intent, _run_order_tasks(_execute_close_intent, [intent], errors)[0])
+            elif _ready(intent):
+                open_func = open_short_position if intent['side'] == 'short' else open_long_position
+                _record(intent, _run_order_tasks(lambda i: open_func(i['config']), [intent], errors)[0])
     else:
-        close_result = close_long_position(symbol, reason)
+        # 1) 청산 (확보된 증거금을 진입 사이징에 반영하기 위해 먼저 실행)
+        closes = [i for i in order_queue if i['action'] == 'close']
+        close_orders = []
+        for intent in closes:
+            order = prepare_futures_close(intent['symbol'], intent['side'], intent['reason'])
+            if order:
+                close_orders.append((intent, order))
+        sent = dispatch_futures_orders([order for _, order in close_orders], True, errors)
+        for (intent, order), (ok, detail) in zip(close_orders, sent):
+            if ok:
+                _record(intent, complete_futures_close(order, detail))
+            else:
+                logging.error(f"❌ [{order['symbol']}] {'숏' if order['side'] == 'short' else '롱'} 청산 실패: {detail}")
+        closed_at = time.time()
 
-    if not close_result:
-        logging.warning(f"[{symbol}] 레버리지 변경 청산 실패 — 재진입 건너뜀")
-        return None, None
+        # 2) 진입 가격 병렬 갱신 (스냅샷이 FUTURES_ORDER_PRICE_MAX_AGE 보다 오래된 경우만 조회)
+        opens = [i for i in order_queue if i['action'] == 'open' and _ready(i)]
+        _run_order_tasks(
+            lambda i: get_futures_current_price(i['symbol'], max_age=FUTURES_ORDER_PRICE_MAX_AGE), opens, errors
+        )
+
+        # 3) 순차 사이징 (원장 예약으로 빈 슬롯/가용 잔고 순서 보장)
+        sized = []
+        for intent in opens:
+            order = prepare_futures_open(intent['config'], intent['side'])
+            if order:
+                sized.append((intent, order))
+
+        # 4) 마진 타입/레버리지 병렬 설정 → 5) 진입 일괄 발주
+        _run_order_tasks(setup_futures_open, [order for _, order in sized], errors)
+        sent = dispatch_futures_orders([order for _, order in sized], False, errors)
+        for (intent, order), (ok, detail) in zip(sized, sent):
+            if ok:
+                _record(intent, complete_futures_open(order))
+            else:
+                fail_futures_open(order, detail)
+        if order_queue:
+            logging.info(
+                f"⚡ 주문 파이프라인: 청산 {len(closes)}건 {closed_at - started:.1f}초, "
+                f"진입 {len(sized)}/{len(opens)}건 {time.time() - closed_at:.1f}초"
+            )
 
-    time.sleep(1)  # 포지션 반영 대기
+    return (lists[('open', 'short')], lists[('close', 'short')],
+            lists[('open', 'long')], lists[('close', 'long')], errors)
 
-    if side == 'short':
-        open_result = open_short_position(cfg)
+
+def collect_futures_symbol_data(spec, position=True):
+    """심볼 1개의 의사결정 입력값 조회 (현재가, 포지션, 캔들 적재)
+
+    주문/사이징과 무관한 조회 전용 함수이므로 워커 스레드에서 호출해도 안전하다.
+    MA/스토캐스틱은 전 심볼 적재 후 compute_futures_indicators()에서 일괄 계산한다.
+    position=False 이면 포지션은 생략 (샤드 워커 - 원장을 가진 메인 프로세스가 채움)
+    Returns: dict (현재가 조회 실패 시 None)
+    """
+    current_price = get_futures_current_price(spec.symbol)
+    if current_price is None:
+        return None
+
+    # (symbol, timeframe)당 최대 창으로 1회만 다운로드
+    prefetch_futures_candles(spec)
+
+    data = {'current_price': current_price}
+    if position:
+        data['pos'] = get_futures_position(spec.symbol)
+    return data
+
+
+def collect_futures_market_data(symbols, positions=True):
+    """전체 심볼의 의사결정 입력값 일괄 조회
+
+    FUTURES_CONCURRENT_EVAL=True 이면 FUTURES_FETCH_WORKERS 개 스레드로 병렬 조회하고,
+    요청 속도는 공유 가중치 제한기(api_rate_limiter)가 조절한다.
+    샤드 워커가 실행 중이면 심볼 파티션별로 워커 프로세스에 맡긴다 (collect_sharded_market_data).
+    Returns: {symbol: data or None} - 실패 시 {'error': str}
+    """
+    if futures_shard_pool is not None:
+        return collect_sharded_market_data(symbols)
+
+    def _collect(symbol):
+        try:
+            return collect_futures_symbol_data(SYMBOL_REGISTRY.specs[symbol], positions)
+        except Exception as e:
+            return {'error': str(e)}
+
+    started = time.time()
+    results = {}
+    with metrics_phase('candles'):
+        if FUTURES_CONCURRENT_EVAL and len(symbols) > 1:
+            with ThreadPoolExecutor(max_workers=FUTURES_FETCH_WORKERS) as executor:
+                for symbol, data in zip(symbols, executor.map(_collect, symbols)):
+                    results[symbol] = data
+        else:
+            for symbol in symbols:
+                results[symbol] = _collect(symbol)
+
+    fetched = time.time()
+    with metrics_phase('indicators'):
+        ready = [s for s in symbols if results.get(s) and 'error' not in results[s]]
+        indicators = compute_futures_indicators(ready)
+        for symbol in ready:
+            results[symbol].update(indicators[symbol])
+
+    save_stoch_cache()
+    logging.info(
+        f"📥 시세/캔들 수집 완료: {len(symbols)}개 심볼, "
+        f"조회 {fetched - started:.1f}초 + 지표 {time.time() - fetched:.2f}초"
+    )
+    return results
+
+
+# ============================================================
+# 심볼 샤딩 (멀티 프로세스)
+# ============================================================
+# 메인 프로세스(코디네이터): 가격 스냅샷, 포지션/잔고 원장, 의사결정, 슬롯 사이징
+#   (calculate_futures_invest_amount_for_symbol), 주문 실행 - 주문 진입은 지금처럼 한 곳에서 순차 처리
+# 샤드 워커 프로세스 N개: 고정 배정된 심볼의 캔들 조회 + MA/스토캐스틱 계산 (캐시/증분 상태를 사이클 간 유지)
+# 시세 스트림 연결은 코디네이터에만 두고, 보충 완료된 진행 중 캔들을 요청마다 워커에 넘긴다 (ShardStreamView)
+
+def symbol_shard(symbol, shard_count):
+    """심볼 → 샤드 번호 (심볼 이름 해시 - 목록이 늘어도 기존 심볼의 담당 워커는 바뀌지 않음)"""
+    return int(hashlib.md5(symbol.encode('utf-8')).hexdigest()[:8], 16) % shard_count
+
+
+def _shard_state_path(path, index):
+    """샤드 전용 상태 파일 경로 (binance_futures_stoch_cache.json → binance_futures_stoch_cache.shard0.json)"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{index}{ext}"
+
+
+def init_shard_worker(index, count):
+    """샤드 워커 프로세스 준비
+
+    - 시세 조회용 거래소 (모의 백엔드면 녹화 캔들 모의 거래소 - 시각은 요청마다 코디네이터와 맞춤)
+    - 스토캐스틱 캐시 파일은 샤드 전용, 캔들 저장소는 공유 (담당 심볼이 겹치지 않음)
+    - IP 가중치 한도는 워커마다 1/count, 스트림 연결은 끔 (가격 스냅샷/진행 중 캔들은 코디네이터가 요청마다 전달)
+    """
+    global _shard_index, api_rate_limiter, futures_exchange, SYMBOL_REGISTRY
+    global FUTURES_STOCH_CACHE_FILE, LONG_STOCH_CACHE_FILE, FUTURES_STREAM_ENABLED, FUTURES_USER_STREAM_ENABLED
+    _shard_index = index
+    for handler in logging.getLogger().handlers:
+        handler.setFormatter(logging.Formatter(f'%(asctime)s - %(levelname)s: [샤드{index}] %(message)s'))
+    FUTURES_STREAM_ENABLED = FUTURES_USER_STREAM_ENABLED = False
+    api_rate_limiter = WeightRateLimiter(API_WEIGHT_LIMITS, API_WEIGHT_SAFETY, share=1.0 / count)
+    SYMBOL_REGISTRY = build_symbol_registry([], [], {})  # 담당 심볼 설정은 첫 요청에서 받음
+
+    if EXECUTION_BACKEND == 'paper':
+        import binance_paper
+        use_paper_backend(binance_paper.SimulatedFuturesExchange.from_candle_file(
+            PAPER_CANDLE_FILE, markets=binance_paper.load_cached_markets(FUTURES_MARKETS_CACHE_FILE)
+        ))
     else:
-        open_result = open_long_position(cfg)
+        futures_exchange = _new_futures_exchange()
+        load_markets_cached(futures_exchange, FUTURES_MARKETS_CACHE_FILE)
+    FUTURES_STOCH_CACHE_FILE = _shard_state_path(FUTURES_STOCH_CACHE_FILE, index)
+    LONG_STOCH_CACHE_FILE = _shard_state_path(LONG_STOCH_CACHE_FILE, index)
+    load_stoch_cache()
+    logging.info(f"🧩 샤드 워커 준비 완료 ({index + 1}/{count}, pid {os.getpid()})")
+
+
+def run_shard_request(request):
+    """샤드 워커: 담당 심볼 설정/가격/시각을 반영하고 캔들 조회 + 지표 계산
+
+    Returns: {'results': {symbol: data}, 'requests': 요청 통계 또는 None,
+              'backfills': 스트림 키 REST 보충 [(symbol, timeframe, 시작 시각)], 'memory_hits': 스트림 경로 사용 수}
+             - data 에 포지션은 없음
+    """
+    global SYMBOL_REGISTRY, _shard_configs, cycle_metrics, futures_market_stream
+    futures_exchange.options['timeDifference'] = request['time_difference']
+    if request['configs'] != _shard_configs:
+        registry = build_symbol_registry(*request['configs'])
+        invalidate_symbol_indicators(_stoch_changed_symbols(SYMBOL_REGISTRY, registry) & set(registry.specs))
+        SYMBOL_REGISTRY = registry
+        _shard_configs = request['configs']
+
+    now = time.time()
+    with _price_snapshot_lock:
+        futures_price_snapshot.clear()
+        futures_price_snapshot.update({s: (price, now - age) for s, (price, age) in request['prices'].items()})
+    clear_futures_candle_cache()
+    view = ShardStreamView(request['forming']) if request['forming'] is not None else None
+    futures_market_stream = view
+
+    cycle_metrics = CycleMetrics() if request['metrics'] else None
+    try:
+        results = collect_futures_market_data(request['symbols'], positions=False)
+    finally:
+        metrics, cycle_metrics = cycle_metrics, None
+    return {
+        'results': results,
+        'requests': metrics.export_requests() if metrics is not None else None,
+        'backfills': view.backfills if view is not None else [],
+        'memory_hits': view.memory_hits if view is not None else 0,
+    }
+
+
+def _shard_worker_main(index, count, conn):
+    """샤드 워커 프로세스 진입점 - 요청(dict)마다 run_shard_request() 결과 응답, None 또는 연결 종료 시 끝"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C 는 코디네이터가 처리
+    init_shard_worker(index, count)
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        try:
+            reply = run_shard_request(request)
+        except Exception as e:
+            logging.error(f"샤드 요청 처리 중 오류: {e}")
+            reply = {'error': str(e)}
+        conn.send(reply)
+
+
+class FuturesShardPool:
+    """심볼 파티션별 샤드 워커 프로세스 묶음 (코디네이터 쪽)
+
+    - collect(): 심볼을 symbol_shard() 로 나눠 전 워커에 동시에 요청 후 결과 병합
+    - 응답이 없거나 죽은 워커는 교체 (늦은 응답이 다음 사이클에 섞이지 않도록)
+    - 워커는 spawn 으로 시작 (메인 프로세스의 스트림/타임아웃 스레드를 물려받지 않음)
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.workers = [None] * count  # (Process, Connection)
+        self.context = multiprocessing.get_context('spawn')
+
+    def _spawn(self, index):
+        parent, child = self.context.Pipe()
+        process = self.context.Process(target=_shard_worker_main, args=(index, self.count, child),
+                                       name=f'futures-shard-{index}', daemon=True)
+        process.start()
+        child.close()
+        self.workers[index] = (process, parent)
+
+    def _discard(self, index):
+        process, conn = self.workers[index]
+        self.workers[index] = None
+        conn.close()
+        if process.is_alive():
+            process.terminate()
+        process.join(1)
+
+    def start(self):
+        for index in range(self.count):
+            self._spawn(index)
+        return self
+
+    def stop(self, timeout=5):
+        for worker in self.workers:
+            if worker is not None:
+                try:
+                    worker[1].send(None)
+                except (OSError, EOFError):
+                    pass
+        for index, worker in enumerate(self.workers):
+            if worker is not None:
+                worker[0].join(timeout)
+                self._discard(index)
+
+    def partition(self, symbols):
+        parts = [[] for _ in range(self.count)]
+        for symbol in symbols:
+            parts[symbol_shard(symbol, self.count)].append(symbol)
+        return parts
+
+    def collect(self, symbols):
+        """심볼 파티션별 캔들/지표 조회 - {symbol: data} (포지션 제외, 실패 샤드의 심볼은 {'error'})"""
+        now = time.time()
+        with _price_snapshot_lock:
+            prices = {s: (price, now - at) for s, (price, at) in futures_price_snapshot.items()}
+        time_difference = futures_exchange.options.get('timeDifference', 0) if futures_exchange is not None else 0
+        stream = futures_market_stream
+        forming = stream.export_forming(symbols) if stream is not None else None
+
+        results = {}
+        pending = {}
+        for index, part in enumerate(self.partition(symbols)):
+            if not part:
+                continue
+            if self.workers[index] is None or not self.workers[index][0].is_alive():
+                logging.warning(f"⚠️ 샤드 워커 {index} 재시작")
+                if self.workers[index] is not None:
+                    self._discard(index)
+                self._spawn(index)
+            specs = [SYMBOL_REGISTRY.specs[s] for s in part]
+            members = set(part)
+            request = {
+                'symbols': part,
+                'configs': ([dict(spec.short_config) for spec in specs if spec.short_config],
+                            [dict(spec.long_config) for spec in specs if spec.long_config],
+                            {spec.symbol: spec.priority for spec in specs}),
+                'prices': {s: prices[s] for s in part if s in prices},
+                'time_difference': time_difference,
+                'forming': ({key: row for key, row in forming.items() if key[0] in members}
+                            if forming is not None else None),
+                'metrics': cycle_metrics is not None,
+            }
+            try:
+                self.workers[index][1].send(request)
+                pending[index] = part
+            except (OSError, EOFError) as e:
+                results.update({s: {'error': f"샤드 {index} 요청 실패: {e}"} for s in part})
+
+        deadline = time.monotonic() + FUTURES_SHARD_TIMEOUT
+        for index, part in pending.items():
+            conn = self.workers[index][1]
+            try:
+                if not conn.poll(max(0.0, deadline - time.monotonic())):
+                    raise TimeoutError(f"{FUTURES_SHARD_TIMEOUT}초 내 응답 없음")
+                reply = conn.recv()
+            except (OSError, EOFError, TimeoutError) as e:
+                logging.error(f"❌ 샤드 워커 {index} 응답 실패 ({len(part)}개 심볼): {e}")
+                self._discard(index)
+                self._spawn(index)
+                reply = {'error': str(e)}
+            if 'error' in reply:
+                results.update({s: {'error': f"샤드 {index}: {reply['error']}"} for s in part})
+                continue
+            results.update(reply['results'])
+            if stream is not None:
+                for symbol, timeframe, fetch_started in reply.get('backfills', ()):
+                    stream.mark_synced(symbol, timeframe, fetch_started)
+                stream.stats['memory_hits'] += reply.get('memory_hits', 0)
+            if cycle_metrics is not None and reply.get('requests'):
+                cycle_metrics.merge_requests(reply['requests'])
+        return results
+
+
+def collect_sharded_market_data(symbols):
+    """샤드 워커에 캔들/지표를 나눠 맡기고 포지션은 코디네이터 원장에서 채움"""
+    started = time.time()
+    with metrics_phase('shards'):
+        results = futures_shard_pool.collect(symbols)
+    for symbol in symbols:
+        data = results.get(symbol)
+        if data and 'error' not in data:
+            data['pos'] = get_futures_position(symbol)
+    logging.info(
+        f"📥 샤드 수집 완료: {len(symbols)}개 심볼, 워커 {futures_shard_pool.count}개, {time.time() - started:.1f}초"
+    )
+    return results
 
-    return close_result, open_result
+
+def start_futures_shard_pool():
+    """FUTURES_SHARD_WORKERS > 1 이면 샤드 워커 프로세스 시작 (이미 실행 중이면 유지)"""
+    global futures_shard_pool
+    if FUTURES_SHARD_WORKERS <= 1 or futures_shard_pool is not None:
+        return futures_shard_pool
+    futures_shard_pool = FuturesShardPool(FUTURES_SHARD_WORKERS).start()
+    logging.info(f"🧩 심볼 샤딩 시작: 워커 프로세스 {FUTURES_SHARD_WORKERS}개 (주문/슬롯 사이징은 메인 프로세스)")
+    return futures_shard_pool
 
 
 def futures_trade_strategy():
     """Futures 숏+롱 거래 전략"""
-    global futures_exchange
+    global futures_exchange, last_futures_order_queue
+    last_futures_order_queue = []
     short_open_list, short_close_list = [], []
     long_open_list, long_close_list = [], []
     errors = []
@@ -2091,68 +5126,67 @@ def futures_trade_strategy():
 
         logging.info("✅ Futures API 연결 정상")
 
-        # Spot USDT 자동 충전 (Futures → Spot, BNB 매수 선행 조건)
-        check_and_refill_spot_usdt()
+        with metrics_phase('setup'):
+            # Spot USDT 자동 충전 (Futures → Spot, BNB 매수 선행 조건)
+            check_and_refill_spot_usdt()
 
-        # Futures BNB 자동 충전
-        check_and_recharge_futures_bnb()
+            # Futures BNB 자동 충전
+            check_and_recharge_futures_bnb()
+
+            # 포지션/잔고 원장 구성 (사이클 내 추가 조회 없음)
+            build_futures_ledger()
+            ensure_futures_account_config()
 
         balance = get_futures_balance()
         logging.info("=" * 80)
         logging.info(f"📉📈 Futures 거래 - 총자산: ${balance['total']:,.2f}, 가용: ${balance['free']:,.2f}")
         logging.info("=" * 80)
 
-        # 현재 모든 포지션 조회
-        all_positions = get_all_futures_positions()
-        active_position_map = {}  # symbol -> side
-        for pos in all_positions:
-            active_position_map[pos['symbol']] = pos['side']
-
-        # ─── 코인별 통합 설정 맵 생성 ───
-        short_config_map = {}  # symbol -> short config
-        for cfg in SHORT_TRADING_CONFIGS:
-            short_config_map[cfg['symbol']] = cfg
-
-        long_config_map = {}  # symbol -> long config
-        for cfg in LONG_TRADING_CONFIGS:
-            long_config_map[cfg['symbol']] = cfg
-
-        # 모든 고유 심볼 수집 (숏 코인 기준 순서 유지, 롱 전용은 뒤에 추가)
-        all_symbols = []
-        seen = set()
-        for cfg in SHORT_TRADING_CONFIGS:
-            if cfg['symbol'] not in seen:
-                all_symbols.append(cfg['symbol'])
-                seen.add(cfg['symbol'])
-        for cfg in LONG_TRADING_CONFIGS:
-            if cfg['symbol'] not in seen:
-                all_symbols.append(cfg['symbol'])
-                seen.add(cfg['symbol'])
+        # ─── 처리 대상 심볼 (레지스트리 순서: 숏 코인 기준, 롱 전용은 뒤에) ───
+        all_symbols = SYMBOL_REGISTRY.symbols
 
         logging.info("─" * 40)
         logging.info(f"🔄 코인별 통합 전략 시작 (총 {len(all_symbols)}개)")
         if runtime_excluded_coins:
-            logging.info(f"⚠️ 런타임 제외 코인: {', '.join(sorted(runtime_excluded_coins))}")
+            excluded = sorted(runtime_excluded_coins)
+            logging.info(f"⚠️ 런타임 제외 코인 {len(excluded)}개: {', '.join(excluded[:20])}"
+                         f"{' ...' if len(excluded) > 20 else ''}")
         logging.info("─" * 40)
 
-        # ─── 코인별 통합 루프 ───
-        for symbol in all_symbols:
-            # 제외 코인 체크
-            if symbol in FUTURES_EXCLUDED_COINS or symbol in runtime_excluded_coins:
-                continue
-
+        # ─── 전 심볼 가격 스냅샷 (fetch_tickers 1회) ───
+        with metrics_phase('snapshot'):
+            refresh_futures_price_snapshot()
+            revalue_futures_ledger()
+        clear_futures_candle_cache()
+
+        # ─── 시세/포지션/캔들 일괄 조회 (병렬) ───
+        target_symbols = [
+            s for s in all_symbols
+            if s not in FUTURES_EXCLUDED_COINS and s not in runtime_excluded_coins
+        ]
+        if cycle_metrics is not None:
+            cycle_metrics.count('symbols', len(target_symbols))
+        market_data = collect_futures_market_data(target_symbols)
+
+        # ─── 코인별 통합 루프 (의사결정 → 주문 큐, 주문은 루프 후 파이프라인으로 실행) ───
+        order_queue = []
+        decisions_started = time.perf_counter()
+        for symbol in target_symbols:
             try:
-                time.sleep(0.15)
-
-                short_config = short_config_map.get(symbol)
-                long_config = long_config_map.get(symbol)
+                spec = SYMBOL_REGISTRY.specs[symbol]
+                short_config = spec.short_config
+                long_config = spec.long_config
 
-                current_price = get_futures_current_price(symbol)
-                if current_price is None:
+                data = market_data.get(symbol)
+                if data is None:
                     continue
+                if 'error' in data:
+                    raise RuntimeError(data['error'])
+
+                current_price = data['current_price']
 
                 # 현재 포지션 확인
-                pos = get_futures_position(symbol)
+                pos = data['pos']
                 current_side = None  # 'short', 'long', or None
                 if pos:
                     current_side = pos['side']
@@ -2163,8 +5197,8 @@ def futures_trade_strategy():
                 short_stoch_condition = False
                 if short_config:
                     ma_period = short_config['ma_period']
-                    ma_price = get_futures_ma_price(symbol, ma_period)
-                    stoch_data = get_futures_stochastic_signal(symbol)
+                    ma_price = data['ma_price']
+                    stoch_data = data['stoch_data']
 
                     if ma_price is not None:
                         short_ma_condition = current_price < ma_price
@@ -2184,9 +5218,9 @@ def futures_trade_strategy():
                     long_ma_period = long_config['long_ma']
                     short_ma_period = long_config['short_ma']
 
-                    short_ma_price = get_futures_ma_price(symbol, short_ma_period)
-                    long_ma_price = get_futures_ma_price(symbol, long_ma_period)
-                    long_stoch_data = get_long_stochastic_signal(symbol)
+                    short_ma_price = data['short_ma_price']
+                    long_ma_price = data['long_ma_price']
+                    long_stoch_data = data['long_stoch_data']
 
                     if short_ma_price is not None and long_ma_price is not None and long_stoch_data is not None:
                         short_ma_cond = current_price < short_ma_price
@@ -2209,7 +5243,7 @@ def futures_trade_strategy():
                         logging.info(f"[롱][{symbol}] LongSignal:{long_signal_active} → 진입:{final_long_condition}")
 
                 # ── 의사결정 (코인별 우선순위 적용) ──
-                coin_priority = COIN_PRIORITY.get(symbol, 'short')
+                coin_priority = spec.priority
 
                 # 우선순위에 따라 1차/2차 조건 결정
                 if coin_priority == 'long':
@@ -2223,118 +5257,59 @@ def futures_trade_strategy():
                     first_side = 'short'
                     second_side = 'long'
 
+                side_configs = {'short': short_config, 'long': long_config}
+
                 if first_condition:
                     # 1차 우선 신호 ON
                     if current_side == first_side:
                         # 레버리지 변경 감지 시 청산 → 재진입
-                        close_r, open_r = reenter_if_leverage_changed(
-                            symbol, pos, first_side, short_config, long_config
-                        )
-                        if close_r:
-                            (short_close_list if first_side == 'short' else long_close_list).append(close_r)
-                        if open_r:
-                            (short_open_list if first_side == 'short' else long_open_list).append(open_r)
-                            active_position_map[symbol] = first_side
-                        if not close_r:
+                        reason = check_leverage_reentry(symbol, pos, first_side, short_config, long_config)
+                        if reason:
+                            order_queue.append(futures_order_intent('close', symbol, first_side, reason=reason))
+                            order_queue.append(futures_order_intent(
+                                'open', symbol, first_side, side_configs[first_side], after_close=True))
+                        else:
                             logging.info(f"[{symbol}] ➡️ {first_side} 포지션 유지 ({coin_priority}우선)")
                     elif current_side == second_side:
                         # 반대 포지션 청산 → 우선 포지션 진입
                         logging.info(f"[{symbol}] 🔄 {second_side}→{first_side} 전환 ({coin_priority}우선)")
-                        if second_side == 'long':
-                            close_result = close_long_position(symbol, f"{first_side} 신호 발생 - 포지션 전환")
-                            if close_result:
-                                long_close_list.append(close_result)
-                        else:
-                            close_result = close_short_position(symbol, f"{first_side} 신호 발생 - 포지션 전환")
-                            if close_result:
-                                short_close_list.append(close_result)
-                        if first_side == 'short':
-                            open_result = open_short_position(short_config)
-                            if open_result:
-                                short_open_list.append(open_result)
-                                active_position_map[symbol] = 'short'
-                        else:
-                            open_result = open_long_position(long_config)
-                            if open_result:
-                                long_open_list.append(open_result)
-                                active_position_map[symbol] = 'long'
+                        order_queue.append(futures_order_intent(
+                            'close', symbol, second_side, reason=f"{first_side} 신호 발생 - 포지션 전환"))
+                        order_queue.append(futures_order_intent(
+                            'open', symbol, first_side, side_configs[first_side], after_close=True))
                     else:
                         # 현금 → 우선 포지션 진입
-                        if first_side == 'short':
-                            result = open_short_position(short_config)
-                            if result:
-                                short_open_list.append(result)
-                                active_position_map[symbol] = 'short'
-                        else:
-                            result = open_long_position(long_config)
-                            if result:
-                                long_open_list.append(result)
-                                active_position_map[symbol] = 'long'
+                        order_queue.append(futures_order_intent('open', symbol, first_side, side_configs[first_side]))
 
                 elif second_condition:
                     # 2차 신호 ON (1차 신호 OFF)
                     if current_side == second_side:
                         # 레버리지 변경 감지 시 청산 → 재진입
-                        close_r, open_r = reenter_if_leverage_changed(
-                            symbol, pos, second_side, short_config, long_config
-                        )
-                        if close_r:
-                            (short_close_list if second_side == 'short' else long_close_list).append(close_r)
-                        if open_r:
-                            (short_open_list if second_side == 'short' else long_open_list).append(open_r)
-                            active_position_map[symbol] = second_side
-                        if not close_r:
+                        reason = check_leverage_reentry(symbol, pos, second_side, short_config, long_config)
+                        if reason:
+                            order_queue.append(futures_order_intent('close', symbol, second_side, reason=reason))
+                            order_queue.append(futures_order_intent(
+                                'open', symbol, second_side, side_configs[second_side], after_close=True))
+                        else:
                             logging.info(f"[{symbol}] ➡️ {second_side} 포지션 유지 ({coin_priority}우선)")
                     elif current_side == first_side:
                         # 우선 포지션 청산 → 2차 포지션 진입
                         logging.info(f"[{symbol}] 🔄 {first_side}→{second_side} 전환 ({coin_priority}우선)")
-                        if first_side == 'long':
-                            close_result = close_long_position(symbol, f"{second_side} 신호 발생 - 포지션 전환")
-                            if close_result:
-                                long_close_list.append(close_result)
-                        else:
-                            close_result = close_short_position(symbol, f"{second_side} 신호 발생 - 포지션 전환")
-                            if close_result:
-                                short_close_list.append(close_result)
-                        if second_side == 'short':
-                            open_result = open_short_position(short_config)
-                            if open_result:
-                                short_open_list.append(open_result)
-                                active_position_map[symbol] = 'short'
-                        else:
-                            open_result = open_long_position(long_config)
-                            if open_result:
-                                long_open_list.append(open_result)
-                                active_position_map[symbol] = 'long'
+                        order_queue.append(futures_order_intent(
+                            'close', symbol, first_side, reason=f"{second_side} 신호 발생 - 포지션 전환"))
+                        order_queue.append(futures_order_intent(
+                            'open', symbol, second_side, side_configs[second_side], after_close=True))
                     else:
                         # 현금 → 2차 포지션 진입
-                        if second_side == 'short':
-                            result = open_short_position(short_config)
-                            if result:
-                                short_open_list.append(result)
-                                active_position_map[symbol] = 'short'
-                        else:
-                            result = open_long_position(long_config)
-                            if result:
-                                long_open_list.append(result)
-                                active_position_map[symbol] = 'long'
+                        order_queue.append(futures_order_intent('open', symbol, second_side, side_configs[second_side]))
 
                 else:
                     # 둘 다 OFF → 기존 포지션 청산
                     if current_side == 'short':
                         reason = "MA 조건 미충족" if not short_ma_condition else "스토캐스틱 조건 미충족"
-                        result = close_short_position(symbol, reason)
-                        if result:
-                            short_close_list.append(result)
-                            if symbol in active_position_map:
-                                del active_position_map[symbol]
+                        order_queue.append(futures_order_intent('close', symbol, 'short', reason=reason))
                     elif current_side == 'long':
-                        reason = "롱 신호 미충족"
-                        result = close_long_position(symbol, reason)
-                        if result:
-                            long_close_list.append(result)
-                            if symbol in active_position_map:
-                                del active_position_map[symbol]
+                        order_queue.append(futures_order_intent('close', symbol, 'long', reason="롱 신호 미충족"))
                     else:
                         logging.info(f"[{symbol}] ➡️ 현금 유지")
 
@@ -2342,6 +5317,18 @@ def futures_trade_strategy():
                 errors.append(f"Futures {symbol} 처리 중 오류: {e}")
                 logging.error(f"Futures {symbol} 처리 중 오류: {e}")
 
+        last_futures_order_queue = order_queue
+        if cycle_metrics is not None:
+            cycle_metrics.phases['decisions'] = time.perf_counter() - decisions_started
+            cycle_metrics.count('orders', len(order_queue))
+
+        # ─── 주문 큐 실행 (청산 → 진입) ───
+        with metrics_phase('orders'):
+            (short_open_list, short_close_list, long_open_list, long_close_list,
+             order_errors) = execute_futures_order_queue(order_queue)
+            settle_futures_close_fills(short_close_list + long_close_list)
+        errors.extend(order_errors)
+
     except Exception as e:
         logging.error(f"Futures 전략 실행 중 오류: {e}")
         errors.append(f"Futures 전략 오류: {e}")
@@ -2351,28 +5338,47 @@ def futures_trade_strategy():
 
 def trade_strategy():
     """Futures 전용 거래 전략"""
+    global cycle_metrics
+    cycle_metrics = CycleMetrics() if CYCLE_METRICS_ENABLED else None
+    try:
+        _run_trade_cycle()
+    finally:
+        metrics, cycle_metrics = cycle_metrics, None
+        if metrics is not None:
+            write_cycle_metrics(metrics)
+
+
+def _run_trade_cycle():
     logging.info("\n" + "=" * 80)
     logging.info("📊 Futures 거래 전략 실행 시작")
     logging.info("=" * 80)
 
+    # 설정 파일 변경 반영 (사이클 사이 교체)
+    if TRADING_CONFIG_RELOAD:
+        reload_trading_configs()
+
     # Futures 전략 실행 (숏 + 롱)
     futures_short_open, futures_short_close, futures_long_open, futures_long_close, futures_errors = futures_trade_strategy()
 
     # 결과 수집
     all_errors = futures_errors
 
-    # 최종 자산 조회
-    futures_balance = get_futures_balance()
-    futures_total = futures_balance['total']
-    futures_usdt = futures_balance['free']
-
-    # 텔레그램 알림
-    send_trade_summary(
-        futures_short_open, futures_short_close,
-        futures_long_open, futures_long_close,
-        futures_total, futures_usdt,
-        all_errors
-    )
+    with metrics_phase('summary'):
+        # 최종 자산 조회 (REST 1회로 원장 잔고 보정)
+        futures_balance = get_futures_balance(fresh=True)
+        futures_total = futures_balance['total']
+        futures_usdt = futures_balance['free']
+
+        # 텔레그램 리포트 본문 (포지션 현황은 원장 사용)
+        report = build_trade_summary(
+            futures_short_open, futures_short_close,
+            futures_long_open, futures_long_close,
+            futures_total, futures_usdt,
+            all_errors
+        )
+    # 계측 요약은 summary 단계 기록 후에 붙임 (텔레그램 전송 시간은 단계에 포함하지 않음)
+    send_trade_report(report, metrics=cycle_metrics)
+    clear_futures_ledger()
 
     logging.info("=" * 80)
     logging.info(f"📊 완료 - Futures 숏 진입: {len(futures_short_open)}건 / 청산: {len(futures_short_close)}건")
@@ -2380,6 +5386,96 @@ def trade_strategy():
     logging.info("=" * 80)
 
 
+# ============================================================
+# 4시간봉 마감 스케줄러
+# ============================================================
+
+def exchange_time_ms():
+    """바이낸스 서버 기준 현재 시각 (ms) - ccxt timeDifference(로컬 - 서버) 보정"""
+    offset = futures_exchange.options.get('timeDifference', 0) if futures_exchange is not None else 0
+    return int(time.time() * 1000) - int(offset or 0)
+
+
+def next_candle_close_ms(now_ms, timeframe=CYCLE_TIMEFRAME):
+    """now_ms 이후 첫 캔들 마감 시각 (ms)"""
+    period = TIMEFRAME_MS[timeframe]
+    return (now_ms // period + 1) * period
+
+
+def sleep_until_ms(target_ms):
+    """서버 시각 target_ms 까지 대기 (긴 대기는 나눠 자며 시계 보정 반영)"""
+    while True:
+        remaining = (target_ms - exchange_time_ms()) / 1000
+        if remaining <= 0:
+            return
+        time.sleep(min(remaining, 60))
+
+
+def _next_cycle_close(last_close_ms):
+    """직전 사이클의 마감 시각 기준 다음 실행 마감 시각 (초과 실행 시 CYCLE_OVERRUN_POLICY 적용)"""
+    period = TIMEFRAME_MS[CYCLE_TIMEFRAME]
+    upcoming = next_candle_close_ms(exchange_time_ms())
+    missed = (upcoming - last_close_ms) // period - 1
+    if missed <= 0:
+        return upcoming
+    if CYCLE_OVERRUN_POLICY == 'merge':
+        cycle_schedule_stats['merged'] += missed
+        logging.warning(f"⏱️ 이전 사이클이 마감 {missed}회를 넘김 - 최근 마감 기준으로 즉시 1회 실행")
+        return upcoming - period
+    cycle_schedule_stats['skipped'] += missed
+    logging.warning(f"⏱️ 이전 사이클이 마감 {missed}회를 넘김 - 건너뛰고 다음 마감까지 대기")
+    return upcoming
+
+
+def run_scheduled_cycle(close_ms):
+    """close_ms 마감 캔들 기준 사이클 실행 및 지연/소요 시간 기록"""
+    lag = (exchange_time_ms() - close_ms) / 1000
+    close_time = datetime.fromtimestamp(close_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d %H:%M UTC')
+    logging.info(f"⏱️ {close_time} 마감 사이클 시작 (지연 {lag:.2f}초)")
+    if lag > CYCLE_LAG_WARN:
+        logging.warning(f"⚠️ 사이클 시작 지연 {lag:.1f}초 (기준 {CYCLE_LAG_WARN}초)")
+
+    started = time.monotonic()
+    try:
+        trade_strategy()
+    except Exception as e:
+        logging.error(f"사이클 실행 중 오류: {e}")
+    duration = time.monotonic() - started
+
+    cycle_schedule_stats['runs'] += 1
+    cycle_schedule_stats['last_lag'] = lag
+    cycle_schedule_stats['max_lag'] = max(cycle_schedule_stats['max_lag'], lag)
+    cycle_schedule_stats['last_duration'] = duration
+    logging.info(
+        f"⏱️ 사이클 완료 - 지연 {lag:.2f}초, 소요 {duration:.1f}초 "
+        f"(누적 {cycle_schedule_stats['runs']}회, 최대 지연 {cycle_schedule_stats['max_lag']:.2f}초, "
+        f"병합 {cycle_schedule_stats['merged']}, 건너뜀 {cycle_schedule_stats['skipped']})"
+    )
+
+
+def run_candle_close_scheduler(run_now=True):
+    """UTC 4시간봉 마감마다 CYCLE_START_DELAY 초 뒤 사이클 실행 (반환하지 않음)
+
+    사이클은 메인 스레드에서 순차 실행되므로 겹치지 않으며,
+    사이클이 다음 마감을 넘기면 CYCLE_OVERRUN_POLICY 에 따라 병합 또는 건너뛴다.
+    """
+    period = TIMEFRAME_MS[CYCLE_TIMEFRAME]
+    close_ms = next_candle_close_ms(exchange_time_ms()) - period
+    if run_now:
+        logging.info("🚀 시작 시 전략 즉시 실행...")
+        trade_strategy()
+        close_ms = _next_cycle_close(close_ms)
+    else:
+        close_ms += period
+
+    while True:
+        next_time = datetime.fromtimestamp(close_ms / 1000, tz=timezone.utc).astimezone(timezone(timedelta(hours=9)))
+        logging.info(f"⏳ 다음 사이클: {next_time.strftime('%Y-%m-%d %H:%M')} KST 마감 + {CYCLE_START_DELAY}초")
+        sleep_until_ms(close_ms + CYCLE_START_DELAY * 1000)
+        run_scheduled_cycle(close_ms)
+        close_ms = _next_cycle_close(close_ms)
+
+
 def log_strategy_info():
     logging.info("=" * 80)
     logging.info("🤖 바이낸스 Futures 자동매매 봇 v6.0.0 (코인별 롱/숏 우선순위)")
@@ -2387,10 +5483,10 @@ def log_strategy_info():
     logging.info("📉 Futures 숏: 현재가 < MA(4H) AND Slow %K < Slow %D (1D)")
     logging.info("📈 Futures 롱: NOT 숏필터 AND (현재가 > MA AND K > D)")
     logging.info("🔄 코인별 우선순위: 롱우선 코인은 롱→숏 순, 숏우선 코인은 숏→롱 순 확인")
-    long_priority_count = sum(1 for v in COIN_PRIORITY.values() if v == 'long')
-    short_priority_count = sum(1 for v in COIN_PRIORITY.values() if v == 'short')
-    logging.info(f"🔻 Futures 숏 대상: {len(SHORT_TRADING_CONFIGS)}개 코인")
-    logging.info(f"🟢 Futures 롱 대상: {len(LONG_TRADING_CONFIGS)}개 코인")
+    long_priority_count = sum(1 for spec in SYMBOL_REGISTRY.specs.values() if spec.priority == 'long')
+    short_priority_count = len(SYMBOL_REGISTRY.specs) - long_priority_count
+    logging.info(f"🔻 Futures 숏 대상: {len(SYMBOL_REGISTRY.short_symbols)}개 코인")
+    logging.info(f"🟢 Futures 롱 대상: {len(SYMBOL_REGISTRY.long_symbols)}개 코인")
     logging.info(f"🔄 우선순위: 롱우선 {long_priority_count}개, 숏우선 {short_priority_count}개")
     logging.info(f"📊 Futures 총 슬롯: {get_effective_futures_coins()}개 (제외 {TOTAL_FUTURES_COINS - get_effective_futures_coins()}개)")
     logging.info(f"🔶 Futures BNB 자동충전: ${FUTURES_BNB_MIN_BALANCE} 이하시 ${FUTURES_BNB_RECHARGE_AMOUNT} 매수")
@@ -2411,28 +5507,28 @@ def main():
         logging.warning("⚠️ Futures 거래소 초기화 실패")
 
     # 캐시 로드
+    load_stoch_cache()
 
-    log_strategy_info()
-    send_start_alert()
+    # 설정 파일 적용 (없으면 내장 설정)
+    reload_trading_configs(force=True)
 
-    # 스케줄 설정 (KST)
-    schedule.every().day.at("01:00").do(trade_strategy)
-    schedule.every().day.at("05:00").do(trade_strategy)
-    schedule.every().day.at("09:00").do(trade_strategy)
-    schedule.every().day.at("13:00").do(trade_strategy)
-    schedule.every().day.at("17:00").do(trade_strategy)
-    schedule.every().day.at("21:00").do(trade_strategy)
+    # 실시간 시세 스트림 (캔들/가격을 사이클 전에 미리 수신)
+    start_futures_market_stream()
 
-    logging.info("실행 시간 (KST): 01:00, 05:00, 09:00, 13:00, 17:00, 21:00")
+    # 사용자 데이터 스트림 (포지션/잔고/체결을 원장에 실시간 반영)
+    start_futures_user_stream()
 
-    # 시작 시 즉시 실행
-    if futures_exchange is not None:
-        logging.info("🚀 시작 시 전략 즉시 실행...")
-        trade_strategy()
+    # 심볼 샤딩 워커 (BINANCE_FUTURES_SHARD_WORKERS > 1)
+    start_futures_shard_pool()
 
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    log_strategy_info()
+    send_start_alert()
+
+    # UTC 4시간봉 마감 스케줄 (KST 01:00, 05:00, 09:00, 13:00, 17:00, 21:00)
+    logging.info(f"실행 시간: {CYCLE_TIMEFRAME} 캔들 마감 + {CYCLE_START_DELAY}초 (KST 01/05/09/13/17/21시)")
+
+    # 시작 시 즉시 실행 후 마감 시각마다 실행
+    run_candle_close_scheduler(run_now=futures_exchange is not None)
 
 
 if __name__ == "__main__":
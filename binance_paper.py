@@ -0,0 +1,713 @@
+"""
+================================================================================
+바이낸스 USDS-M Futures 모의 거래소 (binance_bot 실행 백엔드 'paper')
+================================================================================
+- SimulatedFuturesExchange: 봇이 ccxt 에서 쓰는 메서드만 같은 형태로 구현
+  (fetch_ohlcv/ticker(s)/positions/balance, create_order(s)/market_*_order(reduceOnly),
+   set_leverage/set_margin_mode, symbolConfig, transfer, listenKey)
+- 가격/체결은 녹화 캔들(캔들 저장소 SQLite 형식)로 계산 - 시뮬레이션 시각 이후 데이터는 보이지 않음
+  (진행 중 캔들은 하위 타임프레임 마감분 + 시가로 구성, 현재가 = 최하위 진행 중 캔들 시가)
+- 시장가 체결: 현재가 ± 슬리피지, 수수료(USDT) 차감, 8시간 펀딩비 정산, 단방향(one-way) 포지션·교차 마진
+- 시뮬레이션 시각은 ccxt options['timeDifference'](로컬 - 서버)로 표현 → 봇의 exchange_time_ms() 와 일치
+- 비용 기본값은 코인 설정 헤더의 최적화 가정 (수수료 0.04%, 슬리피지 0.05%, 펀딩비 0.01%/8h)
+
+사용 예 (녹화 캔들로 최근 30 사이클 오프라인 실행):
+  python binance_paper.py --candles ~/binance_futures_candles.sqlite3 --cycles 30 --balance 10000
+  BINANCE_EXECUTION_BACKEND=paper python binance_bot.py   # 실시간 시각 모의 거래 (텔레그램/스트림 끔)
+  # 사용자 데이터 스트림은 대체 서버를 가리킬 때만 유지 (더미 listenKey, 재생 이벤트로 원장 갱신)
+  BINANCE_FUTURES_STREAM_URL=ws://127.0.0.1:8765 BINANCE_EXECUTION_BACKEND=paper python binance_bot.py
+================================================================================
+"""
+
+import os
+import sys
+import time
+import json
+import uuid
+import sqlite3
+import logging
+import argparse
+import tempfile
+import threading
+from functools import lru_cache
+from decimal import Decimal, ROUND_DOWN
+from datetime import datetime, timezone
+
+import numpy as np
+import ccxt
+
+DEFAULT_FEE_RATE = 0.0004  # 시장가(taker) 수수료
+DEFAULT_SLIPPAGE = 0.0005  # 시장가 체결 슬리피지 (불리한 방향)
+DEFAULT_FUNDING_RATE = 0.0001  # 8시간 펀딩비 (롱 지불, 숏 수취)
+FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000
+DEFAULT_LEVERAGE = 20  # 바이낸스 심볼 기본 레버리지
+MAX_LEVERAGE = 125
+MAX_BATCH_ORDERS = 5
+DEFAULT_MIN_NOTIONAL = 5
+DEFAULT_BNB_PRICE = 600.0  # BNB 캔들이 없을 때 사용하는 BNB 가격
+
+
+@lru_cache(maxsize=None)
+def _timeframe_ms(timeframe):
+    return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+
+def _market_id(symbol):
+    """'BTC/USDT:USDT' / 'BTC/USDT' / 'BTCUSDT' → 'BTCUSDT'"""
+    if '/' in symbol:
+        return symbol.replace('/', '').split(':')[0]
+    return symbol
+
+
+def _unified_symbol(market_id):
+    return f"{market_id[:-4]}/USDT:USDT" if market_id.endswith('USDT') else market_id
+
+
+def _binance_error(error_class, code, msg):
+    """ccxt 바이낸스 오류와 같은 형태의 메시지 ('binance {"code":..,"msg":..}') - 봇의 오류 코드 판별용"""
+    return error_class(f"binance {json.dumps({'code': code, 'msg': msg}, separators=(',', ':'))}")
+
+
+# ============================================================
+# 녹화 캔들 / 마켓 정보
+# ============================================================
+
+def load_recorded_candles(path, symbols=None, timeframes=('4h', '1d')):
+    """캔들 저장소(SQLite) 파일 읽기 - {(symbol, timeframe): ndarray(n, 6)} (ts 오름차순)"""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        query = "SELECT symbol, timeframe, ts, open, high, low, close, volume FROM candles"
+        query += f" WHERE timeframe IN ({','.join('?' * len(timeframes))})"
+        params = list(timeframes)
+        if symbols is not None:
+            symbols = list(symbols)
+            query += f" AND symbol IN ({','.join('?' * len(symbols))})"
+            params += symbols
+        rows = conn.execute(query + " ORDER BY symbol, timeframe, ts", params).fetchall()
+    finally:
+        conn.close()
+
+    candles = {}
+    start = 0
+    for i in range(1, len(rows) + 1):
+        if i == len(rows) or rows[i][:2] != rows[start][:2]:
+            symbol, timeframe = rows[start][:2]
+            candles[(symbol, timeframe)] = np.array([r[2:] for r in rows[start:i]], dtype=float)
+            start = i
+    return candles
+
+
+def load_cached_markets(cache_file):
+    """봇의 마켓 디스크 캐시(load_markets_cached 형식)에서 markets 읽기 - 없거나 손상 시 None"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)['markets']
+    except Exception:
+        return None
+
+
+def synthetic_market(market_id, price):
+    """마켓 정보가 없는 심볼의 기본 주문 규칙 (수량 단위 ≈ $0.1, 최소 주문 금액 $5)"""
+    step_exp = int(np.floor(np.log10(0.1 / price))) if price and price > 0 else -3
+    tick_exp = int(np.floor(np.log10(price))) - 4 if price and price > 0 else -4
+    step_str = format(Decimal(1).scaleb(step_exp), 'f')
+    tick_str = format(Decimal(1).scaleb(tick_exp), 'f')
+    return {
+        'id': market_id, 'symbol': _unified_symbol(market_id), 'base': market_id[:-4], 'quote': 'USDT',
+        'settle': 'USDT', 'type': 'swap', 'swap': True, 'linear': True, 'contract': True, 'active': True,
+        'precision': {'amount': float(step_str), 'price': float(tick_str)},
+        'limits': {'amount': {'min': float(step_str), 'max': None}, 'cost': {'min': DEFAULT_MIN_NOTIONAL}},
+        'info': {'symbol': market_id, 'filters': [
+            {'filterType': 'MARKET_LOT_SIZE', 'stepSize': step_str, 'minQty': step_str, 'maxQty': '100000000'},
+            {'filterType': 'PRICE_FILTER', 'tickSize': tick_str},
+            {'filterType': 'MIN_NOTIONAL', 'notional': str(DEFAULT_MIN_NOTIONAL)},
+        ]},
+    }
+
+
+# ============================================================
+# 모의 거래소
+# ============================================================
+
+class SimulatedFuturesExchange:
+    """녹화 캔들 기반 USDS-M Futures 모의 거래소 (스레드 안전 - 봇 워커 스레드에서 병렬 호출)
+
+    계좌 상태: wallets['future'|'spot'] 자산별 잔고, positions[symbol] = {'side', 'contracts', 'entry_price'},
+    leverage/margin_type 심볼 설정, fills 체결 내역(수수료/실현손익 포함), funding 정산 내역.
+    마진 타입은 기록만 하고 증거금은 모두 교차 마진으로 계산한다 (청산가 미계산).
+    """
+
+    def __init__(self, candles, balance=10000.0, markets=None, fee_rate=DEFAULT_FEE_RATE,
+                 slippage=DEFAULT_SLIPPAGE, funding_rate=DEFAULT_FUNDING_RATE, spot_usdt=1000.0,
+                 futures_bnb=1.0, candle_file=None, array_ohlcv=False):
+        self.lock = threading.RLock()
+        self.array_ohlcv = array_ohlcv  # True: fetch_ohlcv 가 ndarray(n, 6) 반환 - 재생용 (리스트 변환 생략)
+        self.options = {'timeDifference': 0}  # 로컬 - 시뮬레이션 시각 (ms), 0 이면 실제 시각
+        self.last_response_headers = {}
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.funding_rate = funding_rate
+        self.candle_file = candle_file
+        self._candle_symbols = None
+        self._candle_stamp = None
+        self._set_candles(candles)
+        self.markets = {}
+        self.markets_by_id = {}
+        self.set_markets(markets or {})
+        self.wallets = {'future': {'USDT': float(balance), 'BNB': float(futures_bnb)},
+                        'spot': {'USDT': float(spot_usdt), 'BNB': 0.0}}
+        self.positions = {}
+        self.leverage = {}
+        self.margin_type = {}
+        self.fills = []
+        self.funding = []
+        self.stats = {'orders': 0, 'rejected': 0, 'fees': 0.0, 'realized_pnl': 0.0, 'funding': 0.0}
+        self._funding_ms = None  # 마지막 펀딩 정산 시각
+        self.listen_key = None
+
+    def seed_account(self, balance=None, positions=()):
+        """시작 계좌 상태 설정 - balance: USDT 지갑 잔고(미실현 손익 제외), positions: get_all_futures_positions() 형식"""
+        with self.lock:
+            if balance is not None:
+                self.wallets['future']['USDT'] = float(balance)
+            for pos in positions:
+                market_id = _market_id(pos['symbol'])
+                self.positions[market_id] = {'side': pos['side'], 'contracts': abs(float(pos['contracts'])),
+                                             'entry_price': float(pos['entry_price'])}
+                if pos.get('leverage'):
+                    self.leverage[market_id] = int(pos['leverage'])
+
+    @classmethod
+    def from_candle_file(cls, path, symbols=None, **kwargs):
+        """캔들 저장소 파일로 생성 (파일이 바뀌면 fetch_tickers 시 다시 읽음 - 실시간 모의 거래용)"""
+        exchange = cls(load_recorded_candles(path, symbols), candle_file=path, **kwargs)
+        exchange._candle_stamp = exchange._file_stamp()
+        exchange._candle_symbols = symbols
+        return exchange
+
+    def _file_stamp(self):
+        stamp = []
+        for path in (self.candle_file, self.candle_file + '-wal'):
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp) if stamp[0] is not None else None
+
+    def _set_candles(self, candles):
+        self.candles = {}
+        for key, rows in candles.items():
+            rows = np.array(rows, dtype=float).reshape(-1, 6)
+            rows.flags.writeable = False  # array_ohlcv 로 반환하는 뷰를 호출 측이 수정하지 못하도록
+            self.candles[key] = rows
+        self.timeframes = sorted({tf for _, tf in self.candles}, key=_timeframe_ms)
+        # 진행 중 캔들 집계에 쓰는 하위 타임프레임 (가까운 순)
+        self._lower_timeframes = {tf: self.timeframes[:i][::-1] for i, tf in enumerate(self.timeframes)}
+        self.symbols = sorted({symbol for symbol, _ in self.candles})
+
+    def reload_candles(self):
+        """candle_file 이 바뀌었으면 다시 읽기 (저장소는 WAL 모드라 -wal 파일 변경도 확인)"""
+        if self.candle_file is None:
+            return False
+        stamp = self._file_stamp()
+        if stamp is None or stamp == self._candle_stamp:
+            return False
+        candles = load_recorded_candles(self.candle_file, self._candle_symbols)
+        with self.lock:
+            self._set_candles(candles)
+            self._candle_stamp = stamp
+        return True
+
+    # ─── 시각 ───
+
+    def milliseconds(self):
+        """시뮬레이션 시각 (ms)"""
+        return int(time.time() * 1000) - int(self.options.get('timeDifference') or 0)
+
+    def set_time(self, timestamp_ms):
+        """시뮬레이션 시각 이동 (이후 실제 경과 시간만큼 흐름) - 지난 펀딩 시각은 정산"""
+        with self.lock:
+            self.options['timeDifference'] = int(time.time() * 1000) - int(timestamp_ms)
+            self._settle_funding()
+
+    # ─── 시세 ───
+
+    def _visible_rows(self, market_id, timeframe, now, since=None, limit=None):
+        """now 시점에 보이는 캔들 중 since/limit 구간 (마감 캔들 + 진행 중 캔들) - 진행 중 캔들은 미래 값을 쓰지 않음"""
+        rows = self.candles.get((market_id, timeframe))
+        if rows is None or not len(rows):
+            return None
+        ts = rows[:, 0]
+        closed = int(np.searchsorted(ts, now - _timeframe_ms(timeframe), side='right'))
+        forming = closed < len(rows) and ts[closed] <= now
+        visible = closed + int(forming)
+        start = min(int(np.searchsorted(ts, since, side='left')), visible) if since is not None else 0
+        if limit is not None and since is None:
+            start = max(0, visible - limit)
+        end = visible if limit is None else min(visible, start + limit)
+        if not forming or not start <= closed < end:
+            return rows[start:min(end, closed)]
+        return np.vstack([rows[start:closed], self._forming_row(market_id, timeframe, rows[closed], now)])
+
+    def _forming_row(self, market_id, timeframe, row, now):
+        """진행 중 캔들 = 하위 타임프레임의 보이는 캔들 집계 (하위가 없으면 시가 1점)"""
+        start, open_ = row[0], row[1]
+        for lower in self._lower_timeframes[timeframe]:
+            sub = self._visible_rows(market_id, lower, now, since=start)
+            if sub is not None and len(sub):
+                return [start, sub[0, 1], sub[:, 2].max(), sub[:, 3].min(), sub[-1, 4], sub[:, 5].sum()]
+        return [start, open_, open_, open_, open_, 0.0]
+
+    def _price(self, market_id, now=None):
+        """현재가 = 최하위 타임프레임의 마지막 보이는 캔들 종가 (진행 중이면 시가)"""
+        now = self.milliseconds() if now is None else now
+        for timeframe in self.timeframes:
+            rows = self.candles.get((market_id, timeframe))
+            if rows is None or not len(rows):
+                continue
+            ts = rows[:, 0]
+            closed = int(np.searchsorted(ts, now - _timeframe_ms(timeframe), side='right'))
+            if closed < len(rows) and ts[closed] <= now:
+                return float(rows[closed, 1])
+            if closed:
+                return float(rows[closed - 1, 4])
+        if market_id == 'BNBUSDT':
+            return DEFAULT_BNB_PRICE
+        return None
+
+    def _require_price(self, symbol):
+        market_id = _market_id(symbol)
+        price = self._price(market_id)
+        if price is None:
+            raise _binance_error(ccxt.BadSymbol, -1121, f"Invalid symbol. ({market_id})")
+        return market_id, price
+
+    def _ticker(self, market_id, price, now):
+        return {
+            'symbol': _unified_symbol(market_id), 'timestamp': now, 'last': price, 'close': price,
+            'info': {'symbol': market_id, 'lastPrice': str(price)},
+        }
+
+    def fetch_ticker(self, symbol, params=None):
+        market_id, price = self._require_price(symbol)
+        return self._ticker(market_id, price, self.milliseconds())
+
+    def fetch_tickers(self, symbols=None, params=None):
+        self.reload_candles()
+        now = self.milliseconds()
+        ids = [_market_id(s) for s in symbols] if symbols else self.symbols
+        tickers = {}
+        for market_id in ids:
+            price = self._price(market_id, now)
+            if price is not None:
+                tickers[_unified_symbol(market_id)] = self._ticker(market_id, price, now)
+        return tickers
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        limit = min(limit or 500, 1500)
+        rows = self._visible_rows(_market_id(symbol), timeframe, self.milliseconds(), since=since, limit=limit)
+        if rows is None:
+            return []
+        if self.array_ohlcv:
+            return rows
+        return [[int(r[0])] + r[1:].tolist() for r in rows]
+
+    # ─── 마켓 ───
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = dict(markets)
+        known = {m.get('id') for m in self.markets.values()}
+        for market_id in self.symbols:
+            if market_id not in known:
+                price = self._price(market_id)
+                if price:
+                    market = synthetic_market(market_id, price)
+                    self.markets[market['symbol']] = market
+        self.markets_by_id = {m['id']: m for m in self.markets.values() if m.get('swap') and m.get('linear')}
+        self.currencies = currencies or {}
+        return self.markets
+
+    def load_markets(self, reload=False, params=None):
+        return self.markets
+
+    def load_time_difference(self, params=None):
+        return self.options['timeDifference']  # 시뮬레이션 시각 유지
+
+    def _amount_rule(self, market_id):
+        market = self.markets_by_id.get(market_id) or {}
+        filters = {f.get('filterType'): f for f in (market.get('info') or {}).get('filters', [])}
+        lot = filters.get('MARKET_LOT_SIZE') or filters.get('LOT_SIZE') or {}
+        step = lot.get('stepSize') or (market.get('precision') or {}).get('amount')
+        min_notional = (filters.get('MIN_NOTIONAL') or {}).get('notional')
+        if min_notional is None:
+            min_notional = ((market.get('limits') or {}).get('cost') or {}).get('min') or 0
+        return (Decimal(str(step)) if step else None), float(min_notional)
+
+    # ─── 계좌 ───
+
+    def _settle_funding(self):
+        """마지막 정산 이후 지난 8시간 펀딩 시각마다 포지션 명목가 × 펀딩비 정산 (롱 지불 / 숏 수취)"""
+        now = self.milliseconds()
+        due = now // FUNDING_INTERVAL_MS * FUNDING_INTERVAL_MS
+        if self._funding_ms is None or due < self._funding_ms:
+            self._funding_ms = due
+            return
+        while self._funding_ms < due:
+            self._funding_ms += FUNDING_INTERVAL_MS
+            for market_id, pos in self.positions.items():
+                price = self._price(market_id, self._funding_ms) or pos['entry_price']
+                amount = pos['contracts'] * price * self.funding_rate * (-1 if pos['side'] == 'long' else 1)
+                self.wallets['future']['USDT'] += amount
+                self.stats['funding'] += amount
+                self.funding.append({'timestamp': self._funding_ms, 'symbol': market_id, 'amount': amount})
+
+    def _position_state(self, market_id, pos):
+        price = self._price(market_id) or pos['entry_price']
+        sign = 1 if pos['side'] == 'long' else -1
+        notional = pos['contracts'] * price
+        leverage = self.leverage.get(market_id, DEFAULT_LEVERAGE)
+        return {
+            'notional': notional,
+            'unrealized': sign * (price - pos['entry_price']) * pos['contracts'],
+            'margin': notional / leverage,
+            'price': price,
+            'leverage': leverage,
+        }
+
+    def _account(self):
+        wallet = self.wallets['future']['USDT']
+        unrealized = margin = 0.0
+        for market_id, pos in self.positions.items():
+            state = self._position_state(market_id, pos)
+            unrealized += state['unrealized']
+            margin += state['margin']
+        total = wallet + unrealized
+        return {'wallet': wallet, 'unrealized': unrealized, 'margin': margin,
+                'total': total, 'free': max(total - margin, 0.0)}
+
+    def fetch_balance(self, params=None):
+        with self.lock:
+            self._settle_funding()
+            account = self._account()
+            bnb = self.wallets['future']['BNB']
+            return {
+                'USDT': {'free': account['free'], 'used': account['margin'], 'total': account['total']},
+                'BNB': {'free': bnb, 'used': 0.0, 'total': bnb},
+                'free': {'USDT': account['free'], 'BNB': bnb},
+                'used': {'USDT': account['margin'], 'BNB': 0.0},
+                'total': {'USDT': account['total'], 'BNB': bnb},
+                'info': {'assets': [
+                    {'asset': 'USDT', 'walletBalance': str(account['wallet']), 'unrealizedProfit': str(account['unrealized']),
+                     'marginBalance': str(account['total']), 'availableBalance': str(account['free']),
+                     'initialMargin': str(account['margin'])},
+                    {'asset': 'BNB', 'walletBalance': str(bnb)},
+                ]},
+            }
+
+    def fetch_positions(self, symbols=None, params=None):
+        with self.lock:
+            self._settle_funding()
+            wanted = {_market_id(s) for s in symbols} if symbols else None
+            result = []
+            for market_id, pos in self.positions.items():
+                if wanted is not None and market_id not in wanted:
+                    continue
+                state = self._position_state(market_id, pos)
+                amount = pos['contracts'] if pos['side'] == 'long' else -pos['contracts']
+                result.append({
+                    'symbol': _unified_symbol(market_id), 'side': pos['side'], 'contracts': pos['contracts'],
+                    'notional': state['notional'], 'unrealizedPnl': state['unrealized'],
+                    'entryPrice': pos['entry_price'], 'markPrice': state['price'], 'leverage': state['leverage'],
+                    'initialMargin': state['margin'], 'liquidationPrice': None,
+                    'marginMode': 'cross' if self.margin_type.get(market_id, 'CROSSED') == 'CROSSED' else 'isolated',
+                    'info': {'symbol': market_id, 'positionAmt': str(amount), 'entryPrice': str(pos['entry_price']),
+                             'notional': str(state['notional'] if amount > 0 else -state['notional']),
+                             'positionInitialMargin': str(state['margin'])},
+                })
+            return result
+
+    def fapiPrivateGetSymbolConfig(self, params=None):
+        with self.lock:
+            return [
+                {'symbol': market_id, 'marginType': self.margin_type.get(market_id, 'CROSSED'),
+                 'isAutoAddMargin': False, 'leverage': self.leverage.get(market_id, DEFAULT_LEVERAGE)}
+                for market_id in self.markets_by_id
+            ]
+
+    def set_leverage(self, leverage, symbol=None, params=None):
+        leverage = int(leverage)
+        if not 1 <= leverage <= MAX_LEVERAGE:
+            raise _binance_error(ccxt.BadRequest, -4028, f"Leverage {leverage} is not valid")
+        market_id = _market_id(symbol)
+        with self.lock:
+            self.leverage[market_id] = leverage
+        return {'symbol': market_id, 'leverage': leverage}
+
+    def set_margin_mode(self, margin_mode, symbol=None, params=None):
+        margin_type = 'CROSSED' if margin_mode.upper() in ('CROSS', 'CROSSED') else 'ISOLATED'
+        market_id = _market_id(symbol)
+        with self.lock:
+            if self.margin_type.get(market_id, 'CROSSED') == margin_type:
+                raise _binance_error(ccxt.MarginModeAlreadySet, -4046, "No need to change margin type.")
+            if market_id in self.positions:
+                raise _binance_error(ccxt.BadRequest, -4048, "Margin type cannot be changed if there exists position.")
+            self.margin_type[market_id] = margin_type
+        return {'code': 200, 'msg': 'success'}
+
+    def transfer(self, code, amount, from_account, to_account, params=None):
+        """지갑 간 전송 ('spot' ↔ 'future')"""
+        source = 'future' if from_account in ('future', 'futures', 'linear', 'swap') else 'spot'
+        target = 'future' if to_account in ('future', 'futures', 'linear', 'swap') else 'spot'
+        amount = float(amount)
+        with self.lock:
+            if (source, code) == ('future', 'USDT'):
+                available = self._account()['free']
+            else:
+                available = self.wallets[source].get(code, 0.0)
+            if amount > available + 1e-12:
+                raise _binance_error(ccxt.InsufficientFunds, -5013, "Asset transfer failed: insufficient balance")
+            self.wallets[source][code] = self.wallets[source].get(code, 0.0) - amount
+            self.wallets[target][code] = self.wallets[target].get(code, 0.0) + amount
+        return {'id': uuid.uuid4().hex, 'currency': code, 'amount': amount,
+                'fromAccount': source, 'toAccount': target, 'status': 'ok'}
+
+    # ─── 주문 ───
+
+    def _fill(self, symbol, side, amount, params):
+        """시장가 주문 즉시 체결 (단방향 포지션 - 반대 방향은 상계 후 남으면 반대 포지션)"""
+        params = params or {}
+        reduce_only = bool(params.get('reduceOnly'))
+        market_id, price = self._require_price(symbol)
+        step, min_notional = self._amount_rule(market_id)
+        quantity = Decimal(str(amount))
+        if step:
+            quantity = (quantity / step).to_integral_value(rounding=ROUND_DOWN) * step
+        quantity = float(quantity)
+        if quantity <= 0:
+            raise _binance_error(ccxt.InvalidOrder, -4003, "Quantity less than or equal to zero.")
+
+        fill_price = price * (1 + self.slippage if side == 'buy' else 1 - self.slippage)
+        with self.lock:
+            self._settle_funding()
+            pos = self.positions.get(market_id)
+            closing = pos is not None and (pos['side'] == 'long') != (side == 'buy')
+            if reduce_only:
+                if not closing:
+                    raise _binance_error(ccxt.InvalidOrder, -2022, "ReduceOnly Order is rejected.")
+                quantity = min(quantity, pos['contracts'])
+            elif quantity * fill_price < min_notional:
+                raise _binance_error(ccxt.InvalidOrder, -4164,
+                                     f"Order's notional must be no smaller than {min_notional:g}")
+
+            reduced = min(quantity, pos['contracts']) if closing else 0.0
+            opened = quantity - reduced
+            fee = quantity * fill_price * self.fee_rate
+            if opened > 0:
+                leverage = self.leverage.get(market_id, DEFAULT_LEVERAGE)
+                account = self._account()
+                released = reduced * fill_price / leverage if closing else 0.0
+                if opened * fill_price / leverage + fee > account['free'] + released:
+                    self.stats['rejected'] += 1
+                    raise _binance_error(ccxt.InsufficientFunds, -2019, "Margin is insufficient.")
+
+            realized = 0.0
+            if reduced > 0:
+                sign = 1 if pos['side'] == 'long' else -1
+                realized = sign * (fill_price - pos['entry_price']) * reduced
+                pos['contracts'] = round(pos['contracts'] - reduced, 12)
+                if pos['contracts'] <= 0:
+                    del self.positions[market_id]
+            if opened > 0:
+                new_side = 'long' if side == 'buy' else 'short'
+                pos = self.positions.get(market_id)
+                if pos is None:
+                    self.positions[market_id] = {'side': new_side, 'contracts': opened, 'entry_price': fill_price}
+                else:
+                    total = pos['contracts'] + opened
+                    pos['entry_price'] = (pos['entry_price'] * pos['contracts'] + fill_price * opened) / total
+                    pos['contracts'] = total
+
+            self.wallets['future']['USDT'] += realized - fee
+            self.stats['orders'] += 1
+            self.stats['fees'] += fee
+            self.stats['realized_pnl'] += realized
+            now = self.milliseconds()
+            order = {
+                'id': str(len(self.fills) + 1),
+                'clientOrderId': params.get('newClientOrderId') or f"sim{uuid.uuid4().hex[:20]}",
+                'timestamp': now,
+                'datetime': datetime.fromtimestamp(now / 1000, tz=timezone.utc).isoformat(),
+                'symbol': _unified_symbol(market_id), 'type': 'market', 'side': side,
+                'amount': quantity, 'filled': quantity, 'remaining': 0.0, 'status': 'closed',
+                'price': fill_price, 'average': fill_price, 'cost': quantity * fill_price,
+                'reduceOnly': reduce_only, 'fee': {'currency': 'USDT', 'cost': fee},
+                'info': {'symbol': market_id, 'realizedPnl': str(realized)},
+            }
+            self.fills.append({'timestamp': now, 'symbol': market_id, 'side': side, 'quantity': quantity,
+                               'price': fill_price, 'fee': fee, 'realized_pnl': realized,
+                               'reduce_only': reduce_only})
+            return order
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        if type != 'market':
+            raise ccxt.NotSupported("모의 거래소는 시장가 주문만 지원")
+        return self._fill(symbol, side, amount, params)
+
+    def create_market_buy_order(self, symbol, amount, params=None):
+        return self._fill(symbol, 'buy', amount, params)
+
+    def create_market_sell_order(self, symbol, amount, params=None):
+        return self._fill(symbol, 'sell', amount, params)
+
+    def create_orders(self, orders, params=None):
+        """batchOrders - 실패 항목은 ccxt 와 같이 info 에 {code, msg} 만 담아 반환"""
+        if len(orders) > MAX_BATCH_ORDERS:
+            raise _binance_error(ccxt.BadRequest, -1130, "Data sent for parameter 'batchOrders' is not valid.")
+        results = []
+        for request in orders:
+            try:
+                results.append(self.create_order(request['symbol'], request.get('type', 'market'), request['side'],
+                                                 request['amount'], request.get('price'), request.get('params')))
+            except ccxt.BaseError as e:
+                info = json.loads(str(e).split(' ', 1)[1]) if str(e).startswith('binance {') else {'msg': str(e)}
+                results.append({'id': None, 'clientOrderId': None, 'timestamp': None, 'info': info})
+        return results
+
+    def fapiPrivatePostListenKey(self, params=None):
+        """더미 listenKey - 사용자 데이터 이벤트는 로컬 대체 서버(binance_ws_standin.py serve --user)가 재생"""
+        with self.lock:
+            if self.listen_key is None:
+                self.listen_key = f"paper{uuid.uuid4().hex}"
+            return {'listenKey': self.listen_key}
+
+    def fapiPrivatePutListenKey(self, params=None):
+        return {}
+
+    def summary(self):
+        """계좌 요약 (총자산, 실현손익, 수수료, 펀딩비, 체결/거절 수, 보유 포지션 수)"""
+        with self.lock:
+            account = self._account()
+            return dict(self.stats, total=account['total'], wallet=account['wallet'],
+                        unrealized=account['unrealized'], positions=len(self.positions), fills=len(self.fills))
+
+
+class SimulatedSpotExchange:
+    """BNB 충전 경로용 Spot 지갑 (SimulatedFuturesExchange 의 wallets['spot'] 공유)"""
+
+    def __init__(self, futures):
+        self.futures = futures
+        self.options = {}
+        self.markets = {}
+        self.currencies = {}
+        self.last_response_headers = {}
+
+    def fetch_balance(self, params=None):
+        with self.futures.lock:
+            wallet = dict(self.futures.wallets['spot'])
+        result = {code: {'free': amount, 'used': 0.0, 'total': amount} for code, amount in wallet.items()}
+        result.update(free=dict(wallet), used={code: 0.0 for code in wallet}, total=dict(wallet))
+        return result
+
+    def fetch_ticker(self, symbol, params=None):
+        return self.futures.fetch_ticker(symbol, params)
+
+    def create_market_buy_order(self, symbol, amount, params=None):
+        """시장가 매수 (quoteOrderQty 지원) - BNB/USDT 등 USDT 마켓만"""
+        params = params or {}
+        base = _market_id(symbol)[:-4]
+        _, price = self.futures._require_price(symbol)
+        price *= 1 + self.futures.slippage
+        with self.futures.lock:
+            wallet = self.futures.wallets['spot']
+            cost = float(params['quoteOrderQty']) if params.get('quoteOrderQty') else float(amount) * price
+            if cost > wallet.get('USDT', 0.0) + 1e-12:
+                raise _binance_error(ccxt.InsufficientFunds, -2010, "Account has insufficient balance for requested action.")
+            quantity = cost / price * (1 - self.futures.fee_rate)
+            wallet['USDT'] -= cost
+            wallet[base] = wallet.get(base, 0.0) + quantity
+        return {'id': uuid.uuid4().hex, 'symbol': symbol, 'type': 'market', 'side': 'buy', 'status': 'closed',
+                'amount': quantity, 'filled': quantity, 'cost': cost, 'average': price}
+
+
+# ============================================================
+# 오프라인 사이클 실행
+# ============================================================
+
+def cycle_close_times(candles, start_ms=None, end_ms=None, cycles=None, timeframe='4h'):
+    """녹화 캔들 구간의 사이클 마감 시각 목록 (start~end, 또는 마지막 cycles 개)"""
+    tf_ms = _timeframe_ms(timeframe)
+    stamps = [rows[:, 0] for (_, tf), rows in candles.items() if tf == timeframe and len(rows)]
+    if not stamps:
+        return []
+    first = int(min(ts[0] for ts in stamps)) + tf_ms
+    last = int(max(ts[-1] for ts in stamps))  # 마지막 캔들 시작 = 직전 캔들 마감
+    start_ms = first if start_ms is None else max(first, start_ms // tf_ms * tf_ms)
+    end_ms = last if end_ms is None else min(last, end_ms)
+    closes = list(range(start_ms, end_ms + 1, tf_ms))
+    return closes[-cycles:] if cycles else closes
+
+
+def run_offline_cycles(exchange, closes, state_dir=None, start_delay=None):
+    """binance_bot 전체 사이클(trade_strategy)을 모의 거래소에 대해 마감 시각마다 연속 실행
+
+    Returns: {'cycles', 'seconds', 'cycles_per_sec', 'account': exchange.summary()}
+    """
+    import binance_bot as bot
+
+    state_dir = state_dir or tempfile.mkdtemp(prefix='binance_paper_')
+    bot.use_paper_backend(exchange, SimulatedSpotExchange(exchange), state_dir=state_dir)
+    bot.load_stoch_cache()
+    delay_ms = int((bot.CYCLE_START_DELAY if start_delay is None else start_delay) * 1000)
+
+    started = time.perf_counter()
+    for close_ms in closes:
+        exchange.set_time(close_ms + delay_ms)
+        bot.trade_strategy()
+    seconds = time.perf_counter() - started
+    return {
+        'cycles': len(closes),
+        'seconds': round(seconds, 3),
+        'cycles_per_sec': round(len(closes) / seconds, 3) if seconds > 0 else None,
+        'state_dir': state_dir,
+        'account': exchange.summary(),
+    }
+
+
+def parse_date_ms(value):
+    if value is None:
+        return None
+    return int(datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="바이낸스 Futures 모의 거래소로 봇 사이클 오프라인 실행")
+    parser.add_argument('--candles', default=os.path.join(os.path.expanduser('~'), 'binance_futures_candles.sqlite3'),
+                        help="녹화 캔들 (캔들 저장소 SQLite)")
+    parser.add_argument('--markets', default=os.path.join(os.path.expanduser('~'), 'binance_markets_cache_future.json'),
+                        help="마켓 정보 캐시 (없으면 기본 주문 규칙)")
+    parser.add_argument('--start', help="시작일 (YYYY-MM-DD, UTC)")
+    parser.add_argument('--end', help="종료일 (YYYY-MM-DD, UTC)")
+    parser.add_argument('--cycles', type=int, help="마지막 N 사이클만 실행")
+    parser.add_argument('--balance', type=float, default=10000.0)
+    parser.add_argument('--fee', type=float, default=DEFAULT_FEE_RATE)
+    parser.add_argument('--slippage', type=float, default=DEFAULT_SLIPPAGE)
+    parser.add_argument('--funding', type=float, default=DEFAULT_FUNDING_RATE)
+    parser.add_argument('--state-dir', help="봇 상태 파일 디렉터리 (기본: 임시 디렉터리)")
+    args = parser.parse_args(argv)
+
+    exchange = SimulatedFuturesExchange(
+        load_recorded_candles(args.candles), balance=args.balance, markets=load_cached_markets(args.markets),
+        fee_rate=args.fee, slippage=args.slippage, funding_rate=args.funding,
+    )
+    closes = cycle_close_times(exchange.candles, parse_date_ms(args.start), parse_date_ms(args.end), args.cycles)
+    if not closes:
+        logging.error("실행할 사이클이 없습니다 (캔들 구간 확인)")
+        return 1
+    result = run_offline_cycles(exchange, closes, state_dir=args.state_dir)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
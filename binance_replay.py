@@ -0,0 +1,175 @@
+"""
+================================================================================
+바이낸스 Futures 과거 사이클 재생 (futures_trade_strategy 결정 코드 그대로, 가속 시각)
+================================================================================
+- 녹화 캔들(캔들 저장소 형식) + 시작 계좌 스냅샷(선택) → 모의 거래소(binance_paper)
+- 4시간봉 마감마다 시뮬레이션 시각을 옮기고 봇의 futures_trade_strategy() 를 1회 실행
+- 사이클별 결정(주문 큐)/진입/청산/오류/자산을 JSONL 로 기록 → 오프라인 최적화 가정과 대조
+- 사이클/초와 단계별 누적 소요 시간(사이클 계측) 집계
+- 고속 경로: 캔들 저장소 왕복/텔레그램/스트림/요약 생략, 모의 거래소는 캔들을 ndarray 뷰로 반환,
+  시세 조회는 순차(메모리 조회라 스레드 전환이 더 비쌈), 봇 로그는 WARNING 이상만 (--verbose 로 전체)
+
+시작 계좌 스냅샷 형식 (JSON):
+  {"balance": USDT 지갑 잔고, "positions": [{"symbol", "side", "contracts", "entry_price", "leverage"}, ...]}
+
+사용 예:
+  python binance_replay.py --candles ~/binance_futures_candles.sqlite3 --start 2023-01-01 -o decisions.jsonl
+  python binance_replay.py --cycles 180 --positions account_snapshot.json
+================================================================================
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timezone
+
+import binance_paper
+from binance_paper import SimulatedFuturesExchange, SimulatedSpotExchange
+
+log = logging.getLogger('binance_replay')
+log.setLevel(logging.INFO)  # 봇 로그를 WARNING 으로 낮춰도 진행 상황은 출력
+
+
+def load_account_snapshot(path):
+    """시작 계좌 스냅샷 읽기 - (balance 또는 None, positions)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('balance'), data.get('positions') or []
+
+
+def _decision_record(intent):
+    return {'action': intent['action'], 'symbol': intent['symbol'], 'side': intent['side'],
+            'reason': intent['reason'], 'after_close': intent['after_close']}
+
+
+def _open_record(item):
+    return {'symbol': item['symbol'], 'side': item['side'], 'quantity': item['quantity'],
+            'price': item['price'], 'leverage': item['leverage']}
+
+
+def _close_record(item, side):
+    return {'symbol': item['symbol'], 'side': side, 'quantity': item['quantity'],
+            'entry_price': item['entry_price'], 'exit_price': item['exit_price'],
+            'pnl': item['pnl'], 'reason': item['reason']}
+
+
+def replay_cycles(exchange, closes, output, state_dir=None, concurrent=False, progress_every=100):
+    """closes 마감 시각마다 futures_trade_strategy() 실행 후 사이클별 결정 로그를 output(JSONL)에 기록
+
+    Returns: {'cycles', 'seconds', 'cycles_per_sec', 'phases', 'opened', 'closed', 'errors', 'account', ...}
+    """
+    import binance_bot as bot
+
+    state_dir = state_dir or tempfile.mkdtemp(prefix='binance_replay_')
+    bot.use_paper_backend(exchange, SimulatedSpotExchange(exchange), state_dir=state_dir)
+    bot.FUTURES_CANDLE_STORE_ENABLED = False  # 캔들은 모의 거래소 메모리에 있으므로 저장소 왕복 생략
+    bot.FUTURES_CONCURRENT_EVAL = concurrent
+    exchange.array_ohlcv = True
+    delay_ms = int(bot.CYCLE_START_DELAY * 1000)
+
+    phases = {}
+    totals = {'opened': 0, 'closed': 0, 'errors': 0}
+    started = time.perf_counter()
+    with open(output, 'w', encoding='utf-8') as f:
+        for index, close_ms in enumerate(closes, 1):
+            exchange.set_time(close_ms + delay_ms)
+            metrics = bot.cycle_metrics = bot.CycleMetrics()
+            try:
+                short_open, short_close, long_open, long_close, errors = bot.futures_trade_strategy()
+                balance = bot.get_futures_balance()
+                positions = len(bot.get_all_futures_positions())
+            finally:
+                bot.clear_futures_ledger()
+                bot.cycle_metrics = None
+            for name, seconds in metrics.phases.items():
+                phases[name] = phases.get(name, 0.0) + seconds
+
+            record = {
+                'cycle': datetime.fromtimestamp(close_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%dT%H:%MZ'),
+                'decisions': [_decision_record(intent) for intent in bot.last_futures_order_queue],
+                'opened': [_open_record(item) for item in short_open + long_open],
+                'closed': ([_close_record(item, 'short') for item in short_close]
+                           + [_close_record(item, 'long') for item in long_close]),
+                'errors': errors,
+                'equity': round(balance['total'], 4),
+                'free': round(balance['free'], 4),
+                'positions': positions,
+                'seconds': round(metrics.elapsed(), 4),
+            }
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=float) + '\n')
+            totals['opened'] += len(record['opened'])
+            totals['closed'] += len(record['closed'])
+            totals['errors'] += len(errors)
+
+            if progress_every and index % progress_every == 0:
+                elapsed = time.perf_counter() - started
+                log.info(f"⏩ {record['cycle']} {index}/{len(closes)} 사이클 ({index / elapsed:.1f} 사이클/초), "
+                         f"자산 ${balance['total']:,.2f}")
+
+    seconds = time.perf_counter() - started
+    return dict(
+        totals,
+        cycles=len(closes),
+        seconds=round(seconds, 3),
+        cycles_per_sec=round(len(closes) / seconds, 2) if seconds > 0 else None,
+        phases={name: round(total, 3) for name, total in phases.items()},
+        output=output,
+        state_dir=state_dir,
+        account=exchange.summary(),
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="바이낸스 Futures 과거 사이클 재생 (봇 결정 코드 + 모의 거래소)")
+    parser.add_argument('--candles', default=os.path.join(os.path.expanduser('~'), 'binance_futures_candles.sqlite3'),
+                        help="녹화 캔들 (캔들 저장소 SQLite)")
+    parser.add_argument('--markets', default=os.path.join(os.path.expanduser('~'), 'binance_markets_cache_future.json'),
+                        help="마켓 정보 캐시 (없으면 기본 주문 규칙)")
+    parser.add_argument('--start', help="시작일 (YYYY-MM-DD, UTC)")
+    parser.add_argument('--end', help="종료일 (YYYY-MM-DD, UTC)")
+    parser.add_argument('--cycles', type=int, help="마지막 N 사이클만 재생")
+    parser.add_argument('--positions', help="시작 계좌 스냅샷 (JSON)")
+    parser.add_argument('--balance', type=float, default=10000.0, help="시작 USDT (스냅샷 balance 가 우선)")
+    parser.add_argument('--fee', type=float, default=binance_paper.DEFAULT_FEE_RATE)
+    parser.add_argument('--slippage', type=float, default=binance_paper.DEFAULT_SLIPPAGE)
+    parser.add_argument('--funding', type=float, default=binance_paper.DEFAULT_FUNDING_RATE)
+    parser.add_argument('-o', '--output', default='replay_decisions.jsonl', help="사이클별 결정 로그 (JSONL)")
+    parser.add_argument('--state-dir', help="봇 상태 파일 디렉터리 (기본: 임시 디렉터리)")
+    parser.add_argument('--concurrent', action='store_true', help="시세 조회 병렬 실행 (실거래와 같은 스레드 경로)")
+    parser.add_argument('--progress', type=int, default=100, help="진행 상황 출력 간격 (사이클)")
+    parser.add_argument('--verbose', action='store_true', help="봇 INFO 로그 출력")
+    args = parser.parse_args(argv)
+
+    import binance_bot as bot
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    symbols = [s for s in bot.SYMBOL_REGISTRY.symbols if s not in bot.FUTURES_EXCLUDED_COINS]
+    exchange = SimulatedFuturesExchange(
+        binance_paper.load_recorded_candles(args.candles, symbols), balance=args.balance,
+        markets=binance_paper.load_cached_markets(args.markets),
+        fee_rate=args.fee, slippage=args.slippage, funding_rate=args.funding,
+    )
+    if args.positions:
+        balance, positions = load_account_snapshot(args.positions)
+        exchange.seed_account(balance, positions)
+    closes = binance_paper.cycle_close_times(
+        exchange.candles, binance_paper.parse_date_ms(args.start), binance_paper.parse_date_ms(args.end), args.cycles
+    )
+    if not closes:
+        log.error("재생할 사이클이 없습니다 (캔들 구간 확인)")
+        return 1
+
+    log.info(f"🎞️ 재생 시작: {len(closes)}개 사이클, {len(exchange.symbols)}개 심볼 → {args.output}")
+    result = replay_cycles(exchange, closes, args.output, state_dir=args.state_dir,
+                           concurrent=args.concurrent, progress_every=args.progress)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,399 @@
+"""
+================================================================================
+바이낸스 Futures WebSocket 로컬 대체 서버 (녹화 프레임 재생)
+================================================================================
+- record     : 실제 결합 스트림(/stream?streams=...)을 받아 JSONL 로 저장
+- record-user: 실제 사용자 데이터 스트림(/ws/<listenKey>, BINANCE_API_KEY 로 발급)을 받아 JSONL 로 저장
+- serve      : 저장한 프레임을 로컬 WebSocket 으로 재생 (binance_bot 시세/사용자 데이터 스트림 테스트용)
+  /stream?streams=... 는 시세 프레임, /ws/<listenKey> 는 --user 이벤트 파일(없으면 시세 프레임)을 재생
+- check      : 고정 계좌 이벤트(ACCOUNT_UPDATE/ORDER_TRADE_UPDATE/ACCOUNT_CONFIG_UPDATE)를 봇 원장에 적용해
+  단계별 잔고/포지션을 검증 (네트워크 불필요, --write 로 같은 이벤트를 serve --user 용 파일로 저장)
+- 프레임 파일 형식: 한 줄에 {"at": 시작 후 경과 초, "frame": 수신 원본 메시지}
+
+사용 예:
+  python binance_ws_standin.py record -o frames.jsonl --seconds 600 btcusdt@kline_4h btcusdt@kline_1d '!markPrice@arr@1s'
+  python binance_ws_standin.py record-user -o account_events.jsonl --seconds 3600
+  python binance_ws_standin.py serve frames.jsonl --port 8765 --rebase --loop
+  python binance_ws_standin.py serve frames.jsonl --user account_events.jsonl --port 8765
+  python binance_ws_standin.py serve --user account_events.jsonl --port 8765   # 사용자 데이터만 (모의 백엔드)
+  python binance_ws_standin.py check --write account_fixture.jsonl
+  BINANCE_FUTURES_STREAM_URL=ws://127.0.0.1:8765 python binance_bot.py
+================================================================================
+"""
+
+import os
+import sys
+import time
+import json
+import asyncio
+import logging
+import argparse
+
+import aiohttp
+from aiohttp import web
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
+
+DAY_MS = 24 * 60 * 60 * 1000
+TIMESTAMP_KEYS = ('E', 'T', 't')  # 이벤트/마감/시작 시각 (ms)
+
+
+# ============================================================
+# 프레임 파일
+# ============================================================
+
+def load_frames(path):
+    """JSONL 프레임 파일 읽기 - [(at, frame)] (at 오름차순)"""
+    frames = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if 'frame' in item:
+                frames.append((float(item.get('at', 0)), item['frame']))
+            else:
+                frames.append((0.0, item))
+    frames.sort(key=lambda x: x[0])
+    return frames
+
+
+def _first_event_time(frames):
+    for _, frame in frames:
+        data = frame.get('data', frame) if isinstance(frame, dict) else frame
+        items = data if isinstance(data, list) else [data]
+        for item in items:
+            if isinstance(item, dict) and 'E' in item:
+                return int(item['E'])
+    return None
+
+
+def _shift_times(value, shift_ms):
+    """프레임 안의 시각 필드(E/T/t)를 shift_ms 만큼 이동 (kline 'k' 등 중첩 포함)"""
+    if isinstance(value, list):
+        return [_shift_times(v, shift_ms) for v in value]
+    if not isinstance(value, dict):
+        return value
+    shifted = {}
+    for key, v in value.items():
+        if key in TIMESTAMP_KEYS and isinstance(v, int) and v > 10 ** 12:
+            shifted[key] = v + shift_ms
+        else:
+            shifted[key] = _shift_times(v, shift_ms)
+    return shifted
+
+
+def rebase_frames(frames):
+    """녹화 날짜를 오늘(UTC)로 옮김 - 일 단위 이동이라 4h/1d 캔들 경계는 그대로 유지"""
+    first = _first_event_time(frames)
+    if first is None:
+        return frames
+    shift_ms = (int(time.time() * 1000) // DAY_MS - first // DAY_MS) * DAY_MS
+    return [(at, _shift_times(frame, shift_ms)) for at, frame in frames]
+
+
+def frame_stream(frame):
+    return frame.get('stream') if isinstance(frame, dict) else None
+
+
+# ============================================================
+# 재생 서버
+# ============================================================
+
+async def replay(ws, frames, speed, loop_forever, wanted=None):
+    """프레임을 녹화 간격(speed 배속)대로 전송 - wanted 가 있으면 해당 스트림 프레임만"""
+    if wanted is not None:
+        frames = [(at, frame) for at, frame in frames
+                  if frame_stream(frame) is None or frame_stream(frame).lower() in wanted]
+    if not frames:
+        return
+    while True:
+        started = time.monotonic()
+        for at, frame in frames:
+            wait = at / speed - (time.monotonic() - started)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if ws.closed:
+                return
+            await ws.send_str(json.dumps(frame))
+        if not loop_forever:
+            return
+        await asyncio.sleep(0.1)  # 재생 시간이 0인 파일도 이벤트 루프를 점유하지 않도록
+
+
+def create_app(frames, speed=1.0, loop_forever=False, user_frames=None):
+    async def combined_stream(request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        streams = request.query.get('streams', '')
+        wanted = {s.lower() for s in streams.split('/') if s} or None
+        logging.info(f"연결: {request.remote} 스트림 {len(wanted or [])}개")
+        sender = asyncio.ensure_future(replay(ws, frames, speed, loop_forever, wanted))
+        async for _ in ws:
+            pass  # 클라이언트 메시지(구독 요청 등)는 무시
+        sender.cancel()
+        return ws
+
+    async def raw_stream(request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        logging.info(f"연결: {request.remote} {request.path}")
+        source = frames if user_frames is None else user_frames
+        sender = asyncio.ensure_future(replay(ws, source, speed, loop_forever))
+        async for _ in ws:
+            pass
+        sender.cancel()
+        return ws
+
+    app = web.Application()
+    app.router.add_get('/stream', combined_stream)
+    app.router.add_get('/ws/{name}', raw_stream)
+    return app
+
+
+# ============================================================
+# 녹화
+# ============================================================
+
+async def _record_ws(session, target, output, seconds):
+    """target WebSocket 을 seconds 초 동안 받아 JSONL 로 저장"""
+    count = 0
+    started = time.monotonic()
+    async with session.ws_connect(target, heartbeat=30) as ws:
+        with open(output, 'w', encoding='utf-8') as f:
+            while time.monotonic() - started < seconds:
+                try:
+                    msg = await ws.receive(timeout=max(0.1, seconds - (time.monotonic() - started)))
+                except asyncio.TimeoutError:
+                    break
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                at = round(time.monotonic() - started, 3)
+                f.write(json.dumps({'at': at, 'frame': json.loads(msg.data)}) + '\n')
+                count += 1
+    logging.info(f"녹화 완료: {count}개 프레임 → {output}")
+    return count
+
+
+async def record(url, streams, output, seconds):
+    """실제 결합 스트림을 seconds 초 동안 받아 JSONL 로 저장"""
+    target = f"{url.rstrip('/')}/stream?streams={'/'.join(streams)}"
+    async with aiohttp.ClientSession() as session:
+        return await _record_ws(session, target, output, seconds)
+
+
+async def record_user(url, api_url, api_key, output, seconds):
+    """실제 사용자 데이터 스트림(계좌 이벤트)을 seconds 초 동안 받아 JSONL 로 저장
+
+    listenKey 는 API 키만으로 발급/연장된다 (서명 불필요). 녹화 중 발생한 주문/체결/레버리지 변경이
+    ACCOUNT_UPDATE / ORDER_TRADE_UPDATE / ACCOUNT_CONFIG_UPDATE 로 기록된다.
+    """
+    endpoint = f"{api_url.rstrip('/')}/fapi/v1/listenKey"
+    headers = {'X-MBX-APIKEY': api_key}
+    async with aiohttp.ClientSession() as session:
+        async with session.post(endpoint, headers=headers) as response:
+            response.raise_for_status()
+            listen_key = (await response.json())['listenKey']
+
+        async def keepalive():
+            while True:
+                await asyncio.sleep(30 * 60)  # 60분 미연장 시 만료
+                async with session.put(endpoint, headers=headers) as response:
+                    if response.status != 200:
+                        logging.warning(f"listenKey 연장 실패: HTTP {response.status}")
+
+        extender = asyncio.ensure_future(keepalive())
+        try:
+            return await _record_ws(session, f"{url.rstrip('/')}/ws/{listen_key}", output, seconds)
+        finally:
+            extender.cancel()
+
+
+# ============================================================
+# 원장 검증 (고정 계좌 이벤트)
+# ============================================================
+
+FIXTURE_SYMBOL = 'BTCUSDT'
+FIXTURE_START_MS = 1700000000000
+FIXTURE_BALANCE = 1000.0
+FIXTURE_MARK = 50000.0
+
+
+def _fixture_account_update(step, wallet, amount, entry, unrealized=0.0):
+    return {'e': 'ACCOUNT_UPDATE', 'E': FIXTURE_START_MS + step * 1000, 'T': FIXTURE_START_MS + step * 1000,
+            'a': {'m': 'ORDER',
+                  'B': [{'a': 'USDT', 'wb': f"{wallet:.8f}", 'cw': f"{wallet:.8f}", 'bc': '0'}],
+                  'P': [{'s': FIXTURE_SYMBOL, 'pa': f"{amount}", 'ep': f"{entry}", 'cr': '0',
+                         'up': f"{unrealized}", 'mt': 'cross', 'iw': '0', 'ps': 'BOTH'}]}}
+
+
+def _fixture_trade(step, side, quantity, price, commission, realized, order_id):
+    return {'e': 'ORDER_TRADE_UPDATE', 'E': FIXTURE_START_MS + step * 1000, 'T': FIXTURE_START_MS + step * 1000,
+            'o': {'s': FIXTURE_SYMBOL, 'c': f"fixture{order_id}", 'S': side, 'o': 'MARKET', 'q': f"{quantity}",
+                  'X': 'FILLED', 'x': 'TRADE', 'i': order_id, 'l': f"{quantity}", 'z': f"{quantity}",
+                  'L': f"{price}", 'N': 'USDT', 'n': f"{commission}", 'T': FIXTURE_START_MS + step * 1000,
+                  'R': side == 'SELL', 'ps': 'BOTH', 'rp': f"{realized}"}}
+
+
+def _fixture_leverage(step, leverage):
+    return {'e': 'ACCOUNT_CONFIG_UPDATE', 'E': FIXTURE_START_MS + step * 1000, 'T': FIXTURE_START_MS + step * 1000,
+            'ac': {'s': FIXTURE_SYMBOL, 'l': leverage}}
+
+
+def ledger_fixture_steps():
+    """롱 0.01 BTC @ 50,000 진입 → 레버리지 5 → 10 → 봇 청산 선반영 → 51,000 청산 체결 (수수료 0.06%)
+
+    각 단계: {'frame': 이벤트} 또는 {'close': (심볼, 청산가)} (봇의 _ledger_apply_close) + 'expect'
+    expect: total/free/wallet 잔고, positions {심볼: (방향, 수량, 레버리지)}, fills 수
+    """
+    flat = {}
+    held = {FIXTURE_SYMBOL: ('long', 0.01, 5)}
+    return [
+        {'frame': _fixture_leverage(1, 5),
+         'expect': {'total': 1000.0, 'free': 1000.0, 'wallet': 1000.0, 'positions': flat, 'fills': 0}},
+        {'frame': _fixture_trade(2, 'BUY', 0.01, 50000.0, 0.3, 0.0, 101),
+         'expect': {'total': 1000.0, 'free': 1000.0, 'wallet': 1000.0, 'positions': flat, 'fills': 1}},
+        # 지갑 -0.3 (수수료), 증거금 500 / 5 = 100
+        {'frame': _fixture_account_update(3, 999.7, 0.01, 50000.0),
+         'expect': {'total': 999.7, 'free': 899.7, 'wallet': 999.7, 'positions': held, 'fills': 1}},
+        # 증거금 500 / 10 = 50
+        {'frame': _fixture_leverage(4, 10),
+         'expect': {'total': 999.7, 'free': 949.7, 'wallet': 999.7,
+                    'positions': {FIXTURE_SYMBOL: ('long', 0.01, 10)}, 'fills': 1}},
+        # 선반영: 증거금 50 - 수수료 0.306 복원 (손익은 이벤트의 지갑 변화로)
+        {'close': (FIXTURE_SYMBOL, 51000.0),
+         'expect': {'total': 999.394, 'free': 999.394, 'wallet': 999.7, 'positions': flat, 'fills': 1}},
+        {'frame': _fixture_trade(6, 'SELL', 0.01, 51000.0, 0.306, 10.0, 102),
+         'expect': {'total': 999.394, 'free': 999.394, 'wallet': 999.7, 'positions': flat, 'fills': 2}},
+        # 지갑 +10 (실현손익) -0.306 (수수료) - 선반영을 되돌리고 실제 변화로 교체
+        {'frame': _fixture_account_update(7, 1009.394, 0, 0.0),
+         'expect': {'total': 1009.394, 'free': 1009.394, 'wallet': 1009.394, 'positions': flat, 'fills': 2}},
+    ]
+
+
+def write_fixture_frames(path):
+    """고정 이벤트를 serve --user 용 JSONL 로 저장 (1초 간격)"""
+    frames = [step['frame'] for step in ledger_fixture_steps() if 'frame' in step]
+    with open(path, 'w', encoding='utf-8') as f:
+        for i, frame in enumerate(frames):
+            f.write(json.dumps({'at': float(i), 'frame': frame}) + '\n')
+    logging.info(f"고정 계좌 이벤트 {len(frames)}개 → {path}")
+    return len(frames)
+
+
+def _ledger_mismatches(bot, expect, tolerance=1e-6):
+    ledger = bot.futures_ledger
+    found = {'total': ledger['balance']['total'], 'free': ledger['balance']['free'], 'wallet': ledger['wallet']}
+    errors = [f"{key} {found[key]:.6f} != {expect[key]:.6f}"
+              for key in ('total', 'free', 'wallet') if abs(found[key] - expect[key]) > tolerance]
+    positions = {symbol: (pos['side'], pos['contracts'], pos['leverage'])
+                 for symbol, pos in ledger['positions'].items()}
+    if positions != expect['positions']:
+        errors.append(f"positions {positions} != {expect['positions']}")
+    fills = len(bot.get_futures_fills())
+    if fills != expect['fills']:
+        errors.append(f"fills {fills} != {expect['fills']}")
+    return errors
+
+
+def check_ledger():
+    """고정 이벤트를 FuturesUserDataStream 이벤트 처리 경로로 원장에 적용하며 단계별 검증
+
+    스트림 스레드는 시작하지 않고 연결 상태만 표시한다 (네트워크/거래소 불필요).
+    Returns: 실패 단계 수
+    """
+    import binance_bot as bot
+
+    stream = bot.FuturesUserDataStream('ws://fixture', None)
+    stream.connected = True
+    stream.needs_reconcile = False
+    bot.futures_user_stream = stream
+    bot.futures_fills.clear()
+    bot.futures_account_config.pop(FIXTURE_SYMBOL, None)
+    bot.futures_mark_prices[FIXTURE_SYMBOL] = (FIXTURE_MARK, time.time())
+    bot.futures_ledger = {
+        'positions': {},
+        'balance': {'total': FIXTURE_BALANCE, 'free': FIXTURE_BALANCE},
+        'built_at': time.time(),
+        'live': True,
+        'wallet': FIXTURE_BALANCE,
+        'closing': {},
+    }
+
+    failed = 0
+    for index, step in enumerate(ledger_fixture_steps(), 1):
+        if 'frame' in step:
+            stream._on_event(step['frame'])
+            label = step['frame']['e']
+        else:
+            bot._ledger_apply_close(*step['close'])
+            label = '_ledger_apply_close'
+        errors = _ledger_mismatches(bot, step['expect'])
+        if errors:
+            failed += 1
+            logging.error(f"{index}. {label}: {'; '.join(errors)}")
+        else:
+            logging.info(f"{index}. {label}: OK")
+    logging.info(f"원장 검증 {'실패 ' + str(failed) + '단계' if failed else '통과'}")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="바이낸스 Futures WebSocket 녹화/재생")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help="실제 스트림 녹화")
+    rec.add_argument('streams', nargs='+')
+    rec.add_argument('-o', '--output', required=True)
+    rec.add_argument('--seconds', type=float, default=300)
+    rec.add_argument('--url', default='wss://fstream.binance.com')
+
+    rec_user = sub.add_parser('record-user', help="실제 사용자 데이터 스트림(계좌 이벤트) 녹화")
+    rec_user.add_argument('-o', '--output', required=True)
+    rec_user.add_argument('--seconds', type=float, default=300)
+    rec_user.add_argument('--url', default='wss://fstream.binance.com')
+    rec_user.add_argument('--api-url', default='https://fapi.binance.com')
+
+    chk = sub.add_parser('check', help="고정 계좌 이벤트로 봇 원장 반영 검증")
+    chk.add_argument('--write', help="고정 이벤트를 serve --user 용 JSONL 로 저장")
+
+    srv = sub.add_parser('serve', help="녹화 프레임 재생 서버")
+    srv.add_argument('frames', nargs='?', help="시세 프레임 파일 (없으면 /ws/<listenKey> 만 --user 로 재생)")
+    srv.add_argument('--host', default='127.0.0.1')
+    srv.add_argument('--port', type=int, default=8765)
+    srv.add_argument('--speed', type=float, default=1.0, help="재생 배속")
+    srv.add_argument('--loop', action='store_true', help="끝나면 처음부터 반복")
+    srv.add_argument('--rebase', action='store_true', help="녹화 날짜를 오늘로 이동")
+    srv.add_argument('--user', help="/ws/<listenKey> 로 재생할 사용자 데이터 이벤트 파일 (같은 JSONL 형식)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'record':
+        asyncio.run(record(args.url, args.streams, args.output, args.seconds))
+        return 0
+    if args.command == 'record-user':
+        api_key = os.getenv('BINANCE_API_KEY')
+        if not api_key:
+            parser.error("BINANCE_API_KEY 환경 변수가 필요합니다")
+        asyncio.run(record_user(args.url, args.api_url, api_key, args.output, args.seconds))
+        return 0
+    if args.command == 'check':
+        if args.write:
+            write_fixture_frames(args.write)
+        return 1 if check_ledger() else 0
+
+    if args.frames is None and args.user is None:
+        parser.error("frames 또는 --user 중 하나는 필요합니다")
+    frames = load_frames(args.frames) if args.frames else []
+    user_frames = load_frames(args.user) if args.user else None
+    if args.rebase:
+        frames = rebase_frames(frames)
+        user_frames = rebase_frames(user_frames) if user_frames else user_frames
+    logging.info(f"재생 준비: {len(frames)}개 프레임, ws://{args.host}:{args.port}")
+    web.run_app(create_app(frames, args.speed, args.loop, user_frames), host=args.host, port=args.port,
+                print=None, shutdown_timeout=1)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
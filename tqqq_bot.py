@@ -34,7 +34,7 @@ import schedule
 import time
 import logging
 import os
-import signal
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 try:
     from dotenv import load_dotenv
 except ImportError:
@@ -75,39 +75,33 @@ class APITimeoutError(Exception):
     pass
 
 
-def _timeout_handler(signum, frame):
-    """타임아웃 시그널 핸들러"""
-    raise APITimeoutError("API 호출 타임아웃")
+API_REQUEST_TIMEOUT = 20  # yfinance 요청별 소켓 타임아웃 (초) - 멈춘 호출이 풀 스레드를 붙잡지 않도록
+
+_timeout_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='api-timeout')
 
 
 def call_with_timeout(func, timeout=60):
     """
-    함수를 timeout과 함께 실행 (signal.alarm 방식 - Linux 전용)
+    함수를 timeout과 함께 실행 (전용 스레드 풀 + future.result 방식 - 워커 스레드에서도 사용 가능)
     
     Args:
         func: 실행할 함수 (lambda로 전달)
-        timeout: 타임아웃 시간 (초)
+        timeout: 타임아웃 시간 (초, 소수 가능)
     
     Returns:
         함수 실행 결과 또는 None (타임아웃/에러 시)
     """
-    old_handler = signal.signal(signal.SIGALRM, _timeout_handler)
-    signal.alarm(timeout)
-    
+    future = _timeout_executor.submit(func)
     try:
-        result = func()
-        signal.alarm(0)
-        return result
-    except APITimeoutError:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        # 이미 실행 중인 호출은 중단할 수 없으므로 결과만 버림
+        future.cancel()
         logger.warning(f"API 호출 타임아웃 ({timeout}초)")
         return None
     except Exception as e:
-        signal.alarm(0)
         logger.warning(f"API 호출 중 오류: {e}")
         return None
-    finally:
-        signal.alarm(0)
-        signal.signal(signal.SIGALRM, old_handler)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 📌 텔레그램 함수
@@ -156,8 +150,9 @@ class TQQQAnalyzer:
             def fetch_data():
                 ticker = yf.Ticker('TQQQ')
                 if start_date is None:
-                    return ticker.history(period='max', auto_adjust=True)
-                return ticker.history(start=start_date, end=end_date, auto_adjust=True)
+                    return ticker.history(period='max', auto_adjust=True, timeout=API_REQUEST_TIMEOUT)
+                return ticker.history(start=start_date, end=end_date, auto_adjust=True,
+                                      timeout=API_REQUEST_TIMEOUT)
             
             data = call_with_timeout(fetch_data, timeout=60)
             
@@ -28,6 +28,7 @@ import requests
 import json
 from datetime import datetime, timedelta
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
 
 # .env 파일 로드
@@ -355,7 +356,7 @@ upbit = Upbit(ACCESS_KEY, SECRET_KEY)
 
 
 # ============================================================
-# API 호출 재시도 래퍼 (Timeout 지원 - signal.alarm 방식)
+# API 호출 재시도 래퍼 (Timeout 지원 - 스레드 풀 방식)
 # ============================================================
 
 class APITimeoutError(Exception):
@@ -363,40 +364,55 @@ class APITimeoutError(Exception):
     pass
 
 
-def _timeout_handler(signum, frame):
-    """타임아웃 시그널 핸들러"""
-    raise APITimeoutError("API 호출 타임아웃")
+API_REQUEST_TIMEOUT = 10  # HTTP 요청별 소켓 타임아웃 (초) - 멈춘 호출이 풀 스레드를 붙잡지 않도록
+
+_timeout_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='api-timeout')
+
+
+def _install_default_request_timeout(timeout):
+    """requests 호출에 timeout 이 없으면 기본 소켓 타임아웃 적용
+
+    pyupbit 는 timeout 없이 requests.get/post 를 호출하므로, 응답이 멈추면
+    call_with_timeout 이 결과를 버린 뒤에도 풀 스레드가 영구히 묶인다.
+    """
+    original = requests.Session.request
+    if getattr(original, '_default_timeout', None) is not None:
+        return
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = timeout
+        return original(self, method, url, **kwargs)
+
+    request._default_timeout = timeout
+    requests.Session.request = request
+
+
+_install_default_request_timeout(API_REQUEST_TIMEOUT)
 
 
 def call_with_timeout(func, timeout=30):
     """
-    함수를 timeout과 함께 실행 (signal.alarm 방식 - Linux 전용)
+    함수를 timeout과 함께 실행 (전용 스레드 풀 + future.result 방식 - 워커 스레드에서도 사용 가능)
     
     Args:
         func: 실행할 함수 (lambda로 전달)
-        timeout: 타임아웃 시간 (초)
+        timeout: 타임아웃 시간 (초, 소수 가능)
     
     Returns:
         함수 실행 결과 또는 None (타임아웃/에러 시)
     """
-    # 기존 핸들러 저장
-    old_handler = signal.signal(signal.SIGALRM, _timeout_handler)
-    signal.alarm(timeout)
-    
+    future = _timeout_executor.submit(func)
     try:
-        result = func()
-        signal.alarm(0)  # 타이머 취소
-        return result
-    except APITimeoutError:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        # 이미 실행 중인 호출은 중단할 수 없으므로 결과만 버림
+        future.cancel()
         logging.warning(f"API 호출 타임아웃 ({timeout}초)")
         return None
     except Exception as e:
-        signal.alarm(0)  # 타이머 취소
         logging.warning(f"API 호출 중 오류: {e}")
         return None
-    finally:
-        signal.alarm(0)  # 타이머 확실히 취소
-        signal.signal(signal.SIGALRM, old_handler)  # 핸들러 복원
 
 
 def retry_api_call(func, max_retries=3, delay=2.0, default=None, timeout=30):